@@ -1,11 +1,10 @@
-import math
 import os
 import sys
+import time
 import warnings
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
-from PyQt6.uic import loadUiType
 from datetime import datetime, date
 from uuid import uuid4
 from decimal import Decimal
@@ -13,18 +12,19 @@ import bcrypt
 import logging
 
 from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import joinedload
 from components.dialogs import AddTTableRowDialog, AddDeceasedTransactionDialog
 from database.backup import BackupManager
 from database.models import (
-    ActivityLog, DeceasedBalance, DeceasedTransaction, Orphan, Guardian, Deceased, Currency,
-    Permission, Role, RolePermission, TransactionTypeEnum,
+    DeceasedBalance, DeceasedTransaction, Orphan, Guardian, Deceased, Currency,
+    Role, RolePermission, TransactionTypeEnum,
     OrphanGuardian, GenderEnum, OrphanBalance, GuardianBalance,
     GuardianTransaction,
     Transaction, User, PermissionEnum
 )
 from utils import log_activity, parse_and_validate_date, try_get_date, parse_decimal
 from services.db_services import DBService
-from controllers import PersonController, PaginationController
+from controllers import PersonController
 from components import (
     AddTransactionDialog,
     AddTransactionDialogV2,
@@ -33,11 +33,30 @@ from components import (
     ExportFinancialTableDialog,
     ExportReportDialog,
     GuardianSearchDialog,
+    MonthlyAnalyticsDialog,
     OrphanSearchDialog,
+    ProfileCaptureDialog,
+    QueryStatsDialog,
+    StallLogDialog,
+    StartupTraceDialog,
 )
-from services.permissions import has_permission
-from services.reporting import generate_financial_table_report, generate_report
+from components.list_filter_bar import ListFilterBar
+from components.login_worker import LoginWorker
+from components.table_models import LazyTableModel
+from services import dashboard_summary
+from services.activity_archive import archive_activity_logs
+from services.permissions import has_permission, refresh_user_permissions
+from services.query_executor import query_executor
+from services.reference_cache import reference_cache
+from services.reports import prewarm_reporting, submit_report
+from services.report_pool import report_pool
+from utils.activity_log import activity_log_writer
 from utils.distribution import calculate_beneficiary_distribution, to_decimal_money
+from utils.metrics import metrics
+from utils.profiler_capture import ProfileCapture
+from utils.stall_watchdog import stall_watchdog
+from utils.startup_trace import startup_tracer
+from utils.ui_compiler import load_form_class, load_page_form_class
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
@@ -50,8 +69,18 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 # Now use the function to find your UI files
-FORM_CLASS, _ = loadUiType(resource_path(os.path.join("ui", "app.ui")))
-FORM_CLASS2, _ = loadUiType(resource_path(os.path.join("ui", "login.ui")))
+# الوحدات المولّدة مسبقاً من ملفات ui (انظر utils/ui_compiler.py)
+APP_UI_PATH = resource_path(os.path.join("ui", "app.ui"))
+with startup_tracer.phase("load ui forms"):
+    FORM_CLASS = load_form_class(APP_UI_PATH)
+    FORM_CLASS2 = load_form_class(resource_path(os.path.join("ui", "login.ui")))
+
+# مهلة إنشاء النافذة الرئيسية مسبقاً بعد عرض نافذة الدخول
+MAIN_WINDOW_PRELOAD_DELAY_MS = 300
+# مهلة تسخين نظام التقارير في الخلفية بعد تسجيل الدخول (بعد ظهور لوحة التحكم)
+REPORTING_PREWARM_DELAY_MS = 2000
+# مهلة أرشفة سجل النشاطات القديم في الخلفية بعد تسجيل الدخول
+ACTIVITY_ARCHIVE_DELAY_MS = 10000
 
 
 class ResourceTypes:
@@ -115,6 +144,7 @@ class PersonType:
 class LoginWindow(QMainWindow, FORM_CLASS2):
     shown = False
     login_success_signal = pyqtSignal(object)
+    SPINNER_FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
     
     def __init__(self, db_service):
         super().__init__()
@@ -127,6 +157,12 @@ class LoginWindow(QMainWindow, FORM_CLASS2):
         # تأجيل تحميل الأيقونة إلى ما بعد عرض النافذة (لتسريع البدء)
         self.icon_loaded = False
         
+        self._login_worker = None
+        self._spinner_step = 0
+        self._spinner_timer = QTimer(self)
+        self._spinner_timer.setInterval(80)
+        self._spinner_timer.timeout.connect(self._advance_spinner)
+
         self.login_btn.clicked.connect(self.handle_login)
     
     def _load_icon_async(self):
@@ -147,6 +183,9 @@ class LoginWindow(QMainWindow, FORM_CLASS2):
             QTimer.singleShot(50, self._load_icon_async)
     
     def handle_login(self):
+        if self._login_worker is not None:
+            return  # تحقق سابق ما زال قيد التنفيذ
+
         # تفريغ الرسالة السابقة وتغيير لونها (مثلاً أحمر للأخطاء)
         self.msg.setText("")
         self.msg.setStyleSheet("color: red; font-weight: bold;") 
@@ -158,31 +197,65 @@ class LoginWindow(QMainWindow, FORM_CLASS2):
             self.msg.setText("يرجى إدخال اسم المستخدم وكلمة المرور.")
             return
 
-        db = self.db_service.session
-        try:
-            user = db.query(User).filter_by(username=username).first()
+        # التحقق من كلمة المرور (bcrypt) في خيط منفصل حتى تبقى النافذة مستجيبة
+        self._set_busy(True)
+        self._login_worker = LoginWorker(username, password)
+        self._login_worker.succeeded.connect(self._on_login_verified)
+        self._login_worker.failed.connect(self._on_login_failed)
+        self._login_worker.finished.connect(self._on_login_worker_finished)
+        self._login_worker.start()
 
-            if user:
-                # التحقق من كلمة المرور
-                if bcrypt.checkpw(password.encode('utf-8'), user.password.encode('utf-8')):
-                    # في حالة النجاح، نغير اللون للأخضر
-                    self.msg.setStyleSheet("color: green; font-weight: bold;")
-                    self.msg.setText("تم تسجيل الدخول بنجاح! جاري التحميل...")
-                    
-                    # تنفيذ عملية فتح النافذة الرئيسية بعد تأخير بسيط أو مباشرة
-                    if hasattr(self, 'login_success_signal'):
-                        self.login_success_signal(user)
-                else:
-                    raise ValueError("كلمة المرور غير صحيحة.")
-            else:
+    def _on_login_verified(self, user_id):
+        self._set_busy(False)
+        try:
+            # إعادة تحميل المستخدم في الجلسة الرئيسية للتطبيق (لا في جلسة ملف الشخص)
+            user = self.db_service.get_session_user(user_id)
+            if user is None:
                 raise ValueError("اسم المستخدم غير موجود.")
 
+            # في حالة النجاح، نغير اللون للأخضر
+            self.msg.setStyleSheet("color: green; font-weight: bold;")
+            self.msg.setText("تم تسجيل الدخول بنجاح! جاري التحميل...")
+
+            # تنفيذ عملية فتح النافذة الرئيسية بعد تأخير بسيط أو مباشرة
+            if hasattr(self, 'login_success_signal'):
+                self.login_success_signal(user)
         except ValueError as ve:
-            # عرض الخطأ داخل الـ Label بدلاً من QMessageBox
             self.msg.setText(str(ve))
         except Exception as e:
             QMessageBox.warning(self, "خطأ", str(e))
 
+    def _on_login_failed(self, message, is_validation_error):
+        self._set_busy(False)
+        if is_validation_error:
+            # عرض الخطأ داخل الـ Label بدلاً من QMessageBox
+            self.msg.setText(message)
+        else:
+            QMessageBox.warning(self, "خطأ", message)
+
+    def _on_login_worker_finished(self):
+        self._login_worker = None
+
+    def _set_busy(self, busy):
+        """تعطيل الحقول وإظهار مؤشر انتظار متحرك أثناء التحقق."""
+        self.login_btn.setEnabled(not busy)
+        self.username.setEnabled(not busy)
+        self.password.setEnabled(not busy)
+        if busy:
+            self._spinner_step = 0
+            self.msg.setStyleSheet("color: gray; font-weight: bold;")
+            self._advance_spinner()
+            self._spinner_timer.start()
+        else:
+            self._spinner_timer.stop()
+            self.msg.setText("")
+            self.msg.setStyleSheet("color: red; font-weight: bold;")
+
+    def _advance_spinner(self):
+        frame = self.SPINNER_FRAMES[self._spinner_step % len(self.SPINNER_FRAMES)]
+        self._spinner_step += 1
+        self.msg.setText(f"{frame} جاري التحقق من البيانات...")
+
 # ===== Main Window =====
 class MainWindow(QMainWindow, FORM_CLASS):
     shown = False
@@ -190,7 +263,8 @@ class MainWindow(QMainWindow, FORM_CLASS):
 
     def __init__(self, db_service):
         super().__init__()
-        self.setupUi(self)
+        with startup_tracer.phase("MainWindow.setupUi"):
+            self.setupUi(self)
         # self.setFixedSize(1080, 690)
         self.current_user = None
         
@@ -209,26 +283,44 @@ class MainWindow(QMainWindow, FORM_CLASS):
         # تأجيل تحميل الأيقونة (لتسريع البدء)
         self.icon_loaded = False
         
-        self.init_ui()
+        # صفحات الإدارة تُبنى عند أول زيارة (انظر utils/ui_compiler.LAZY_PAGES)
+        self._lazy_page_setups = {
+            "tab_7": self.setup_users_page,
+            "tab_8": self.setup_roles_page,
+            "tab_9": self.setup_permissions_page,
+            "tab_27": self.setup_activity_logs_page,
+            "tab_6": self.setup_settings_page,
+        }
+        self.query_stats_dialog = None
+        
+        with startup_tracer.phase("MainWindow.init_ui"):
+            self.init_ui()
         
         self.navigation_back_stack = []
         self.navigation_forward_stack = []
         self._is_navigating = False # علم لمنع تسجيل التنقل أثناء الضغط على زر رجوع نفسه
         
         self.backup_manager = BackupManager(self)
-        self.deceased_pagination = PaginationController()
-        self.guardians_pagination = PaginationController()
-        self.orphans_pagination = PaginationController()
-        self.orphans_older_or_equal_18_pagination = PaginationController()
-        self.activity_log_pagination = PaginationController()
         self.db_service = db_service
         self.controller = PersonController(self.db_service)
+        with startup_tracer.phase("MainWindow.init_list_views"):
+            self.init_list_views()
 
-        self.init_dashboard()
+        with startup_tracer.phase("MainWindow.init_dashboard"):
+            self.init_dashboard()
         # === Tab Router (dynamic) ===
         self.init_tab_router()
 
+        # === Profile capture (مخفي: Ctrl+Shift+F12 يقيس العملية التالية) ===
+        self.profile_capture = ProfileCapture(self)
+        self.profile_capture.dataset_provider = self.profile_dataset
+        self.profile_capture.state_changed.connect(lambda _, message: self.statusBar().showMessage(message, 8000))
+        self.profile_capture.captured.connect(lambda summary: self.show_profile_capture(summary.get("at")))
+        self.profile_capture_shortcut = QShortcut(QKeySequence("Ctrl+Shift+F12"), self)
+        self.profile_capture_shortcut.activated.connect(self.profile_capture.arm_next_operation)
+
         ### === Signals === ###
+        signals_start = time.perf_counter()
         # === Show Detail Page Signals ===
         self.show_edit_page_deceased_btn.clicked.connect(
             lambda: self.open_person(self.controller.current_person.deceased, PersonType.DECEASED) if self.controller.current_person else None
@@ -244,20 +336,13 @@ class MainWindow(QMainWindow, FORM_CLASS):
             lambda: self.save_person_record(self.controller.current_person)
         )
         
-        # === Pagination Signals ===
-        self.next_btn.clicked.connect(self.next_page)
-        self.prev_btn.clicked.connect(self.prev_page)
-        self.next_btn_2.clicked.connect(self.next_page)
-        self.prev_btn_2.clicked.connect(self.prev_page)
-        self.next_btn_3.clicked.connect(self.next_page)
-        self.prev_btn_3.clicked.connect(self.prev_page)
-        self.next_btn_4.clicked.connect(self.next_page)
-        self.prev_btn_4.clicked.connect(self.prev_page)
-        self.next_btn_5.clicked.connect(self.next_page)
-        self.prev_btn_5.clicked.connect(self.prev_page)
-
         # === Search Signals ===
         self.search_btn.clicked.connect(self.search_by_id_or_name)
+        # زر التحليلات الشهرية أسفل بطاقات الأعداد (جدول الأرصدة تحته)
+        self.monthly_analytics_btn = QPushButton("التحليلات الشهرية", self.tab)
+        self.monthly_analytics_btn.setProperty("class", "btn btn-lg btn-gold")
+        self.monthly_analytics_btn.setGeometry(QRect(0, 295, 251, 41))
+        self.monthly_analytics_btn.clicked.connect(lambda: MonthlyAnalyticsDialog(self).exec())
         self.btn_search_guardian.clicked.connect(self.search_guardian_by_id_or_name)
         self.btn_search_guardian_2.clicked.connect(self.search_guardian_by_id_or_name_2)
         self.btn_search_guardian_3.clicked.connect(self.search_guardian_by_id_or_name_3)
@@ -321,42 +406,28 @@ class MainWindow(QMainWindow, FORM_CLASS):
             lambda: self.remove_selected_orphan_row(self.detail_guardian_orphans_table)
         )
         
-        # === Backup Signals ===
-        self.btn_backup.clicked.connect(self.backup_manager.execute_backup)
-        self.btn_restore_backup.clicked.connect(self.backup_manager.execute_restore)
-        
         # === Tab Change Signals ===
         self.person_record_tabs.currentChanged.connect(self.on_tab_changed)
         self.tabWidget.currentChanged.connect(self.on_main_tab_changed)
         self.add_person_record_tabs.currentChanged.connect(self.on_add_person_record_tabs_changed)
         self.on_add_person_record_tabs_changed(self.add_person_record_tabs.currentIndex())
-        self.on_users_tabs_changed(self.tabWidget_3.currentIndex())
         
         # === Table row clicked ===
-        self.deceased_people_table.cellDoubleClicked.connect(self.on_deceased_row_double_clicked)
-        self.guardians_table.cellDoubleClicked.connect(self.on_guardian_row_double_clicked)
+        self.deceased_people_view.doubleClicked.connect(
+            lambda index: self.on_deceased_row_double_clicked(index.row(), index.column())
+        )
+        self.guardians_view.doubleClicked.connect(
+            lambda index: self.on_guardian_row_double_clicked(index.row(), index.column())
+        )
         # الجدول الأول
-        self.orphans_table.cellDoubleClicked.connect(
-            lambda row, col: self.on_orphan_row_double_clicked(row, col, self.orphans_table)
+        self.orphans_view.doubleClicked.connect(
+            lambda index: self.on_orphan_row_double_clicked(index.row(), index.column(), self.orphans_model)
         )
 
         # الجدول الثاني (أيتام أكبر من 18)
-        self.orphans_older_or_equal_18_table.cellDoubleClicked.connect(
-            lambda row, col: self.on_orphan_row_double_clicked(row, col, self.orphans_older_or_equal_18_table)
+        self.orphans_older_or_equal_18_view.doubleClicked.connect(
+            lambda index: self.on_orphan_row_double_clicked(index.row(), index.column(), self.orphans_older_or_equal_18_model)
         )
-        self.roles_table.cellDoubleClicked.connect(self.on_role_row_clicked)
-        
-        self.pushButton.clicked.connect(self.create_user)
-        self.pushButton_2.clicked.connect(self.update_user)
-        self.clear_user_update_btn.clicked.connect(self.clear_user_inputs)
-        self.show_user_btn.clicked.connect(self.show_user_detail)
-        self.role_save_btn.clicked.connect(self.save_role)
-        self.role_delete_btn.clicked.connect(self.delete_role)
-        
-        self.roles_combo.currentIndexChanged.connect(self.load_permissions)
-        self.save_permissions_btn.clicked.connect(self.save_permissions)
-        self.check_all_btn.clicked.connect(self.check_all)
-        self.uncheck_all_btn.clicked.connect(self.uncheck_all)
         
         self.detail_export_btn.clicked.connect(
             lambda: self.export_person_record(self.controller.current_person)
@@ -372,13 +443,6 @@ class MainWindow(QMainWindow, FORM_CLASS):
         
         self.logout_btn.clicked.connect(self.handle_logout)
         
-        self.role_id_input.textChanged.connect(
-            lambda text: self.role_delete_btn.setEnabled(bool(text.strip()))
-        )
-        self.role_name_input.textChanged.connect(
-            lambda text: self.role_id_input.clear() if not text.strip() else None
-        )
-        
         self.search_btn_2.clicked.connect(self.open_deceased_selection_dialog)
 
         currencies = self.db_service.session.query(Currency.name, Currency.id).all()
@@ -476,6 +540,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
                 lambda _=None, cb=combo_widget, groups=xfields: self.toggle_transactions_inputs(cb, groups)
             )
             self.toggle_transactions_inputs(combo_widget, xfields)
+        startup_tracer.record("MainWindow.signals", signals_start, time.perf_counter())
     
     def open_deceased_selection_dialog(self):
         # جلب النص من حقل البحث (اسم، هوية، أو أرشيف 10866)
@@ -502,7 +567,12 @@ class MainWindow(QMainWindow, FORM_CLASS):
     def load_historical_data_for_deceased(self, deceased):
         """تجهيز الجدول بدمج أعمدة الإيداع والسحب تحت اسم كل يتيم مع تنسيق كامل
         بالإضافة لملء السجلات السابقة من قاعدة البيانات إن وجدت."""
+        load_started = time.perf_counter()
         try:
+            # المتوفى قد يكون من جلسة ملف سابق أُغلقت
+            deceased = self.db_service.attach(deceased)
+            if self.db_service.same_entity(self.current_deceased_for_t_table, deceased):
+                self.current_deceased_for_t_table = deceased
             # حفظ حالة عمود تفاصيل المتوفي قبل إعادة التحميل حتى لا يضيع رقم الحركة
             previous_action_by_row_key = {}
             if self.t_table.columnCount() >= 3:
@@ -871,8 +941,10 @@ class MainWindow(QMainWindow, FORM_CLASS):
             # تحديث حالة الأزرار (سيكون الجدول فارغاً في البداية)
             self.update_t_table_buttons_state()
             self._refresh_financial_entity_header_balances(self.t_table)
+            metrics.record("financial_grid_load", load_started)
 
         except Exception as e:
+            metrics.error("financial_grid_load")
             print(f"حدث خطأ أثناء تحديث الجدول: {e}")
 
     def on_currency_changed(self):
@@ -957,7 +1029,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
 
     def _build_deceased_payload_from_txn(self, txn: DeceasedTransaction):
         txn_type = "deposit" if txn.type == TransactionTypeEnum.deposit else "withdraw"
-        currency_code = txn.currency.code if txn.currency and txn.currency.code else ""
+        currency_code = reference_cache.currency_code(txn.currency_id) or ""
         return {
             "deceased_id": txn.deceased_id,
             "currency_id": txn.currency_id,
@@ -1019,7 +1091,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
 
         currency_code = payload.get("currency_code")
         if not currency_code and payload.get("currency_id"):
-            c_obj = self.db_service.session.query(Currency).get(payload.get("currency_id"))
+            c_obj = reference_cache.currency_by_id(payload.get("currency_id"))
             currency_code = c_obj.code if c_obj and c_obj.code else None
         if currency_code:
             idx = dialog.combo_currency.findText(currency_code)
@@ -1264,7 +1336,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
         selected_currency_id = self.c_combo.currentData()
         selected_currency_code = None
         if selected_currency_id:
-            selected_currency = self.db_service.session.query(Currency).get(selected_currency_id)
+            selected_currency = reference_cache.currency_by_id(selected_currency_id)
             selected_currency_code = selected_currency.code if selected_currency and selected_currency.code else None
         if not selected_currency_code:
             QMessageBox.warning(self, "تنبيه", "يرجى اختيار العملة من الحقل أولاً.")
@@ -2354,7 +2426,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
         selected_currency_name = (row_data.get("currency") or "").strip()
         if selected_currency_name:
             try:
-                c_obj = self.db_service.session.query(Currency).filter(Currency.name == selected_currency_name).first()
+                c_obj = reference_cache.currency_by_name(selected_currency_name)
                 if c_obj:
                     currency_id = c_obj.id
             except Exception:
@@ -2414,6 +2486,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
             QMessageBox.warning(self, "تنبيه", "لا توجد بيانات للحفظ.")
             return
         
+        save_started = time.perf_counter()
         try:
             db = self.db_service.session
             currency_id = data.pop(0)["currency_id"]  # استخراج معرف العملة من أول عنصر
@@ -3633,8 +3706,10 @@ class MainWindow(QMainWindow, FORM_CLASS):
             return
         except Exception as e:
             db.rollback()
+            metrics.error("save_transactions")
             QMessageBox.critical(self, "خطأ", f"حدث خطأ أثناء حفظ البيانات: {e}")
             return
+        metrics.record("save_transactions", save_started)
         QMessageBox.information(self, "نجاح", success_message)
         if self.current_deceased_for_t_table:
             self.load_historical_data_for_deceased(self.current_deceased_for_t_table)
@@ -3732,13 +3807,6 @@ class MainWindow(QMainWindow, FORM_CLASS):
         self.disable_item(self.listWidget.item(1)) # Disable Person Record tab initially
         self.set_sellected_list_item(self.listWidget, 0)
         
-        header = self.permissions_table.horizontalHeader()
-        # أول عمود يتمدد
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-        # باقي الأعمدة حجمها حسب المحتوى
-        for i in range(1, self.permissions_table.columnCount()):
-            header.setSectionResizeMode(i, QHeaderView.ResizeMode.ResizeToContents)
-        
         # اسم البنك (ILS)
         self.label_146.hide()
         self.lineEdit_14.hide()
@@ -3786,9 +3854,6 @@ class MainWindow(QMainWindow, FORM_CLASS):
         self.label_164.hide()
         self.lineEdit_34.hide()
         
-        self.user_id_input.hide()
-        self.toggle_user_inputs(False)
-        
         self.add_deceased_orphans_table.setColumnHidden(0, True)
         self.add_guardian_orphans_table.setColumnHidden(0, True)
         self.detail_orphan_transactions_table.setColumnHidden(0, True)
@@ -3822,7 +3887,6 @@ class MainWindow(QMainWindow, FORM_CLASS):
         # self.t_table.setWordWrap(True)
         
         # إخفاء بعض الحقول
-        self.role_id_input.hide()
         self.widget_34.hide()
         self.lineEdit_37.hide()
         self.lineEdit_38.hide()
@@ -3830,25 +3894,136 @@ class MainWindow(QMainWindow, FORM_CLASS):
         self.lineEdit_40.hide()
         self.lineEdit_41.hide()
         
-        self.role_delete_btn.setEnabled(False) # تعطيل زر الحذف حتى يتم إدخال اسم دور
         self._enable_excel_like_table(self.t_table, header_rows=2)
         self._setup_t_table_column_width_controls()
 
+    # ===== Lazy Pages =====
+    def ensure_page_built(self, index):
+        """بناء محتوى الصفحة من نموذجها المستقل عند أول زيارة ثم ربط إشاراتها."""
+        page = self.tabWidget.widget(index)
+        setup = self._lazy_page_setups.pop(page.objectName(), None) if page else None
+        if setup is None:
+            return
+        form = load_page_form_class(APP_UI_PATH, page.objectName())()
+        form.setupUi(page)
+        # العناصر تصبح خصائص للنافذة كما لو كانت مبنية من app.ui مباشرة
+        for name, value in vars(form).items():
+            setattr(self, name, value)
+        if page.isVisible():
+            # العناصر المضافة لعنصر ظاهر لا تظهر تلقائياً
+            for child in page.findChildren(QWidget, options=Qt.FindChildOption.FindDirectChildrenOnly):
+                if not child.testAttribute(Qt.WidgetAttribute.WA_WState_ExplicitShowHide):
+                    child.show()
+        setup()
+
+    def setup_users_page(self):
+        self.user_id_input.hide()
+        self.toggle_user_inputs(False)
+        self.pushButton.clicked.connect(self.create_user)
+        self.pushButton_2.clicked.connect(self.update_user)
+        self.clear_user_update_btn.clicked.connect(self.clear_user_inputs)
+        self.show_user_btn.clicked.connect(self.show_user_detail)
+        self.tabWidget_3.currentChanged.connect(self.on_users_tabs_changed)
+
+    def setup_roles_page(self):
+        self.role_id_input.hide()
+        self.role_delete_btn.setEnabled(False) # تعطيل زر الحذف حتى يتم إدخال اسم دور
+        self.roles_table.cellDoubleClicked.connect(self.on_role_row_clicked)
+        self.role_save_btn.clicked.connect(self.save_role)
+        self.role_delete_btn.clicked.connect(self.delete_role)
+        self.role_id_input.textChanged.connect(
+            lambda text: self.role_delete_btn.setEnabled(bool(text.strip()))
+        )
+        self.role_name_input.textChanged.connect(
+            lambda text: self.role_id_input.clear() if not text.strip() else None
+        )
+
+    def setup_permissions_page(self):
+        header = self.permissions_table.horizontalHeader()
+        # أول عمود يتمدد
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        # باقي الأعمدة حجمها حسب المحتوى
+        for i in range(1, self.permissions_table.columnCount()):
+            header.setSectionResizeMode(i, QHeaderView.ResizeMode.ResizeToContents)
+        self.roles_combo.currentIndexChanged.connect(self.load_permissions)
+        self.save_permissions_btn.clicked.connect(self.save_permissions)
+        self.check_all_btn.clicked.connect(self.check_all)
+        self.uncheck_all_btn.clicked.connect(self.uncheck_all)
+
+    def setup_activity_logs_page(self):
+        self.init_list_tab(11)
+
+    def setup_settings_page(self):
+        self.btn_backup.clicked.connect(self.backup_manager.execute_backup)
+        self.btn_restore_backup.clicked.connect(self.backup_manager.execute_restore)
+
+        # زر عرض توقيت بدء التشغيل أسفل بطاقة النسخ الاحتياطي
+        card = self.widget_43.geometry()
+        self.startup_trace_btn = QPushButton("توقيت بدء التشغيل", self.widget_43.parentWidget())
+        self.startup_trace_btn.setProperty("class", "btn btn-lg btn-gold")
+        self.startup_trace_btn.setGeometry(card.x(), card.bottom() + 16, card.width(), 41)
+        self.startup_trace_btn.clicked.connect(lambda: StartupTraceDialog(self).exec())
+        self.startup_trace_btn.show()
+
+        # نافذة تشخيص الاستعلامات (غير حاجبة حتى يمكن العمل في البرنامج أثناء القياس)
+        self.query_stats_btn = QPushButton("تشخيص الاستعلامات", self.widget_43.parentWidget())
+        self.query_stats_btn.setProperty("class", "btn btn-lg btn-gold")
+        self.query_stats_btn.setGeometry(card.x(), card.bottom() + 16 + 41 + 10, card.width(), 41)
+        self.query_stats_btn.clicked.connect(self.show_query_stats)
+        self.query_stats_btn.show()
+
+        self.stall_log_btn = QPushButton("تجمّد الواجهة", self.widget_43.parentWidget())
+        self.stall_log_btn.setProperty("class", "btn btn-lg btn-gold")
+        self.stall_log_btn.setGeometry(card.x(), card.bottom() + 16 + 2 * (41 + 10), card.width(), 41)
+        self.stall_log_btn.clicked.connect(lambda: StallLogDialog(self).exec())
+        self.stall_log_btn.show()
+
+        self.profile_capture_btn = QPushButton("التقاط الأداء", self.widget_43.parentWidget())
+        self.profile_capture_btn.setProperty("class", "btn btn-lg btn-gold")
+        self.profile_capture_btn.setGeometry(card.x(), card.bottom() + 16 + 3 * (41 + 10), card.width(), 41)
+        self.profile_capture_btn.clicked.connect(lambda: self.show_profile_capture())
+        self.profile_capture_btn.show()
+
+    def show_query_stats(self):
+        if self.query_stats_dialog is None:
+            self.query_stats_dialog = QueryStatsDialog(self)
+        self.query_stats_dialog.show()
+        self.query_stats_dialog.raise_()
+        self.query_stats_dialog.activateWindow()
+
+    def show_profile_capture(self, selected_at=None):
+        ProfileCaptureDialog(self.profile_capture, self, selected_at=selected_at).exec()
+
+    def profile_dataset(self):
+        """حجم البيانات المعروضة وقت الالتقاط (يُحفظ مع ملف القياس)."""
+        summary = self.db_service.get_summary_counts()
+        dataset = {key: summary[key] for key in dashboard_summary.COUNT_KEYS}
+        person = self.controller.current_person
+        if person is not None:
+            dataset["person"] = f"{type(person).__name__}#{person.id}"
+        if self.current_deceased_for_t_table is not None:
+            dataset["grid_deceased"] = self.current_deceased_for_t_table.id
+            dataset["grid_heirs"] = len(getattr(self, "d_orphans", None) or [])
+            dataset["grid_rows"] = max(self.t_table.rowCount() - 2, 0)  # بدون صفي العناوين
+            dataset["grid_columns"] = self.t_table.columnCount()
+        return dataset
+
     def check_permissions(self):
         # خريطة تربط اسم الصلاحية برقم العنصر في القائمة
         permissions_map = {
             # 'Home': 0,
             # 'PersonDetail': 1,
             'NewPerson': 2,
-            # 'DeceasedList': 3,
-            # 'GuardiansList': 4,
-            # 'OrphansList': 5,
-            # 'OrphansOver18': 6,
-            'Users': 7,
-            'Roles': 8,
-            'Permissions': 9,
-            'ActivityLogs': 10,
-            'Settings': 11,
+            # 'Transactions': 3,
+            # 'DeceasedList': 4,
+            # 'GuardiansList': 5,
+            # 'OrphansList': 6,
+            # 'OrphansOver18': 7,
+            'Users': 8,
+            'Roles': 9,
+            'Permissions': 10,
+            'ActivityLogs': 11,
+            'Settings': 12,
         }
 
         # التحقق من عناصر القائمة (ListWidget)
@@ -3861,6 +4036,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
         can_view_reports = has_permission(self.current_user, 'Reports', PermissionEnum.create)
         self.detail_export_btn.setEnabled(can_view_reports)
         self.orphans_monthly_report.setEnabled(can_view_reports)
+        self.monthly_analytics_btn.setEnabled(can_view_reports)
         if hasattr(self, "t_table_report_btn"):
             self.t_table_report_btn.setEnabled(can_view_reports)
         
@@ -3878,9 +4054,25 @@ class MainWindow(QMainWindow, FORM_CLASS):
                 self.setWindowIcon(icon)
             self.icon_loaded = True
         
+        # حساب صلاحيات المستخدم مرة واحدة؛ كل فحص لاحق مجرد بحث في مجموعة
+        refresh_user_permissions(user, self.db_service.session)
         self.setup_user_profile()
         self.check_permissions()
 
+        # pandas/openpyxl/القوالب تُحمَّل عند أول تصدير؛ نسخّنها في الخلفية لمن يملك صلاحية التقارير
+        if has_permission(user, 'Reports', PermissionEnum.create):
+            QTimer.singleShot(REPORTING_PREWARM_DELAY_MS, prewarm_reporting)
+
+        QTimer.singleShot(ACTIVITY_ARCHIVE_DELAY_MS, self.archive_old_activity_logs)
+
+    def archive_old_activity_logs(self):
+        """نقل سجلات النشاط الأقدم من مدة الاحتفاظ إلى الأرشيف (services/activity_archive)."""
+        query_executor.submit(
+            lambda db: archive_activity_logs(),
+            key="activity_archive",
+            on_error=lambda e: logger.warning(f"Activity log archiving failed: {e}"),
+        )
+
     def setup_user_profile(self):
         if self.current_user:
             if hasattr(self, 'welcome_msg'):
@@ -3935,6 +4127,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
     # ===== Main Tab Changed =====
     def on_main_tab_changed(self, index):
         self.disable_item(self.listWidget.item(1)) # Disable Person Record tab initially
+        self.ensure_page_built(index)
         if index == 0:
             self.setup_user_profile()
             self.init_dashboard()
@@ -3942,56 +4135,16 @@ class MainWindow(QMainWindow, FORM_CLASS):
             self.on_tab_changed(self.person_record_tabs.currentIndex())
         elif index == 2:
             self.controller = PersonController(self.db_service)
-        elif index == 3:
-            self.load_table_paginated(
-                self.deceased_people_table,
-                self.deceased_pagination,
-                self.pagination_label,
-                self.db_service.get_deceased_people_paginated,
-                self.render_deceased_row
-            )
-
-        elif index == 4:
-            self.load_table_paginated(
-                self.guardians_table,
-                self.guardians_pagination,
-                self.pagination_label_2,
-                self.db_service.get_guardians_paginated,
-                self.render_guardian_row
-            )
-        elif index == 5:
-            self.load_table_paginated(
-                self.orphans_table,
-                self.orphans_pagination,
-                self.pagination_label_3,
-                self.db_service.get_orphans_paginated,
-                self.render_orphan_row
-            )
-        elif index == 6:
-            self.load_table_paginated(
-                self.orphans_older_or_equal_18_table,
-                self.orphans_older_or_equal_18_pagination,
-                self.pagination_label_4,
-                self.db_service.get_orphans_older_than_or_equal_18_paginated,
-                self.render_orphan_older_equal_18_row
-            )
-        elif index == 7:
+        elif index in self.list_models:
+            self.reload_list_tab(index)
+        elif index == 8:
             self.load_users_list()
             self.load_roles_combo(self.role_comboBox)
             self.load_roles_combo(self.role_comboBox_2)
-        elif index == 8:
-            self.load_roles()
         elif index == 9:
-            self.load_roles_combo(self.roles_combo)
+            self.load_roles()
         elif index == 10:
-            self.load_table_paginated(
-                self.activity_logs_table,
-                self.activity_log_pagination,
-                self.pagination_label_5,
-                self.db_service.get_activity_logs_paginated,
-                self.render_activity_log_row,
-            )
-            # self.load_activity_log_list()
+            self.load_roles_combo(self.roles_combo)
 
     # ===== Configure Tabs =====
     def configure_tabs(self, person_type):
@@ -4138,34 +4291,36 @@ class MainWindow(QMainWindow, FORM_CLASS):
             QMessageBox.warning(self, "خطأ", "الرجاء إدخال رقم الهوية، الاسم أو رقم الأرشيف")
             return
 
-        db = self.db_service.session
         results = []
-
-        # 1. محاولة البحث عن مطابقة تامة (هوية أو أرشيف)
-        orphan, guardian, deceased_id, deceased_arc = self.db_service.find_by_archive_or_id(term)
+        search_started = time.perf_counter()
+        # جلسة قصيرة: نتائج البحث لا تبقى في جلسة الواجهة؛ الملف المختار يُقرأ في جلسة الشخص (open_person)
+        with self.db_service.session_scope() as db:
+            # 1. محاولة البحث عن مطابقة تامة (هوية أو أرشيف)
+            orphan, guardian, deceased_id, deceased_arc = self.db_service.find_by_archive_or_id(term)
         
-        if orphan: results.append((orphan, PersonType.ORPHAN))
-        if guardian: results.append((guardian, PersonType.GUARDIAN))
-        if deceased_id: results.append((deceased_id, PersonType.DECEASED))
+            if orphan: results.append((orphan, PersonType.ORPHAN))
+            if guardian: results.append((guardian, PersonType.GUARDIAN))
+            if deceased_id: results.append((deceased_id, PersonType.DECEASED))
         
-        # إضافة نتيجة الأرشيف إذا كانت مختلفة عن نتيجة الهوية (تجنب التكرار)
-        if deceased_arc and deceased_arc not in [r[0] for r in results]:
-            results.append((deceased_arc, PersonType.DECEASED))
-
-        # 2. إذا لم توجد نتائج مطابقة تماماً، نبحث بالاسم (Partial Search)
-        if not results:
-            tokens = [t.strip() for t in term.split() if t.strip()]
-            if tokens:
-                def name_filters(model):
-                    return [model.name.ilike(f"%{t}%") for t in tokens]
-
-                orphans = db.query(Orphan).filter(*name_filters(Orphan)).all()
-                guardians = db.query(Guardian).filter(*name_filters(Guardian)).all()
-                deceaseds = db.query(Deceased).filter(*name_filters(Deceased)).all()
-
-                results += [(o, PersonType.ORPHAN) for o in orphans]
-                results += [(g, PersonType.GUARDIAN) for g in guardians]
-                results += [(d, PersonType.DECEASED) for d in deceaseds]
+            # إضافة نتيجة الأرشيف إذا كانت مختلفة عن نتيجة الهوية (تجنب التكرار)
+            if deceased_arc and deceased_arc not in [r[0] for r in results]:
+                results.append((deceased_arc, PersonType.DECEASED))
+
+            # 2. إذا لم توجد نتائج مطابقة تماماً، نبحث بالاسم (Partial Search)
+            if not results:
+                tokens = [t.strip() for t in term.split() if t.strip()]
+                if tokens:
+                    def name_filters(model):
+                        return [model.name.ilike(f"%{t}%") for t in tokens]
+
+                    orphans = db.query(Orphan).filter(*name_filters(Orphan)).all()
+                    guardians = db.query(Guardian).filter(*name_filters(Guardian)).all()
+                    deceaseds = db.query(Deceased).filter(*name_filters(Deceased)).all()
+
+                    results += [(o, PersonType.ORPHAN) for o in orphans]
+                    results += [(g, PersonType.GUARDIAN) for g in guardians]
+                    results += [(d, PersonType.DECEASED) for d in deceaseds]
+        metrics.record("search", search_started)
 
         # 3. معالجة عرض النتائج
         if not results:
@@ -4308,7 +4463,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
             }
 
             # جلب الأرصدة الموجودة فعلياً
-            balances = {b.currency.code: b.balance for b in o.balances}
+            balances = {reference_cache.currency_code(b.currency_id): b.balance for b in o.balances}
             for col_name, code in cur_map.items():
                 col_idx = headers.get(col_name)
                 if col_idx is not None:
@@ -4353,7 +4508,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
             table.setItem(row_idx, 8, self._create_readonly_item(""))
             
             # جلب الأرصدة الموجودة فعلياً
-            balances = {b.currency.code: b.balance for b in o.balances}
+            balances = {reference_cache.currency_code(b.currency_id): b.balance for b in o.balances}
             table.setItem(row_idx, 9, self._create_readonly_item(f"{balances.get('ILS', 0):,.2f}"))
             table.setItem(row_idx, 10, self._create_readonly_item(f"{balances.get('USD', 0):,.2f}"))
             table.setItem(row_idx, 11, self._create_readonly_item(f"{balances.get('JOD', 0):,.2f}"))
@@ -4366,12 +4521,20 @@ class MainWindow(QMainWindow, FORM_CLASS):
             QMessageBox.warning(self, "خطأ", "لا يمكن عرض البيانات: السجل غير موجود.")
             return
         
-        self.controller.set_person(obj, person_type)
-        self.configure_tabs(person_type)
-        self.load_card(obj, person_type)
-        self.tabWidget.setCurrentIndex(1)
-        # Load first visible tab
-        self.on_tab_changed(self.person_record_tabs.currentIndex())
+        with metrics.time("open_person"):
+            # جلسة جديدة لكل ملف شخص: تُغلق جلسة الملف السابق وتُقرأ بيانات هذا الملف طازجة
+            self.db_service.open_person_scope()
+            obj = self.db_service.attach(obj)
+            # كائنات الملف السابق منتهية الصلاحية بعد إغلاق جلسته؛ المتوفى والوصي المحفوظان للجدول يُقرآن من الجلسة الجديدة
+            self.current_deceased_for_t_table = self.db_service.attach(self.current_deceased_for_t_table)
+            self.current_primary_guardian_for_t_table = self.db_service.attach(self.current_primary_guardian_for_t_table)
+            self.d_orphans = self.current_deceased_for_t_table.orphans if self.current_deceased_for_t_table else []
+            self.controller.set_person(obj, person_type)
+            self.configure_tabs(person_type)
+            self.load_card(obj, person_type)
+            self.tabWidget.setCurrentIndex(1)
+            # Load first visible tab
+            self.on_tab_changed(self.person_record_tabs.currentIndex())
 
     def open_guardian_from_deceased(self):
         d = self.controller.current_person
@@ -4581,7 +4744,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
                 balance_info = []
                 for bal in orphan.balances:
                     if bal.balance > 0:
-                        balance_info.append(f"• {bal.currency.code}: {bal.balance:,.2f}")
+                        balance_info.append(f"• {reference_cache.currency_code(bal.currency_id)}: {bal.balance:,.2f}")
                 
                 transaction_count = len(orphan.transactions)
                 
@@ -5089,6 +5252,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
             )
 
             if reply == QMessageBox.StandardButton.Yes:
+                delete_started = time.perf_counter()
                 try:
                     # جلب الحركة من القاعدة
                     trans_obj = db.query(Transaction).get(transaction_id)
@@ -5114,6 +5278,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
                         db.commit()
                         log_activity(db, self.current_user.id, ActionTypes.DELETE, ResourceTypes.ORPHAN_TRANSACTION, resource_id=trans_obj.id, description=f"تم حذف حركة يتيم من النظام")
                         table.removeRow(row)
+                        metrics.record("row_delete", delete_started)
                         QMessageBox.information(self, "نجاح", "تم حذف الحركة وتحديث الرصيد.")
                         # تحديث الواجهة (الأرصدة العلوية)
                         self.open_person(trans_obj.orphan, PersonType.ORPHAN)
@@ -5122,6 +5287,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
                     QMessageBox.warning(self, "فشل الحذف", str(ve))
                 except Exception as e:
                     db.rollback()
+                    metrics.error("row_delete")
                     QMessageBox.critical(self, "خطأ", f"حدث خطأ أثناء الحذف: {str(e)}")
         
         # حالة (2): الحركة جديدة (لم تُحفظ بعد)
@@ -5150,6 +5316,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
                 return
 
             db = self.db_service.session
+            delete_started = time.perf_counter()
             try:
                 trans_obj = db.query(GuardianTransaction).get(transaction_id)
                 guardian = self.controller.current_person
@@ -5176,12 +5343,14 @@ class MainWindow(QMainWindow, FORM_CLASS):
                 table.removeRow(row)
                 self.load_card(guardian, PersonType.GUARDIAN)
                 self.load_balance_tab()
+                metrics.record("row_delete", delete_started)
                 QMessageBox.information(self, "نجاح", "تم حذف الحركة وتحديث الرصيد")
             except ValueError as ve:
                 db.rollback()
                 QMessageBox.warning(self, "تنبيه", str(ve))
             except Exception as e:
                 db.rollback()
+                metrics.error("row_delete")
                 QMessageBox.critical(self, "خطأ", f"حدث خطأ أثناء الحذف: {str(e)}")
         else:
             table.removeRow(row)
@@ -5189,10 +5358,10 @@ class MainWindow(QMainWindow, FORM_CLASS):
     def on_deceased_row_double_clicked(self, row, column):
         try:
             # 1. جلب الـ ID من العمود الأول (العمود رقم 0)
-            id_item = self.deceased_people_table.item(row, 0)
-            if not id_item:
+            row_key = self.deceased_people_model.row_key(row)
+            if row_key is None:
                 return
-            deceased_id = int(id_item.text())
+            deceased_id = int(row_key)
             # 2. جلب كائن اليتيم من قاعدة البيانات باستخدام الـ ID
             db = self.db_service.session
             deceased = db.query(Deceased).get(deceased_id)
@@ -5206,10 +5375,10 @@ class MainWindow(QMainWindow, FORM_CLASS):
     def on_guardian_row_double_clicked(self, row, column):
         try:
             # 1. جلب الـ ID من العمود الأول (العمود رقم 0)
-            id_item = self.guardians_table.item(row, 0)
-            if not id_item:
+            row_key = self.guardians_model.row_key(row)
+            if row_key is None:
                 return
-            guardian_id = int(id_item.text())
+            guardian_id = int(row_key)
             # 2. جلب كائن اليتيم من قاعدة البيانات باستخدام الـ ID
             db = self.db_service.session
             guardian = db.query(Guardian).get(guardian_id)
@@ -5220,13 +5389,13 @@ class MainWindow(QMainWindow, FORM_CLASS):
         except Exception as e:
             QMessageBox.critical(self, "خطأ", f"تعذر فتح ملف الوصي: {str(e)}")
     
-    def on_orphan_row_double_clicked(self, row, column, table):
+    def on_orphan_row_double_clicked(self, row, column, model):
         try:
             # 1. جلب الـ ID من العمود الأول (العمود رقم 0)
-            id_item = table.item(row, 0)
-            if not id_item:
+            row_key = model.row_key(row)
+            if row_key is None:
                 return
-            orphan_id = int(id_item.text())
+            orphan_id = int(row_key)
             # 2. جلب كائن اليتيم من قاعدة البيانات باستخدام الـ ID
             db = self.db_service.session
             orphan = db.query(Orphan).get(orphan_id)
@@ -5344,6 +5513,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
     def delete_transaction_from_db(self, trans_id):
         """ حذف السجل من قاعدة البيانات وتصحيح أرصدة المتوفى والأيتام """
         db = self.db_service.session
+        delete_started = time.perf_counter()
         try:
             # 1. جلب الحركة المراد حذفها
             transaction = db.query(DeceasedTransaction).filter_by(id=trans_id).first()
@@ -5390,10 +5560,12 @@ class MainWindow(QMainWindow, FORM_CLASS):
             
             # تنفيذ التغييرات
             db.commit()
+            metrics.record("row_delete", delete_started)
             return True
 
         except Exception as e:
             db.rollback()
+            metrics.error("row_delete")
             QMessageBox.critical(self, "خطأ", f"فشل الحذف وتحديث الأرصدة: {str(e)}")
             return False
     
@@ -5459,31 +5631,74 @@ class MainWindow(QMainWindow, FORM_CLASS):
         self.update_summary_lcds()
 
     def update_summary_lcds(self):
-        """تحديث ملخصات الأرقام - محسّن للسرعة"""
-        try:
-            # استخدام استعلام محسّن بدل استدعاء دوال متعددة
-            summary = self.db_service.get_summary_counts()
-            
-            # تحديث مباشر بدون try/except متكرر لكل LCD
-            if summary:
-                try:
-                    self.lcd_orphans_count.display(summary.get("orphans", 0))
-                except: 
-                    pass
-                try:
-                    self.lcd_orphans_older_than_18_count.display(summary.get("orphans_over_18", 0))
-                except: 
-                    pass
-                try:
-                    self.lcd_guardians_count.display(summary.get("guardians", 0))
-                except: 
-                    pass
-                try:
-                    self.lcd_deceased_people_count.display(summary.get("deceased", 0))
-                except: 
-                    pass
-        except Exception as e:
-            logger.warning(f"خطأ في تحديث ملخصات اللوحة: {e}")
+        """
+        عرض آخر ملخص محفوظ فوراً، وتحديثه في الخلفية إن انتهت صلاحيته أو أُبطل بعد
+        تعديل (services/dashboard_summary)
+        """
+        summary, fresh = dashboard_summary.cached_summary()
+        if summary is not None:
+            self.apply_summary_counts(summary)
+        if fresh:
+            return
+        query_executor.submit(
+            lambda db: db.get_summary_counts(),
+            key="dashboard_summary",
+            on_result=self.apply_summary_counts,
+            on_error=lambda e: logger.warning(f"خطأ في تحديث ملخصات اللوحة: {e}"),
+        )
+
+    def apply_summary_counts(self, summary):
+        # تحديث مباشر بدون try/except متكرر لكل LCD
+        if summary:
+            try:
+                self.lcd_orphans_count.display(summary.get("orphans", 0))
+            except: 
+                pass
+            try:
+                self.lcd_orphans_older_than_18_count.display(summary.get("orphans_over_18", 0))
+            except: 
+                pass
+            try:
+                self.lcd_guardians_count.display(summary.get("guardians", 0))
+            except: 
+                pass
+            try:
+                self.lcd_deceased_people_count.display(summary.get("deceased", 0))
+            except: 
+                pass
+            self.setup_dashboard_balances_table(summary.get("balances", []))
+
+    def setup_dashboard_balances_table(self, balances):
+        """مجاميع الأرصدة لكل عملة (التركات، الأيتام، الأوصياء) تحت بطاقات الأعداد"""
+        table = getattr(self, "dashboard_balances_table", None)
+        if table is None:
+            table = self.dashboard_balances_table = QTableWidget(self.tab)
+            table.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+            table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+            table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+            table.setColumnCount(4)
+            table.setHorizontalHeaderLabels(["أرصدة التركات", "أرصدة الأيتام", "أرصدة الأوصياء", "الإجمالي"])
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+            table.verticalHeader().setFixedWidth(120)
+            table.show()
+
+        table.setRowCount(len(balances))
+        for row_idx, totals in enumerate(balances):
+            header_item = QTableWidgetItem(totals.name)
+            header_item.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
+            table.setVerticalHeaderItem(row_idx, header_item)
+            values = (totals.deceased, totals.orphans, totals.guardians, totals.deceased + totals.orphans + totals.guardians)
+            for col_idx, value in enumerate(values):
+                item = QTableWidgetItem("{:,.2f}".format(value))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                if col_idx == 3:
+                    font = item.font()
+                    font.setBold(True)
+                    item.setFont(font)
+                table.setItem(row_idx, col_idx, item)
+        # ارتفاع مطابق لعدد العملات بدون مساحة فارغة
+        height = table.horizontalHeader().height() + sum(table.rowHeight(r) for r in range(len(balances))) + 2 * table.frameWidth()
+        table.setGeometry(QRect(0, 346, 1091, height))
 
     # ===== Load Card =====
     def load_card(self, obj, person_type):
@@ -5518,7 +5733,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
             self.label_137.setText(str(obj.age) if obj.age is not None else "---")
             self.label_137.show()
 
-            balances = {b.currency.code: b.balance for b in obj.balances}
+            balances = {reference_cache.currency_code(b.currency_id): b.balance for b in obj.balances}
             self.card_shekel_balance.setText(f"{balances.get('ILS',0):,.2f}")
             self.card_dollar_balance.setText(f"{balances.get('USD',0):,.2f}")
             self.card_dinar_balance.setText(f"{balances.get('JOD',0):,.2f}")
@@ -5530,7 +5745,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
             self.card_date_label.setText('تاريخ الوفاة:')
             self.container_balance.show()
             
-            balances = {b.currency.code: b.balance for b in obj.balances}
+            balances = {reference_cache.currency_code(b.currency_id): b.balance for b in obj.balances}
             self.card_shekel_balance.setText(f"{balances.get('ILS',0):,.2f}")
             self.card_dollar_balance.setText(f"{balances.get('USD',0):,.2f}")
             self.card_dinar_balance.setText(f"{balances.get('JOD',0):,.2f}")
@@ -5546,7 +5761,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
             self.card_phone_icon.show()
             self.container_balance.show()
             
-            balances = {b.currency.code: b.balance for b in obj.balances}
+            balances = {reference_cache.currency_code(b.currency_id): b.balance for b in obj.balances}
             self.card_shekel_balance.setText(f"{balances.get('ILS',0):,.2f}")
             self.card_dollar_balance.setText(f"{balances.get('USD',0):,.2f}")
             self.card_dinar_balance.setText(f"{balances.get('JOD',0):,.2f}")
@@ -5578,7 +5793,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
             self.detail_deceased_archives_number.clear()
 
         # guardian
-        primary_link = next((l for l in o.guardian_links if l.is_primary), None)
+        primary_link = o.primary_guardian_link
         if primary_link:
             g = primary_link.guardian
             self.lineEdit_41.setText(str(g.id))
@@ -5597,7 +5812,6 @@ class MainWindow(QMainWindow, FORM_CLASS):
 
     # ===== Balance Tab =====
     def load_balance_tab(self):
-        db = self.db_service
         person = self.controller.current_person
         person_type = self.controller.current_type
         if person_type == PersonType.ORPHAN:
@@ -5606,16 +5820,25 @@ class MainWindow(QMainWindow, FORM_CLASS):
             # self.detail_orphan_dollar.setText(f"{balances.get('USD',0):,.2f}")
             # self.detail_orphan_dinar.setText(f"{balances.get('JOD',0):,.2f}")
             # self.detail_orphan_euro.setText(f"{balances.get('EUR',0):,.2f}")
-            self.setup_balance_table(self.tableWidget, db.get_orphan_summary(person.id))
+            table, fetch = self.tableWidget, DBService.get_orphan_summary
         elif person_type == PersonType.DECEASED:
             # balances = {b.currency.code: b.balance for b in person.balances}
             # self.detail_deceased_shekel.setText(f"{balances.get('ILS',0):,.2f}")
             # self.detail_deceased_dollar.setText(f"{balances.get('USD',0):,.2f}")
             # self.detail_deceased_dinar.setText(f"{balances.get('JOD',0):,.2f}")
             # self.detail_deceased_euro.setText(f"{balances.get('EUR',0):,.2f}")
-            self.setup_balance_table(self.tableWidget_2, db.get_deceased_summary(person.id))
+            table, fetch = self.tableWidget_2, DBService.get_deceased_summary
         elif person_type == PersonType.GUARDIAN:
-            self.setup_balance_table(self.tableWidget_3, db.get_guardian_summary(person.id))
+            table, fetch = self.tableWidget_3, DBService.get_guardian_summary
+        else:
+            return
+        # ملخص الشخص الأخير فقط يُعرض إذا تنقل المستخدم بين الملفات بسرعة
+        query_executor.submit(
+            lambda db, person_id=person.id: [tuple(row) for row in fetch(db, person_id)],
+            key="balance_summary",
+            on_result=lambda data: self.setup_balance_table(table, data),
+            on_error=lambda e: QMessageBox.critical(self, "خطأ", f"تعذر تحميل الأرصدة: {e}"),
+        )
 
     # ===== Transactions Tab =====
     def load_transactions_tab(self):
@@ -5631,9 +5854,8 @@ class MainWindow(QMainWindow, FORM_CLASS):
         ])
         table.setColumnHidden(0, True)
         
-        # احصل على أسماء العملات من قاعدة البيانات
-        db = self.db_service.session
-        currency_names = [c.name for c in db.query(Currency).all()]
+        # أسماء العملات من الذاكرة المؤقتة للبيانات المرجعية
+        currency_names = reference_cache.currency_names()
 
         table.setRowCount(len(transactions))
 
@@ -5644,8 +5866,9 @@ class MainWindow(QMainWindow, FORM_CLASS):
             # ===== Currency Combo =====
             combo_currency = QComboBox()
             combo_currency.addItems(["اختر"] + currency_names)
-            if t.currency:
-                idx = combo_currency.findText(t.currency.name)
+            currency = reference_cache.currency_by_id(t.currency_id)
+            if currency:
+                idx = combo_currency.findText(currency.name)
                 combo_currency.setCurrentIndex(idx if idx != -1 else 0)
             table.setCellWidget(row_idx, 1, combo_currency)
 
@@ -5718,9 +5941,10 @@ class MainWindow(QMainWindow, FORM_CLASS):
             table.setCellWidget(row_idx, 2, combo_type)
 
             combo_currency = QComboBox()
-            combo_currency.addItems(["اختر"] + [c.name for c in db.query(Currency).all()])
-            if t.currency:
-                idx = combo_currency.findText(t.currency.name)
+            combo_currency.addItems(["اختر"] + reference_cache.currency_names())
+            currency = reference_cache.currency_by_id(t.currency_id)
+            if currency:
+                idx = combo_currency.findText(currency.name)
                 combo_currency.setCurrentIndex(idx if idx != -1 else 0)
             table.setCellWidget(row_idx, 3, combo_currency)
 
@@ -5797,7 +6021,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
             table.setCellWidget(row_idx, 7, gender_combo)
 
             # أرصدة العملات (قراءة فقط)
-            balances_map = {bal.currency.code: bal.balance for bal in o.balances}
+            balances_map = {reference_cache.currency_code(bal.currency_id): bal.balance for bal in o.balances}
             ils_item = QTableWidgetItem(f"{balances_map.get('ILS', 0):,.2f}")
             usd_item = QTableWidgetItem(f"{balances_map.get('USD', 0):,.2f}")
             jod_item = QTableWidgetItem(f"{balances_map.get('JOD', 0):,.2f}")
@@ -5834,7 +6058,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
         ])
         table.setColumnHidden(0, True)
 
-        currency_names = [c.name for c in db.query(Currency).all()]
+        currency_names = reference_cache.currency_names()
 
         transactions = (
             db.query(GuardianTransaction)
@@ -5856,8 +6080,9 @@ class MainWindow(QMainWindow, FORM_CLASS):
 
             currency_combo = QComboBox()
             currency_combo.addItems(["اختر"] + currency_names)
-            if t.currency:
-                idx = currency_combo.findText(t.currency.name)
+            currency = reference_cache.currency_by_id(t.currency_id)
+            if currency:
+                idx = currency_combo.findText(currency.name)
                 currency_combo.setCurrentIndex(idx if idx != -1 else 0)
             table.setCellWidget(row_idx, 3, currency_combo)
 
@@ -5935,7 +6160,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
             table.setItem(row_idx, 8, end_item)
 
             # --- 5. أرصدة العملات (أعمدة 9-12) ---
-            balances_map = {bal.currency.code: bal.balance for bal in o.balances}
+            balances_map = {reference_cache.currency_code(bal.currency_id): bal.balance for bal in o.balances}
             for col, code in enumerate(("ILS", "USD", "JOD", "EUR"), start=9):
                 val = f"{balances_map.get(code, 0):,.2f}"
                 b_item = self._create_readonly_item(val)
@@ -6154,7 +6379,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
                     existing_orphans_names.append(f'{exists.name} | رقم الهوية: {exists.national_id}')
                     # تخزين الأرصدة الحقيقية الحالية لليتيم الموجود مسبقاً
                     for bal in exists.balances:
-                        currency_code = bal.currency.code.lower()
+                        currency_code = reference_cache.currency_code(bal.currency_id).lower()
                         o_data[f'original_{currency_code}_balance'] = Decimal(str(bal.balance))
                 
                 # ملاحظة: إذا كان اليتيم جديداً، ستبقى الأرصدة الأصلية 0 كما هي معرفة فوق.
@@ -6935,7 +7160,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
                 row_num = index + 1
                 new_amount = Decimal(str(trans['amount']))
                 new_type_enum = TransactionTypeEnum.deposit if trans['type'] == "إيداع" else TransactionTypeEnum.withdraw
-                new_curr_obj = db.query(Currency).filter_by(name=trans['currency']).first()
+                new_curr_obj = reference_cache.currency_by_name(trans['currency'])
                 
                 if not new_curr_obj:
                     raise ValueError(f"السطر {row_num}: العملة المختارة غير معرفة.")
@@ -7072,7 +7297,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
 
                 # إضافة/تعديل الحركات الموجودة في الجدول
                 for row_num, trans in enumerate(transactions, start=1):
-                    currency_obj = db.query(Currency).filter_by(name=trans["currency"]).first()
+                    currency_obj = reference_cache.currency_by_name(trans["currency"])
                     if not currency_obj:
                         raise ValueError(f"السطر {row_num}: العملة غير موجودة")
 
@@ -7291,7 +7516,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
                     bal_rec.balance = new_balance
 
                 for row_num, trans in enumerate(transactions, start=1):
-                    currency_obj = db.query(Currency).filter_by(name=trans["currency"]).first()
+                    currency_obj = reference_cache.currency_by_name(trans["currency"])
                     if not currency_obj:
                         raise ValueError(f"السطر {row_num}: العملة غير موجودة")
 
@@ -7579,309 +7804,210 @@ class MainWindow(QMainWindow, FORM_CLASS):
             QMessageBox.warning(self, "خطأ", str(e))
 
     # ==== Lists Tabs ====
-    def load_deceased_people_list(self):
-        try:
-            data = self.db_service.get_deceased_people_list()
-
-            table = self.deceased_people_table
-            table.setRowCount(len(data))
-
-            for row_idx, (d, orphans_count) in enumerate(data):
-                table.setItem(row_idx, 0, QTableWidgetItem(str(d.id)))
-                table.setItem(row_idx, 1, QTableWidgetItem(d.name))
-                table.setItem(row_idx, 2, QTableWidgetItem(d.national_id or "---"))
-                table.setItem(row_idx, 3, QTableWidgetItem(
-                    d.date_death.strftime("%d/%m/%Y") if d.date_death else "---"
-                ))
-                table.setItem(row_idx, 4, QTableWidgetItem(d.account_number or '---'))
-                table.setItem(row_idx, 5, QTableWidgetItem(d.archives_number or '---'))
-                table.setItem(row_idx, 6, QTableWidgetItem(str(orphans_count)))
-
-        except Exception as e:
-            print(f"Error loading deceased people: {e}")
-            QMessageBox.critical(self, "خطأ", f"فشل تحميل بيانات المتوفين:\n{str(e)}")
-    
-    def load_guardians_list(self):
-        try:
-            guardians_data = self.db_service.get_guardians_list()
-            
-            table = self.guardians_table
-            table.setRowCount(0) # Clear existing rows
-            
-            for row_num, (guardian, orphan_count) in enumerate(guardians_data):
-                table.insertRow(row_num)
-                
-                # ID
-                table.setItem(row_num, 0, QTableWidgetItem(str(guardian.id)))
-                # Name
-                table.setItem(row_num, 1, QTableWidgetItem(guardian.name))
-                # National ID
-                table.setItem(row_num, 2, QTableWidgetItem(guardian.national_id or "---"))
-                # Phone Number
-                table.setItem(row_num, 3, QTableWidgetItem(guardian.phone or "---"))
-                # Orphan Count
-                table.setItem(row_num, 4, QTableWidgetItem(str(orphan_count)))
-                
-        except Exception as e:
-            print(f"Error loading guardians list: {e}")
-            QMessageBox.critical(self, "خطأ", f"حدث خطأ أثناء تحميل بيانات الأوصياء:\n{e}")
-    
-    def load_orphans_list(self):
-        try:
-            orphans = self.db_service.get_orphans_list()
-
-            table = self.orphans_table
-            table.setRowCount(len(orphans))
-
-            for row_idx, orphan in enumerate(orphans):
-                table.setItem(row_idx, 0, QTableWidgetItem(str(orphan.id)))
-                table.setItem(row_idx, 1, QTableWidgetItem(orphan.name))
-                table.setItem(row_idx, 2, QTableWidgetItem(orphan.national_id or "---"))
-                table.setItem(row_idx, 3, QTableWidgetItem(
-                    orphan.date_birth.strftime("%d/%m/%Y")
-                    if orphan.date_birth else "---"
-                ))
-                gender_str = "ذكر" if orphan.gender.value == 1 else "أنثى"
-                table.setItem(row_idx, 4, QTableWidgetItem(gender_str))
-                
-                table.setItem(row_idx, 5, QTableWidgetItem(str(orphan.age)))
-                
-                primary_guardian = next(
-                    (link.guardian for link in orphan.guardian_links if link.is_primary),
-                    None
-                )
-
-                guardian_name = primary_guardian.name if primary_guardian else "---"
-                table.setItem(row_idx, 6, QTableWidgetItem(guardian_name))
-
-        except Exception as e:
-            print(f"Error loading all orphans: {e}")
-            QMessageBox.critical(self, "خطأ", f"فشل تحميل بيانات الأيتام:\n{str(e)}")
-
-    def load_orphans_older_than_or_equal_18_list(self):
-        try:
-            orphans = self.db_service.get_orphans_older_than_or_equal_18_list()
-
-            table = self.orphans_older_or_equal_18_table
-            table.setRowCount(len(orphans))
-
-            for row_idx, orphan in enumerate(orphans):
-                table.setItem(row_idx, 0, QTableWidgetItem(str(orphan.id)))
-                table.setItem(row_idx, 1, QTableWidgetItem(orphan.name))
-                table.setItem(row_idx, 2, QTableWidgetItem(orphan.national_id or "---"))
-                table.setItem(row_idx, 3, QTableWidgetItem(
-                    orphan.date_birth.strftime("%d/%m/%Y") if orphan.date_birth else "---"
-                ))
-                gender_str = "ذكر" if orphan.gender.value == 1 else "أنثى"
-                table.setItem(row_idx, 4, QTableWidgetItem(gender_str))
-                table.setItem(row_idx, 5, QTableWidgetItem(str(orphan.age)))
+    def init_list_views(self):
+        """
+        استبدال جداول القوائم (QTableWidget) بعروض QTableView مربوطة بنماذج
+        LazyTableModel تجلب الصفوف على دفعات أثناء التمرير بدل أزرار الصفحات.
+        الترتيب بالضغط على رأس العمود والتصفية من الشريط أعلى الجدول يُنفذان في قاعدة البيانات.
+        """
+        gender_options = [(GenderEnum.male.value, "ذكر"), (GenderEnum.female.value, "أنثى")]
+        person_filters = [
+            ("name", "الاسم يحتوي...", "text", None),
+            ("national_id", "رقم الهوية", "text", None),
+        ]
+        orphan_sort_keys = ["id", "name", "national_id", "date_birth", "gender", "age"]
+        orphan_filters = person_filters + [
+            ("gender", "الجنس", "choice", gender_options),
+            ("date", "تاريخ الميلاد", "date_range", None),
+        ]
+        # العناصر تُذكر بأسمائها لأن جدول سجل النشاطات يُبنى مع صفحته عند أول زيارة
+        self._list_tab_specs = {
+            4: ("deceased_people", "deceased_people_table", "pagination_label", ("next_btn", "prev_btn"),
+                DBService.get_deceased_people_paginated, self.format_deceased_row,
+                ["id", "name", "national_id", "date_death", "account_number", "archives_number", "orphans_count"],
+                person_filters + [("date", "تاريخ الوفاة", "date_range", None), ("orphans", "عدد الأيتام", "int_range", None)]),
+            5: ("guardians", "guardians_table", "pagination_label_2", ("next_btn_2", "prev_btn_2"),
+                DBService.get_guardians_paginated, self.format_guardian_row,
+                ["id", "name", "national_id", "phone", "orphans_count"],
+                person_filters + [("orphans", "عدد الأيتام", "int_range", None)]),
+            6: ("orphans", "orphans_table", "pagination_label_3", ("next_btn_3", "prev_btn_3"),
+                DBService.get_orphans_paginated, self.format_orphan_row,
+                orphan_sort_keys + ["guardian"],
+                orphan_filters + [("guardian", "اسم الوصي...", "text", None)]),
+            7: ("orphans_older_or_equal_18", "orphans_older_or_equal_18_table", "pagination_label_4", ("next_btn_4", "prev_btn_4"),
+                DBService.get_orphans_older_than_or_equal_18_paginated, self.format_orphan_older_equal_18_row,
+                orphan_sort_keys, orphan_filters),
+            11: ("activity_logs", "activity_logs_table", "pagination_label_5", ("next_btn_5", "prev_btn_5"),
+                 DBService.get_activity_logs_paginated, self.format_activity_log_row,
+                 ["id", "created_at", "user", "action", "resource_type", None],
+                 [("user_id", "المستخدم", "choice", []),
+                  ("action", "العملية", "choice", []),
+                  ("resource_type", "المورد", "choice", []),
+                  ("resource_id", "رقم السجل", "text", None),
+                  ("date", "التاريخ", "date_range", None)]),
+        }
 
-        except Exception as e:
-            print(f"Error loading orphans older than or equal 18: {e}")
-            QMessageBox.critical(self, "خطأ", f"فشل تحميل بيانات الأيتام الأكبر من 18 سنة:\n{str(e)}")
+        self.list_models = {}
+        self.list_filter_bars = {}
+        for tab_index in self._list_tab_specs:
+            page = self.tabWidget.widget(tab_index)
+            if page.objectName() not in self._lazy_page_setups:
+                self.init_list_tab(tab_index)
+
+    def init_list_tab(self, tab_index):
+        name, table_name, label_name, button_names, fetch_func, formatter, sort_keys, filter_fields = self._list_tab_specs[tab_index]
+        table = getattr(self, table_name)
+        label = getattr(self, label_name)
+        headers = [
+            table.horizontalHeaderItem(col).text() if table.horizontalHeaderItem(col) else ""
+            for col in range(table.columnCount())
+        ]
+        model = LazyTableModel(headers, fetch_func, formatter, chunk_size=100, sort_keys=sort_keys, parent=self)
+        view = self._replace_table_with_view(table, model)
+        filter_bar = self._add_filter_bar(view, filter_fields)
+        filter_bar.filters_changed.connect(model.set_filters)
+        model.loaded_changed.connect(
+            lambda loaded, total, lbl=label: lbl.setText(f"عرض {loaded} من {total}")
+        )
+        model.loading_changed.connect(
+            lambda loading, lbl=label: loading and lbl.setText("جاري التحميل...")
+        )
+        model.load_failed.connect(
+            lambda message: QMessageBox.critical(self, "خطأ", f"فشل تحميل البيانات:\n{message}")
+        )
+        for btn_name in button_names:
+            getattr(self, btn_name).hide()
+
+        setattr(self, f"{name}_model", model)
+        setattr(self, f"{name}_view", view)
+        self.list_models[tab_index] = model
+        self.list_filter_bars[tab_index] = filter_bar
+
+    def _add_filter_bar(self, view, fields):
+        """وضع شريط التصفية فوق الجدول مباشرة (مع تقليص ارتفاع الجدول بمقدار الشريط)."""
+        filter_bar = ListFilterBar(fields, view.parentWidget())
+        layout = view.parentWidget().layout() if view.parentWidget() else None
+        if layout is not None and layout.indexOf(view) != -1:
+            layout.insertWidget(layout.indexOf(view), filter_bar)
+        else:
+            bar_height = 32
+            geometry = view.geometry()
+            filter_bar.setGeometry(geometry.x(), geometry.y(), geometry.width(), bar_height)
+            view.setGeometry(geometry.x(), geometry.y() + bar_height + 4, geometry.width(), geometry.height() - bar_height - 4)
+        filter_bar.show()
+        return filter_bar
+
+    def _replace_table_with_view(self, table: QTableWidget, model):
+        view = QTableView(table.parentWidget())
+        view.setObjectName(f"{table.objectName()}_view")
+        view.setFont(table.font())
+        view.setLayoutDirection(table.layoutDirection())
+        view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        view.setAlternatingRowColors(table.alternatingRowColors())
+        view.verticalHeader().setVisible(False)
+        view.horizontalHeader().setStretchLastSection(table.horizontalHeader().stretchLastSection())
+        view.setModel(model)
+        for col in range(table.columnCount()):
+            view.setColumnWidth(col, table.columnWidth(col))
+            view.setColumnHidden(col, table.isColumnHidden(col))
+        # الترتيب الافتراضي: الأحدث أولاً (المعرّف تنازلياً)
+        view.horizontalHeader().setSortIndicator(0, Qt.SortOrder.DescendingOrder)
+        view.setSortingEnabled(True)
+
+        layout = table.parentWidget().layout() if table.parentWidget() else None
+        if layout is not None and layout.indexOf(table) != -1:
+            layout.replaceWidget(table, view)
+        else:
+            view.setGeometry(table.geometry())
+        table.hide()
+        view.show()
+        return view
+
+    def reload_list_tab(self, tab_index):
+        model = self.list_models.get(tab_index)
+        if model is None:
+            return
+        if tab_index == 11:
+            self.refresh_activity_log_filter_options()
+        model.reload()
+
+    def refresh_activity_log_filter_options(self):
+        # الخيارات مخزنة مؤقتاً في DBService فلا تكلف استعلاماً عند كل فتح للتبويب
+        with self.db_service.session_scope():
+            options = self.db_service.get_list_filter_options()
+        filter_bar = self.list_filter_bars[11]
+        filter_bar.set_choices("user_id", options["users"])
+        filter_bar.set_choices("action", [
+            (a, {"delete": "حذف", "create": "إنشاء", "update": "تعديل"}.get(a.lower(), a)) for a in options["actions"]
+        ])
+        filter_bar.set_choices("resource_type", [
+            (r, ar_resource_types.get(r, r)) for r in options["resource_types"]
+        ])
 
-    # ==== Pagination Tables ====
-    def load_table_paginated(self, table, pagination, pagination_label, fetch_func, row_renderer):
-        result = fetch_func(pagination.page, pagination.per_page)
+    # الصفوف من طبقة القراءة (services/read_models): namedtuple بالأعمدة المعروضة فقط
+    def format_deceased_row(self, d):
+        return [
+            str(d.id),
+            d.name,
+            d.national_id or "---",
+            d.date_death.strftime("%d/%m/%Y") if d.date_death else "---",
+            d.account_number or "---",
+            d.archives_number or "---",
+            str(d.orphans_count),
+        ]
 
-        pagination.update(result)
+    def format_guardian_row(self, guardian):
+        return [
+            str(guardian.id),
+            guardian.name,
+            guardian.national_id or '---',
+            guardian.phone or "---",
+            str(guardian.orphans_count),
+        ]
 
-        items = result["items"]
-        table.setRowCount(len(items))
+    def format_orphan_row(self, orphan):
+        return [
+            *self.format_orphan_older_equal_18_row(orphan),
+            orphan.guardian_name or "---",
+        ]
 
-        for row, item in enumerate(items):
-            row_renderer(table, row, item)
+    def format_orphan_older_equal_18_row(self, orphan):
+        return [
+            str(orphan.id),
+            orphan.name,
+            orphan.national_id or "---",
+            orphan.date_birth.strftime("%d/%m/%Y") if orphan.date_birth else "---",
+            "ذكر" if orphan.gender.value == 1 else "أنثى",
+            str(orphan.age),
+        ]
 
-        self.update_pagination_label(pagination, pagination_label)
-    
-    def render_deceased_row(self, table, row, data):
-        d, orphans_count = data
-        table.setItem(row, 0, QTableWidgetItem(str(d.id)))
-        table.setItem(row, 1, QTableWidgetItem(d.name))
-        table.setItem(row, 2, QTableWidgetItem(d.national_id or "---"))
-        table.setItem(row, 3, QTableWidgetItem(
-            d.date_death.strftime("%d/%m/%Y") if d.date_death else "---"
-        ))
-        table.setItem(row, 4, QTableWidgetItem(d.account_number or "---"))
-        table.setItem(row, 5, QTableWidgetItem(d.archives_number or "---"))
-        table.setItem(row, 6, QTableWidgetItem(str(orphans_count)))
-    
-    def render_guardian_row(self, table, row, data):
-        guardian, orphan_count = data
-        table.setItem(row, 0, QTableWidgetItem(str(guardian.id)))
-        table.setItem(row, 1, QTableWidgetItem(guardian.name))
-        table.setItem(row, 2, QTableWidgetItem(guardian.national_id or '---'))
-        table.setItem(row, 3, QTableWidgetItem(guardian.phone or "---"))
-        table.setItem(row, 4, QTableWidgetItem(str(orphan_count)))
-    
-    def render_orphan_row(self, table, row, orphan):
-        table.setItem(row, 0, QTableWidgetItem(str(orphan.id)))
-        table.setItem(row, 1, QTableWidgetItem(orphan.name))
-        table.setItem(row, 2, QTableWidgetItem(orphan.national_id or "---"))
-        table.setItem(row, 3, QTableWidgetItem(
-            orphan.date_birth.strftime("%d/%m/%Y") if orphan.date_birth else "---"
-        ))
-        gender_str = "ذكر" if orphan.gender.value == 1 else "أنثى"
-        table.setItem(row, 4, QTableWidgetItem(gender_str))
-        table.setItem(row, 5, QTableWidgetItem(str(orphan.age)))
-
-        primary_guardian = next(
-            (l.guardian for l in orphan.guardian_links if l.is_primary),
-            None
-        )
-        table.setItem(row, 6, QTableWidgetItem(
-            primary_guardian.name if primary_guardian else "---"
-        ))
-    
-    def render_orphan_older_equal_18_row(self, table, row, orphan):
-        table.setItem(row, 0, QTableWidgetItem(str(orphan.id)))
-        table.setItem(row, 1, QTableWidgetItem(orphan.name))
-        table.setItem(row, 2, QTableWidgetItem(orphan.national_id or "---"))
-        table.setItem(row, 3, QTableWidgetItem(
-            orphan.date_birth.strftime("%d/%m/%Y") if orphan.date_birth else "---"
-        ))
-        gender_str = "ذكر" if orphan.gender.value == 1 else "أنثى"
-        table.setItem(row, 4, QTableWidgetItem(gender_str))
-        table.setItem(row, 5, QTableWidgetItem(str(orphan.age)))
-
-    def render_activity_log_row(self, table, row, activity):
+    def format_activity_log_row(self, activity):
         formatted_date = activity.created_at.strftime("%Y-%m-%d %H:%M")
-        
+
         # تحويل العملية للعربية
         action = activity.action.lower()
         ar_action = {"delete": "حذف", "create": "إنشاء", "update": "تعديل"}.get(action, action)
+        action_color = {
+            "delete": Qt.GlobalColor.red,
+            "create": Qt.GlobalColor.darkGreen,
+            "update": Qt.GlobalColor.darkBlue,
+        }.get(action, Qt.GlobalColor.black)
 
-        # --- التعديل هنا: تحويل نوع المورد للعربية ---
         # نستخدم .get لجلب القيمة العربية، وإذا لم توجد نضع النص الأصلي
         ar_resource = ar_resource_types.get(activity.resource_type, activity.resource_type)
-        
-        # إضافة الخلايا
-        table.setItem(row, 0, self._create_readonly_item(str(activity.id)))
-        table.setItem(row, 1, self._create_readonly_item(formatted_date))
-        table.setItem(row, 2, self._create_readonly_item(activity.user.username))
-        table.setItem(row, 3, self._create_readonly_item(ar_action))
-        table.setItem(row, 4, self._create_readonly_item(ar_resource)) # عرض الاسم العربي
-        table.setItem(row, 5, self._create_readonly_item(activity.description))
-        
-        if action == "delete":
-            table.item(row, 3).setForeground(Qt.GlobalColor.red)
-        elif action == "create":
-            table.item(row, 3).setForeground(Qt.GlobalColor.darkGreen)
-        elif action == "update":
-            table.item(row, 3).setForeground(Qt.GlobalColor.darkBlue)
-        else:
-            table.item(row, 3).setForeground(Qt.GlobalColor.black)
-
-    def update_pagination_label(self, pagination, pagination_label):
-        # Use pagination object to compute pages and current page for the label
-        pages = getattr(pagination, 'pages', None)
-        if pages is None:
-            total = getattr(pagination, 'total', 0)
-            per = getattr(pagination, 'per_page', 1)
-            pages = max(1, math.ceil(total / per)) if per else 1
-        current = getattr(pagination, 'page', 1)
-        pagination_label.setText(f"الصفحة {current} من {pages}")
-
-    def next_page(self, pagination=None):
-        # If this method is connected directly to a button click, Qt will pass
-        # a boolean `checked` argument. Handle that by inferring which
-        # pagination controller to use based on the currently active main tab.
-        if isinstance(pagination, bool) or pagination is None:
-            tab = self.tabWidget.currentIndex()
-            if tab == 3:
-                pagination = self.deceased_pagination
-            elif tab == 4:
-                pagination = self.guardians_pagination
-            elif tab == 5:
-                pagination = self.orphans_pagination
-            elif tab == 6:
-                pagination = self.orphans_older_or_equal_18_pagination
-            elif tab == 10:
-                pagination = self.activity_log_pagination
-            else:
-                return
-        pagination.next()
-        self.reload_current_tab()
-
-    def prev_page(self, pagination=None):
-        if isinstance(pagination, bool) or pagination is None:
-            tab = self.tabWidget.currentIndex()
-            if tab == 3:
-                pagination = self.deceased_pagination
-            elif tab == 4:
-                pagination = self.guardians_pagination
-            elif tab == 5:
-                pagination = self.orphans_pagination
-            elif tab == 6:
-                pagination = self.orphans_older_or_equal_18_pagination
-            elif tab == 10:
-                pagination = self.activity_log_pagination
-            else:
-                return
-        pagination.prev()
-        self.reload_current_tab()
+
+        return [
+            str(activity.id),
+            formatted_date,
+            activity.username or "---",
+            (ar_action, action_color),
+            ar_resource,
+            activity.description,
+        ]
 
     def reload_current_tab(self):
-        tab = self.tabWidget.currentIndex()
-        # Deceased (index 3) - paginated
-        if tab == 3:
-            self.load_table_paginated(
-                self.deceased_people_table,
-                self.deceased_pagination,
-                self.pagination_label,
-                self.db_service.get_deceased_people_paginated,
-                self.render_deceased_row,
-            )
-        # Guardians (index 4) - prefer paginated fetcher, fallback to non-paginated loader
-        elif tab == 4:
-            try:
-                self.load_table_paginated(
-                    self.guardians_table,
-                    self.guardians_pagination,
-                    self.pagination_label_2,
-                    self.db_service.get_guardians_paginated,
-                    self.render_guardian_row,
-                )
-            except Exception:
-                self.load_guardians_list()
-        # Orphans (index 5) - paginated
-        elif tab == 5:
-            try:
-                self.load_table_paginated(
-                    self.orphans_table,
-                    self.orphans_pagination,
-                    self.pagination_label_3,
-                    self.db_service.get_orphans_paginated,
-                    lambda table, row, orphan: self.render_orphan_row(table, row, orphan),
-                )
-            except Exception:
-                self.load_orphans_list()
-        # Orphans older than or equal to 18 (index 6) - non-paginated
-        elif tab == 6:
-            try:
-                self.load_table_paginated(
-                    self.orphans_older_or_equal_18_table,
-                    self.orphans_older_or_equal_18_pagination,
-                    self.pagination_label_4,
-                    self.db_service.get_orphans_older_than_or_equal_18_paginated,
-                    lambda table, row, orphan: self.render_orphan_older_equal_18_row(table, row, orphan)
-                )
-            except Exception:
-                self.load_orphans_older_than_or_equal_18_list()
-        elif tab == 10:
-            # try:
-                self.load_table_paginated(
-                    self.activity_logs_table,
-                    self.activity_log_pagination,
-                    self.pagination_label_5,
-                    self.db_service.get_activity_logs_paginated,
-                    lambda table, row, activity: self.render_activity_log_row(table, row, activity),
-                )
-            # except Exception:
-            #     self.load_activity_log_list()
-        else:
-            # No paginated content on other tabs
-            pass
+        self.reload_list_tab(self.tabWidget.currentIndex())
 
     # ==== User Tab Methods ====
     # دالة لتبديل تفعيل الحقول قبل البحث الحقول غير مفعلة بعد البحث الحقول تتفعل
@@ -8042,6 +8168,8 @@ class MainWindow(QMainWindow, FORM_CLASS):
             QMessageBox.information(self, "نجاح", "تم تحديث بيانات المستخدم بنجاح")
             self.clear_user_update_btn.click()
             self.toggle_user_inputs(False)
+            if user.id == self.current_user.id:
+                refresh_user_permissions(self.current_user, db)
             self.check_permissions()
         except ValueError as ve:
             db.rollback()
@@ -8062,8 +8190,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
     
     # ==== Roles Tab Methods ====
     def load_roles(self):
-        db = self.db_service.session
-        roles = db.query(Role).all()
+        roles = reference_cache.roles()
         table = self.roles_table
         table.setRowCount(len(roles))
         for row_idx, role in enumerate(roles):
@@ -8149,6 +8276,8 @@ class MainWindow(QMainWindow, FORM_CLASS):
             self.role_name_input.clear()
             QMessageBox.information(self, "نجاح", "تم حذف الدور بنجاح!")
             self.load_roles()
+            refresh_user_permissions(self.current_user, db)
+            self.check_permissions()
         except Exception as e:
             QMessageBox.critical(self, "خطأ", f"حدث خطأ غير متوقع: {str(e)}")
 
@@ -8164,8 +8293,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
     def load_roles_combo(self, comboBox: QComboBox):
         comboBox.clear()
 
-        db = self.db_service.session
-        roles = db.query(Role).order_by(Role.name).all()
+        roles = reference_cache.roles()
 
         # عنصر افتراضي
         comboBox.addItem("اختر الدور", None)
@@ -8186,11 +8314,11 @@ class MainWindow(QMainWindow, FORM_CLASS):
             self.permissions_table.setRowCount(0)
             return
 
-        db = self.db_service.session
-        permissions = db.query(Permission).all()
+        permissions = reference_cache.permissions()
         
-        role_permissions = db.query(RolePermission.permission_id)\
-            .filter(RolePermission.role_id == role_id).all()
+        with self.db_service.session_scope() as db:
+            role_permissions = db.query(RolePermission.permission_id)\
+                .filter(RolePermission.role_id == role_id).all()
         role_permission_ids = {p[0] for p in role_permissions}
 
         # --- الإصلاح هنا: معالجة الـ Enum ---
@@ -8281,6 +8409,7 @@ class MainWindow(QMainWindow, FORM_CLASS):
             log_activity(self.db_service.session, self.current_user.id, ActionTypes.UPDATE, ResourceTypes.PERMISSION, description=f"تم حفظ الصلاحيات للدور : {role.name}.")
             print(f"Successfully saved {count} permissions.")
             QMessageBox.information(self, "نجاح", f"تم حفظ {count} من الصلاحيات بنجاح")
+            refresh_user_permissions(self.current_user, db)
             self.check_permissions()
             if not has_permission(self.current_user, 'Permissions', PermissionEnum.view):
                 self.set_sellected_list_item(self.listWidget, 0)
@@ -8330,12 +8459,41 @@ class MainWindow(QMainWindow, FORM_CLASS):
             
             if path:
                 # استخدام obj.id مباشرة بدلاً من متغيرات خارجية
-                generate_report(entity_type, obj.id, path, self.current_user)
-                QMessageBox.information(self, "تم", f"تم حفظ التقرير بنجاح")
+                self.run_report_job(submit_report(entity_type, obj.id, path, self.current_user.name))
         except Exception as e:
             print(e)
             QMessageBox.critical(self, "خطأ", f"فشل التصدير: {str(e)}")
 
+    def run_report_job(self, job):
+        """نافذة تقدم غير حاجبة لتقرير يُصدَّر في الخلفية (services/report_pool) مع إمكانية الإيقاف"""
+        progress = QProgressDialog("جمع البيانات", "إيقاف التصدير", 0, 100, self)
+        progress.setWindowTitle("تصدير التقرير")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        # إغلاق النافذة بعد الانتهاء يرسل canceled أيضاً، والإيقاف بعد الانتهاء لا يفعل شيئاً
+        progress.canceled.connect(job.cancel)
+
+        def on_progress(percent, text):
+            progress.setValue(percent)
+            progress.setLabelText(text)
+
+        def on_finished(path):
+            progress.close()
+            QMessageBox.information(self, "تم", "تم حفظ التقرير بنجاح")
+
+        def on_failed(error):
+            progress.close()
+            QMessageBox.critical(self, "خطأ", f"فشل التصدير: {str(error)}")
+
+        job.progress.connect(on_progress)
+        job.finished.connect(on_finished)
+        job.failed.connect(on_failed)
+        job.cancelled.connect(progress.close)
+        self.report_job = job  # مرجع حتى انتهاء التصدير
+        progress.show()
+
     def export_t_table_report(self):
         try:
             if not self.current_deceased_for_t_table:
@@ -8347,27 +8505,13 @@ class MainWindow(QMainWindow, FORM_CLASS):
                 QMessageBox.warning(self, "تنبيه", "يرجى اختيار العملة قبل تصدير التقرير.")
                 return
 
-            dialog = ExportFinancialTableDialog(self)
-            if not dialog.exec():
-                return
-
-            file_format = dialog.selected_format
-            ext = "pdf" if file_format == "pdf" else "xlsx"
-            default_name = f"تقرير_حركات_المتوفى_{self.current_deceased_for_t_table.id}_{date.today().strftime('%Y%m%d')}.{ext}"
-            filter_text = "PDF Files (*.pdf)" if file_format == "pdf" else "Excel Files (*.xlsx)"
-            path, _ = QFileDialog.getSaveFileName(self, "حفظ تقرير جدول الحركات", default_name, filter_text)
-            if not path:
-                return
-
-            generate_financial_table_report(
-                deceased_id=self.current_deceased_for_t_table.id,
-                currency_id=currency_id,
-                output_path=path,
-                db_service=self.db_service,
-                exported_by=self.current_user.name if self.current_user else "---",
-                file_format=file_format,
+            dialog = ExportFinancialTableDialog(
+                self.current_deceased_for_t_table.id,
+                currency_id,
+                self.current_user.name if self.current_user else "---",
+                self,
             )
-            QMessageBox.information(self, "نجاح", "تم تصدير تقرير جدول الحركات بنجاح.")
+            dialog.exec()
         except Exception as e:
             QMessageBox.critical(self, "خطأ", f"تعذر تصدير تقرير جدول الحركات: {str(e)}")
     
@@ -8513,46 +8657,6 @@ class MainWindow(QMainWindow, FORM_CLASS):
             self.label_164.show()
             self.lineEdit_34.show()
     
-    def load_activity_log_list(self):
-        table = self.activity_logs_table
-        session = self.db_service.session
-        logs = session.query(ActivityLog).join(User).order_by(ActivityLog.created_at.desc()).all()
-
-        # 2. إعداد إعدادات الجدول الأساسية
-        table.setRowCount(0)  # تفريغ الجدول قبل التحديث
-        
-        # 3. تعبئة البيانات
-        for row_number, log in enumerate(logs):
-            table.insertRow(row_number)
-            
-            # تنسيق التاريخ
-            formatted_date = log.created_at.strftime("%Y-%m-%d %H:%M")
-            
-            # تحويل العملية للعربية
-            action = log.action.lower()
-            ar_action = {"delete": "حذف", "create": "إنشاء", "update": "تعديل"}.get(action, action)
-
-            # --- التعديل هنا: تحويل نوع المورد للعربية ---
-            # نستخدم .get لجلب القيمة العربية، وإذا لم توجد نضع النص الأصلي
-            ar_resource = ar_resource_types.get(log.resource_type, log.resource_type)
-            
-            # إضافة الخلايا
-            table.setItem(row_number, 0, self._create_readonly_item(str(log.id)))
-            table.setItem(row_number, 1, self._create_readonly_item(formatted_date))
-            table.setItem(row_number, 2, self._create_readonly_item(log.user.username))
-            table.setItem(row_number, 3, self._create_readonly_item(ar_action))
-            table.setItem(row_number, 4, self._create_readonly_item(ar_resource)) # عرض الاسم العربي
-            table.setItem(row_number, 5, self._create_readonly_item(log.description))
-            
-            if action == "delete":
-                table.item(row_number, 3).setForeground(Qt.GlobalColor.red)
-            elif action == "create":
-                table.item(row_number, 3).setForeground(Qt.GlobalColor.darkGreen)
-            elif action == "update":
-                table.item(row_number, 3).setForeground(Qt.GlobalColor.darkBlue)
-            else:
-                table.item(row_number, 3).setForeground(Qt.GlobalColor.black)
-
     def handle_logout(self):
         reply = QMessageBox.question(self, 'خروج', "هل أنت متأكد من تسجيل الخروج؟", 
                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
@@ -8562,8 +8666,8 @@ class MainWindow(QMainWindow, FORM_CLASS):
     
     def load_users_list(self):
         table = self.users_table
-        session = self.db_service.session
-        users = session.query(User).join(Role, isouter=True).order_by(User.id).all()
+        with self.db_service.session_scope() as session:
+            users = session.query(User).options(joinedload(User.role)).order_by(User.id).all()
 
         table.setRowCount(0)  # تفريغ الجدول قبل التحديث
 
@@ -8661,29 +8765,35 @@ class MainWindow(QMainWindow, FORM_CLASS):
     
     # ===== Close Event =====
     def closeEvent(self, event):
+        query_executor.shutdown()
         self.db_service.close()
         event.accept()
 
 # ===== Main =====
 def main():
-    app = QApplication(sys.argv)
+    with startup_tracer.phase("QApplication"):
+        app = QApplication(sys.argv)
+    # عند إنهاء التطبيق فقط، لا عند إغلاق النافذة الرئيسية (تسجيل الخروج يغلقها أيضاً)
+    app.aboutToQuit.connect(report_pool.shutdown)
+    app.aboutToQuit.connect(activity_log_writer.shutdown)
     
-    translator = QTranslator()
-    qt_translator = QTranslator()
-    translator_path = resource_path(os.path.join("locale", "ar", "qt_ar.qm"))
-    translator.load(translator_path)
-    qt_translator.load(
-        "qt_ar",
-        QLibraryInfo.path(QLibraryInfo.LibraryPath.TranslationsPath)
-    )
-    app.installTranslator(translator)
-    app.installTranslator(qt_translator)
+    with startup_tracer.phase("translators"):
+        translator = QTranslator()
+        qt_translator = QTranslator()
+        translator_path = resource_path(os.path.join("locale", "ar", "qt_ar.qm"))
+        translator.load(translator_path)
+        qt_translator.load(
+            "qt_ar",
+            QLibraryInfo.path(QLibraryInfo.LibraryPath.TranslationsPath)
+        )
+        app.installTranslator(translator)
+        app.installTranslator(qt_translator)
 
     # تحميل style.qss بشكل محسّن (استخدام try/except لتقليل البطء)
     style_path = resource_path(os.path.join("assets", "style.qss"))
     
     try:
-        with open(style_path, "r", encoding="utf-8") as f:
+        with startup_tracer.phase("style.qss"), open(style_path, "r", encoding="utf-8") as f:
             stylesheet = f.read()
             # تطبيق الستايل بشكل فوري وإجمالي بدل التطبيق المتدرج
             app.setStyleSheet(stylesheet)
@@ -8699,25 +8809,39 @@ def main():
     # logger.info(f"=" * 50)
     
     # تهيئة قاعدة البيانات (بدون تحميل الخطوط في exe)
-    db = DBService()
+    with startup_tracer.phase("DBService"):
+        db = DBService()
     
     # إنشاء نافذة تسجيل الدخول فقط في البداية (أسرع)
-    login_win = LoginWindow(db)
+    with startup_tracer.phase("LoginWindow"):
+        login_win = LoginWindow(db)
     
-    # سيتم تأجيل إنشاء MainWindow إلى ما بعد نجاح تسجيل الدخول
+    # تُنشأ MainWindow مسبقاً بعد ظهور نافذة الدخول (أثناء كتابة المستخدم لبياناته)
     main_win = None
 
-    # --- عند نجاح تسجيل الدخول ---
-    def on_login_success(user):
+    def ensure_main_window():
         nonlocal main_win
-        
-        # إنشاء MainWindow فقط بعد تسجيل الدخول (أسرع تجربة)
         if main_win is None:
             logger.info("جاري تحميل النافذة الرئيسية...")
-            main_win = MainWindow(db)
+            with startup_tracer.phase("MainWindow"):
+                main_win = MainWindow(db)
             # ربط إشارة الخروج بعد إنشاء MainWindow
             main_win.logout_signal.connect(on_logout)
-        
+            # اكتمال البدء: نافذة الدخول ظاهرة والنافذة الرئيسية جاهزة
+            startup_tracer.finish()
+        return main_win
+
+    def preload_main_window():
+        # إن سبق تسجيل الدخول التحميل المسبق فالنافذة موجودة بالفعل
+        try:
+            ensure_main_window()
+        except Exception as e:
+            # لا نوقف شاشة الدخول؛ ستُعاد المحاولة عند نجاح تسجيل الدخول
+            logger.warning(f"Could not preload main window: {e}")
+
+    # --- عند نجاح تسجيل الدخول ---
+    def on_login_success(user):
+        ensure_main_window()
         main_win.setup_user_session(user) 
         main_win.show()
         login_win.hide()
@@ -8738,6 +8862,13 @@ def main():
     login_win.login_success_signal = on_login_success
     
     login_win.show()
+    startup_tracer.mark("login window shown")
+    # مهلة قصيرة حتى تُرسم نافذة الدخول أولاً ثم تُبنى النافذة الرئيسية في حلقة الأحداث
+    QTimer.singleShot(MAIN_WINDOW_PRELOAD_DELAY_MS, preload_main_window)
+    # كتابة مقاييس العمليات دورياً إلى metrics.prom و metrics.csv في مجلد بيانات التطبيق (utils/metrics.py)
+    metrics.start_periodic_flush()
+    # مراقبة تجمّد حلقة الأحداث (utils/stall_watchdog.py)
+    stall_watchdog.start()
     # معالجة غلق التطبيق بدون تسجيل دخول
     sys.exit(app.exec())
 
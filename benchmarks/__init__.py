@@ -0,0 +1 @@
+# Benchmarks package - سكربتات قياس الأداء (تعمل بدون واجهة على SQLite)
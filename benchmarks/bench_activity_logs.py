@@ -0,0 +1,153 @@
+"""
+قياس تصفح سجل النشاطات بالمؤشر (keyset) مقابل LIMIT/OFFSET، وأثر الأرشفة على الجدول النشط.
+
+- deep_page_*: صفحة عميقة (--depth من عدد الصفحات) كما كانت تُقرأ سابقاً (عد + OFFSET)
+  مقابل search_activity_logs من مؤشر الصفحة السابقة (ما تفعله get_activity_logs_paginated
+  عند الانتقال للصفحة التالية)، بلا فلتر ومع فلتر مستخدم.
+- first_page_after_archive: الصفحة الأولى مع العد قبل الأرشفة وبعدها.
+ثم زمن archive_activity_logs وحجم الأرشيف المضغوط. يفشل السكربت (رمز خروج 1) إذا كانت
+النسخة الحالية أبطأ أو أعادت صفوفاً مختلفة.
+
+التشغيل: python -m benchmarks.bench_activity_logs [--logs 200000] [--per-page 100] [--depth 0.8]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+import database.db as db_module
+from benchmarks.dataset import _insert, create_benchmark_engine
+from database.models import ActivityLog, ActivityLogArchive, User
+from services import read_models
+from services.activity_archive import archive_activity_logs
+from services.db_services import DBService
+
+NOW = datetime(2026, 1, 1)
+USERS = 5
+ACTIONS = ["create", "update", "delete", "login"]
+RESOURCES = ["orphan", "guardian", "deceased", "transaction"]
+
+
+def seed_activity_logs(engine, logs, days=1000, seed=42):
+    """سجلات موزعة على days يوماً قبل NOW، مُدخلة بترتيب زمني كما تُكتب فعلياً."""
+    rnd = random.Random(seed)
+    step = timedelta(days=days) / logs
+    with engine.begin() as conn:
+        _insert(conn, User, [{"id": i, "name": f"user {i}", "username": f"user{i}", "password": "x"} for i in range(1, USERS + 1)])
+        _insert(conn, ActivityLog, [{
+            "user_id": rnd.randint(1, USERS),
+            "action": rnd.choice(ACTIONS),
+            "resource_type": rnd.choice(RESOURCES),
+            "resource_id": rnd.randint(1, 10_000),
+            "description": f"عملية رقم {i}",
+            "created_at": NOW - timedelta(days=days) + step * i,
+        } for i in range(logs)])
+
+
+def legacy_page(service, page, per_page, filters):
+    """عد + LIMIT/OFFSET كما كانت get_activity_logs_paginated."""
+    stmt = service._filter_activity_logs(read_models.activity_log_list_select(), filters)
+    stmt = service._apply_sort(stmt, None, service.ACTIVITY_LOG_SORT_COLUMNS, ActivityLog.id)
+    return read_models.fetch_page(service.session.connection(), stmt, read_models.ActivityLogRow, page, per_page)["items"]
+
+
+def cursor_before(service, page, per_page, filters):
+    """مؤشر آخر صف في الصفحة page - 1 (يُحسب مرة خارج القياس)."""
+    if page == 1:
+        return None
+    stmt = service._filter_activity_logs(select(ActivityLog.id), filters).order_by(ActivityLog.id.desc())
+    return (service.session.execute(stmt.offset((page - 1) * per_page - 1).limit(1)).scalar_one(),)
+
+
+def timed(case, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = case()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logs", type=int, default=200_000)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--depth", type=float, default=0.8)
+    parser.add_argument("--retention-days", type=int, default=365)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--db-url", default=None, help="رابط قاعدة بيانات بديلة (افتراضياً SQLite مؤقتة)")
+    args = parser.parse_args(argv)
+
+    engine = create_benchmark_engine(args.db_url)
+    seed_activity_logs(engine, args.logs)
+    print(f"Dataset: {args.logs} activity logs, {USERS} users")
+
+    service = DBService()
+    per_page = args.per_page
+    regressions = []
+
+    def compare(name, legacy, current):
+        old_t, old_rows = timed(legacy, args.repeats)
+        new_t, new_rows = timed(current, args.repeats)
+        print(f"{name:<26} | {old_t * 1000:>10.2f} | {new_t * 1000:>10.2f} | {len(new_rows)}")
+        if [tuple(r) for r in old_rows] != [tuple(r) for r in new_rows]:
+            print(f"  ! {name}: rows differ")
+            regressions.append(name)
+        elif new_t > old_t:
+            regressions.append(name)
+
+    print(f"{'case':<26} | {'offset ms':>10} | {'keyset ms':>10} | rows")
+    try:
+        for label, filters in (("all", {}), ("user", {"user_id": 2})):
+            total = read_models.count_rows(
+                service.session.connection(), service._filter_activity_logs(read_models.activity_log_list_select(), filters)
+            )
+            page = max(1, int((total + per_page - 1) // per_page * args.depth))
+            cursor = cursor_before(service, page, per_page, filters)
+            compare(
+                f"deep_page_{label} (p{page})",
+                lambda: legacy_page(service, page, per_page, filters),
+                lambda: service.search_activity_logs(filters, after=cursor, limit=per_page)["items"],
+            )
+
+        before_t, before_rows = timed(lambda: service.get_activity_logs_paginated(1, per_page)["items"], args.repeats)
+        start = time.perf_counter()
+        moved = archive_activity_logs(args.retention_days, now=NOW)
+        archive_t = time.perf_counter() - start
+        service.session.rollback()
+        after_t, after_rows = timed(lambda: service.get_activity_logs_paginated(1, per_page)["items"], args.repeats)
+        print(f"{'first_page_after_archive':<26} | {before_t * 1000:>10.2f} | {after_t * 1000:>10.2f} | {len(after_rows)}")
+        if before_rows != after_rows:
+            print("  ! first_page_after_archive: rows differ")
+            regressions.append("first_page_after_archive")
+        elif after_t > before_t:
+            regressions.append("first_page_after_archive")
+
+        with db_module.SessionLocal() as session:
+            remaining = session.scalar(select(func.count(ActivityLog.id)))
+            archived, payload_bytes = session.execute(
+                select(func.sum(ActivityLogArchive.entries_count), func.sum(func.length(ActivityLogArchive.payload)))
+            ).one()
+        print(
+            f"archive: moved {moved} entries in {archive_t:.2f}s, {remaining} remain; "
+            f"{archived} archived in {payload_bytes / 1024:.0f} KiB ({payload_bytes / max(archived, 1):.1f} B/entry)"
+        )
+        if archived != moved or remaining + moved != args.logs:
+            print("  ! archive: entry counts do not add up")
+            regressions.append("archive")
+    finally:
+        service.close()
+
+    if regressions:
+        print(f"REGRESSION: {', '.join(regressions)}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
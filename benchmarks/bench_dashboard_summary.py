@@ -0,0 +1,102 @@
+"""
+قياس ملخص لوحة التحكم (services/dashboard_summary) على 50 ألف يتيم بأرصدتهم.
+
+- legacy: أربعة استعلامات COUNT كما كانت get_summary_counts، ثم استعلام مجموع لكل
+  جدول أرصدة لعرض المجاميع لكل عملة (سبع رحلات إلى القاعدة).
+- query: استعلام DASHBOARD_SUMMARY الواحد (get_summary_counts(force=True)).
+- cached: العودة إلى الصفحة الرئيسية خلال SUMMARY_TTL (بدون استعلام).
+يطبع الزمن (وسيط repeats تشغيلات) وعدد الاستعلامات المنفذة، ويفشل (رمز خروج 1) إذا
+اختلفت الأعداد أو المجاميع أو كان الاستعلام الواحد أبطأ بأكثر من 10%.
+
+التشغيل: python -m benchmarks.bench_dashboard_summary [--orphans 50000]
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import date
+
+from sqlalchemy import event, func
+
+from benchmarks.dataset import create_benchmark_engine, seed_orphans_dataset
+from database.models import Deceased, DeceasedBalance, Guardian, GuardianBalance, Orphan, OrphanBalance
+from services.db_services import DBService
+
+
+def legacy_summary(service):
+    db = service.session
+    today = date.today()
+    cutoff = date(today.year - 18, today.month, today.day)
+    counts = {
+        "orphans": db.query(func.count(Orphan.id)).scalar() or 0,
+        "orphans_over_18": db.query(func.count(Orphan.id)).filter(Orphan.date_birth != None, Orphan.date_birth <= cutoff).scalar() or 0,  # noqa: E711
+        "guardians": db.query(func.count(Guardian.id)).scalar() or 0,
+        "deceased": db.query(func.count(Deceased.id)).scalar() or 0,
+    }
+    totals = {}
+    for key, model in (("deceased", DeceasedBalance), ("orphans", OrphanBalance), ("guardians", GuardianBalance)):
+        for currency_id, total in db.query(model.currency_id, func.sum(model.balance)).group_by(model.currency_id):
+            totals.setdefault(currency_id, {})[key] = float(total or 0)
+    return counts, totals
+
+
+def current_summary(service, force=True):
+    summary = service.get_summary_counts(force=force)
+    counts = {key: summary[key] for key in ("orphans", "orphans_over_18", "guardians", "deceased")}
+    totals = {
+        t.currency_id: {key: value for key, value in zip(("deceased", "orphans", "guardians"), t[2:]) if value}
+        for t in summary["balances"]
+    }
+    return counts, {cid: values for cid, values in totals.items() if values}
+
+
+def measure(engine, case, repeats):
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    service = DBService()
+    try:
+        case(service)  # إحماء
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            case(service)
+            timings.append(time.perf_counter() - start)
+        event.listen(engine, "before_cursor_execute", listener)
+        result = case(service)
+        event.remove(engine, "before_cursor_execute", listener)
+        service.session.rollback()
+    finally:
+        service.close()
+    return statistics.median(timings), len(statements), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orphans", type=int, default=50_000)
+    parser.add_argument("--repeats", type=int, default=9)
+    parser.add_argument("--db-url", default=None, help="رابط قاعدة بيانات بديلة (افتراضياً SQLite مؤقتة)")
+    args = parser.parse_args(argv)
+
+    engine = create_benchmark_engine(args.db_url)
+    print(f"Dataset: {seed_orphans_dataset(engine, orphans=args.orphans, with_balances=True)}")
+
+    old_t, old_queries, old_result = measure(engine, legacy_summary, args.repeats)
+    new_t, new_queries, new_result = measure(engine, current_summary, args.repeats)
+    cached_t, cached_queries, _ = measure(engine, lambda s: current_summary(s, force=False), args.repeats)
+
+    print(f"{'case':<8} | {'ms':>9} | queries")
+    for name, elapsed, queries in (("legacy", old_t, old_queries), ("query", new_t, new_queries), ("cached", cached_t, cached_queries)):
+        print(f"{name:<8} | {elapsed * 1000:>9.3f} | {queries}")
+
+    if new_result != old_result:
+        print("REGRESSION: summary differs from the separate queries")
+        return 1
+    if new_t > old_t * 1.1:  # على SQLite المسح هو الغالب؛ المكسب في عدد الرحلات والتخزين المؤقت
+        print("REGRESSION: combined query is slower")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
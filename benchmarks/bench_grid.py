@@ -0,0 +1,236 @@
+"""
+قياس جدول الحركات المالية في MainWindow بدون شاشة (QT_QPA_PLATFORM=offscreen).
+
+لكل حجم تركة (عدد الأيتام × عدد صفوف الحركات) تُنشأ في عملية Python جديدة قاعدة
+SQLite بتركة واحدة (benchmarks.dataset.seed_estates_dataset) ونافذة MainWindow،
+ثم تُنفذ السيناريوهات برمجياً كما يفعلها المستخدم:
+- load: load_historical_data_for_deceased للتركة.
+- currency_switch: تغيير العملة من c_combo (يعيد تحميل الجدول).
+- edit: تعديل خلايا إيداع في صفوف قائمة (on_t_table_cell_changed).
+- paste: لصق PASTE_ROWS صفاً جديداً من الحافظة (_paste_clipboard_into_table).
+- save: حفظ الصفوف الملصقة (save_transactions، ويشمل إعادة التحميل بعده).
+- delete: حذف آخر صف محفوظ (_handle_t_table_row_delete).
+رسائل التأكيد والنجاح (QMessageBox) تُجاب تلقائياً حتى لا تتوقف العملية.
+
+لكل سيناريو: وسيط الزمن على repeats تشغيلات، ثم تشغيل إضافي يُحسب فيه عدد
+الاستعلامات (database.query_stats) وذروة الذاكرة (tracemalloc). تُقارن النتائج
+بخط الأساس في benchmarks/baselines.json كما في bench_suite، وتُعد زيادة عدد
+الاستعلامات تراجعاً أيضاً؛ يخرج السكربت برمز 1 عند أي تراجع.
+
+التشغيل: python -m benchmarks.bench_grid [--sizes 4x50,8x150,12x300] [--repeats 3] [--update-baseline]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmarks.bench_suite import BASELINE_PATH, DEFAULT_MIN_DELTA_MS, DEFAULT_THRESHOLD, compare, load_baselines
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = "4x50,8x150,12x300"
+PASTE_ROWS = 10
+EDIT_CELLS = 20
+SCENARIOS = ("load", "currency_switch", "edit", "paste", "save", "delete")
+
+
+# ===== Child (fresh interpreter per estate size) =====
+def _auto_answer_message_boxes():
+    from PyQt6.QtWidgets import QMessageBox
+
+    yes = staticmethod(lambda *args, **kwargs: QMessageBox.StandardButton.Yes)
+    ok = staticmethod(lambda *args, **kwargs: QMessageBox.StandardButton.Ok)
+    QMessageBox.question = yes
+    QMessageBox.information = ok
+    QMessageBox.warning = ok
+    QMessageBox.critical = ok
+
+
+class GridDriver:
+    """تنفيذ عمليات المستخدم على t_table مباشرة."""
+
+    def __init__(self, window, deceased_id):
+        self.window = window
+        self.table = window.t_table
+        self.deceased_id = deceased_id
+        self._pasted = 0
+
+    def _columns(self):
+        return self.window._get_financial_table_special_columns(self.table)
+
+    def load(self):
+        from database.models import Deceased
+
+        deceased = self.window.db_service.session.get(Deceased, self.deceased_id)
+        self.window.d_orphans = deceased.orphans
+        self.window.current_deceased_for_t_table = deceased
+        self.window.load_historical_data_for_deceased(deceased)
+
+    def currency_switch(self):
+        combo = self.window.c_combo
+        combo.setCurrentIndex((combo.currentIndex() + 1) % combo.count())
+
+    def edit(self):
+        from PyQt6.QtCore import Qt
+
+        total_col, _, _, _, entity_start_col = self._columns()
+        editable = [
+            item for r in range(2, self.table.rowCount()) for c in range(entity_start_col, total_col)
+            for item in [self.table.item(r, c)]
+            if item is not None and item.flags() & Qt.ItemFlag.ItemIsEditable
+        ][:EDIT_CELLS]
+        # تعديل ثم إعادة القيمة الأصلية حتى لا يتغير ما يحفظه سيناريو save
+        originals = [item.text() for item in editable]
+        for i, item in enumerate(editable):
+            item.setText(f"{100 + i}")
+        for item, text in zip(editable, originals):
+            item.setText(text)
+        return len(editable)
+
+    def paste(self):
+        from PyQt6.QtWidgets import QApplication
+
+        total_col, _, _, _, entity_start_col = self._columns()
+        entity_cols = total_col - entity_start_col
+        lines = []
+        for i in range(PASTE_ROWS):
+            day = date(2030, 1, 1) + timedelta(days=self._pasted + i)
+            # عمود تفاصيل المتوفى غير قابل للتعديل ويُتخطى أثناء اللصق
+            values = ["", *(f"{10 + i}" if c == 0 else "" for c in range(entity_cols))]
+            lines.append("\t".join([day.strftime("%d/%m/%Y"), *values]))
+        self._pasted += PASTE_ROWS
+
+        self.window.add_row_to_t_table()
+        self.table.setCurrentCell(self.table.rowCount() - 1, 1)
+        QApplication.clipboard().setText("\n".join(lines))
+        self.window._paste_clipboard_into_table(self.table, 2)
+
+    def save(self):
+        self.window.save_transactions()
+
+    def delete(self):
+        self.window._handle_t_table_row_delete(self.table.rowCount() - 1)
+
+
+def _child_grid(orphans_per_estate, transactions, repeats):
+    from benchmarks.dataset import create_benchmark_engine, seed_estates_dataset
+    engine = create_benchmark_engine()
+    counts = seed_estates_dataset(engine, deceased=1, orphans_per_estate=orphans_per_estate, transactions_per_entity=transactions)
+
+    import app
+    from PyQt6.QtWidgets import QApplication
+    from database.query_stats import query_stats
+
+    qt_app = QApplication(sys.argv)
+    _auto_answer_message_boxes()
+    window = app.MainWindow(app.DBService())
+    driver = GridDriver(window, deceased_id=1)
+    driver.load()
+    qt_app.processEvents()
+
+    results = {"dataset": counts, "rows": window.t_table.rowCount() - 2, "scenarios": {}}
+    for name in SCENARIOS:
+        # الحفظ يحتاج صفوفاً ملصقة غير محفوظة، والحذف صفاً محفوظاً
+        prepare = driver.paste if name == "save" else (lambda: None)
+        action = getattr(driver, name)
+        timings = []
+        for _ in range(repeats):
+            prepare()
+            start = time.perf_counter()
+            action()
+            qt_app.processEvents()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        prepare()
+        query_stats.reset()
+        query_stats.enable()
+        tracemalloc.start()
+        with query_stats.action(name):
+            action()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        query_stats.disable()
+        qt_app.processEvents()
+        results["scenarios"][name] = {
+            "ms": round(statistics.median(timings), 2),
+            "queries": query_stats.snapshot()["total_queries"],
+            "peak_kib": round(peak / 1024, 1),
+        }
+    return results
+
+
+def _run_child(size, repeats):
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_grid", "--child", size, str(repeats)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _parse_size(size):
+    orphans, transactions = size.lower().split("x")
+    return int(orphans), int(transactions)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="أحجام التركات: أيتام×صفوف مفصولة بفواصل")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="حفظ النتائج الحالية كخط أساس")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        orphans, transactions = _parse_size(args.child[0])
+        print(json.dumps(_child_grid(orphans, transactions, int(args.child[1]))))
+        return 0
+
+    baselines = load_baselines(args.baseline)
+    regressions = []
+    for size in args.sizes.split(","):
+        result = _run_child(size.strip(), args.repeats)
+        scenarios = result["scenarios"]
+        print(f"\n[grid {size}] rows={result['rows']} dataset={result['dataset']}")
+        print(f"{'scenario':<16} | {'ms':>9} | {'queries':>7} | {'peak KiB':>9}")
+        for name, s in scenarios.items():
+            print(f"{name:<16} | {s['ms']:>9.1f} | {s['queries']:>7} | {s['peak_kib']:>9.1f}")
+
+        key = f"grid:{size.strip()}"
+        if args.update_baseline:
+            baselines[key] = {"recorded_at": date.today().isoformat(), "cases": {
+                **{name: s["ms"] for name, s in scenarios.items()},
+                **{f"{name}_queries": s["queries"] for name, s in scenarios.items()},
+            }}
+            continue
+
+        baseline = baselines.get(key, {}).get("cases", {})
+        failed = compare({name: s["ms"] for name, s in scenarios.items()}, baseline, args.threshold, args.min_delta_ms)
+        for name, s in scenarios.items():
+            expected = baseline.get(f"{name}_queries")
+            if expected is not None and s["queries"] > expected:
+                print(f"  ! {name}: {s['queries']} queries, baseline {expected}")
+                failed.append(f"{name}_queries")
+        regressions += [f"{key}:{name}" for name in failed]
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        return 0
+    if regressions:
+        print(f"REGRESSION: {', '.join(regressions)}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+قياس زمن استيراد التطبيق عند البدء باستخدام python -X importtime.
+
+يشغّل `import app` في عملية جديدة عدة مرات، ويحلل مخرجات importtime ليعرض الزمن
+التراكمي لـ app وأثقل الحزم المستوردة. يفشل السكربت (رمز خروج 1) إذا تجاوز زمن
+الاستيراد الميزانية أو إذا استُورد أي من مكتبات التقارير الثقيلة عند البدء؛ هذه
+المكتبات يجب أن تُحمَّل عبر services.reports عند أول تصدير فقط.
+
+التشغيل: python -m benchmarks.bench_imports [--repeats 5] [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# لا يجوز أن تظهر في مسار البدء
+DEFERRED_MODULES = ("services.reporting", "pandas", "openpyxl", "jinja2", "weasyprint", "pdfkit")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def run_importtime(module="app"):
+    """يعيد {اسم الوحدة: (self_us, cumulative_us, depth)} لعملية استيراد واحدة."""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    runs = [run_importtime(args.module) for _ in range(args.repeats)]
+    total_ms = statistics.median(run[args.module][1] for run in runs) / 1000
+
+    # أثقل الحزم على المستوى الأعلى (depth 1) بالزمن التراكمي
+    cumulative = defaultdict(list)
+    for run in runs:
+        for name, (_, cum_us, depth) in run.items():
+            if depth == 1:
+                cumulative[name].append(cum_us)
+    heaviest = sorted(
+        ((statistics.median(values) / 1000, name) for name, values in cumulative.items()),
+        reverse=True,
+    )[:args.top]
+
+    print(f"import {args.module}: {total_ms:.1f} ms (median of {args.repeats}, budget {args.budget_ms:.0f} ms)")
+    print(f"{'cumulative ms':>14} | package")
+    for ms, name in heaviest:
+        print(f"{ms:>14.1f} | {name}")
+
+    loaded = sorted({name for run in runs for name in run if name.split(".")[0] in DEFERRED_MODULES or name in DEFERRED_MODULES})
+    failures = []
+    if loaded:
+        failures.append(f"deferred modules imported at startup: {', '.join(loaded[:10])}")
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms over budget")
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+قياس زمن وذاكرة جلب صفحة من قائمة الأيتام على 50 ألف يتيم.
+
+يقارن الاستعلام القديم (outerjoin + joinedload ثم LIMIT/OFFSET داخل استعلام فرعي)
+بالاستعلام الحالي في DBService (JOIN على مؤشر الوصي الأساسي primary_guardian_id).
+الاستعلام القديم يطبق LIMIT على صفوف الروابط لا على الأيتام، فيعيد صفحات ناقصة
+وعدداً إجمالياً خاطئاً؛ لذلك تقارن الذاكرة لكل صف معروض. يفشل السكربت (رمز خروج 1)
+إذا لم يتحسن الزمن أو ذاكرة الصف، ليصلح كاختبار تراجع.
+
+التشغيل: python -m benchmarks.bench_orphan_pages [--orphans 50000] [--per-page 100]
+"""
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+
+from sqlalchemy.orm import joinedload
+
+from benchmarks.dataset import create_benchmark_engine, seed_orphans_dataset
+from database.models import Orphan, OrphanGuardian
+from services.db_services import DBService
+
+
+def legacy_orphans_paginated(service, page=1, per_page=20):
+    """نسخة الاستعلام السابق كما كانت في DBService.get_orphans_paginated."""
+    query = service.session.query(Orphan).outerjoin(OrphanGuardian).options(
+        joinedload(Orphan.guardian_links).joinedload(OrphanGuardian.guardian)
+    ).order_by(Orphan.id.desc())
+    return service.paginate(query, page, per_page)
+
+
+def current_orphans_paginated(service, page=1, per_page=20):
+    return service.get_orphans_paginated(page, per_page)
+
+
+def legacy_render(result):
+    """محاكاة ما كان يقرأه render_orphan_row من كل صف (المرور على الروابط)."""
+    cells = []
+    for orphan in result["items"]:
+        primary = next((l.guardian for l in orphan.guardian_links if l.is_primary), None)
+        cells.append((orphan.id, orphan.name, orphan.national_id, primary.name if primary else "---"))
+    return cells
+
+
+def current_render(result):
+    """محاكاة format_orphan_row الحالية (اسم الوصي الأساسي في صف OrphanRow)."""
+    cells = []
+    for orphan in result["items"]:
+        cells.append((orphan.id, orphan.name, orphan.national_id, orphan.guardian_name or "---"))
+    return cells
+
+
+def measure(fetch, render, page, per_page, repeats):
+    timings = []
+    service = DBService()
+    try:
+        for _ in range(repeats):
+            service.session.expunge_all()
+            start = time.perf_counter()
+            render(fetch(service, page, per_page))
+            timings.append(time.perf_counter() - start)
+
+        service.session.expunge_all()
+        tracemalloc.start()
+        result = fetch(service, page, per_page)
+        render(result)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        service.close()
+    return statistics.median(timings), peak, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orphans", type=int, default=50_000)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--db-url", default=None, help="رابط قاعدة بيانات بديلة (افتراضياً SQLite مؤقتة)")
+    args = parser.parse_args(argv)
+
+    engine = create_benchmark_engine(args.db_url)
+    counts = seed_orphans_dataset(engine, orphans=args.orphans)
+    print(f"Dataset: {counts}")
+
+    pages = (args.orphans + args.per_page - 1) // args.per_page
+    regressions = []
+    print(f"{'page':>6} | {'legacy ms':>10} | {'current ms':>11} | {'legacy KiB/row':>14} | {'current KiB/row':>16} | rows/total")
+    for page in (1, max(1, pages // 2), pages):
+        old_t, old_mem, old_res = measure(legacy_orphans_paginated, legacy_render, page, args.per_page, args.repeats)
+        new_t, new_mem, new_res = measure(current_orphans_paginated, current_render, page, args.per_page, args.repeats)
+        old_row_mem = old_mem / max(1, len(old_res["items"]))
+        new_row_mem = new_mem / max(1, len(new_res["items"]))
+        print(
+            f"{page:>6} | {old_t * 1000:>10.1f} | {new_t * 1000:>11.1f} | "
+            f"{old_row_mem / 1024:>14.2f} | {new_row_mem / 1024:>16.2f} | "
+            f"{len(old_res['items'])}/{old_res['total']} -> {len(new_res['items'])}/{new_res['total']}"
+        )
+        if new_t > old_t or new_row_mem > old_row_mem:
+            regressions.append(page)
+        if new_res["total"] != args.orphans:
+            print(f"  ! total={new_res['total']} expected {args.orphans}")
+            regressions.append(page)
+
+    if regressions:
+        print(f"REGRESSION on pages: {regressions}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+قياس طبقة القراءة (services/read_models) مقابل كائنات ORM على 50 ألف يتيم بأرصدتهم.
+
+لكل حالة تُنفذ النسخة السابقة (كائنات ORM بعلاقاتها كما كانت في DBService و
+services/reporting) والنسخة الحالية (صفوف namedtuple من select لأعمدة محددة مع
+اسم الوصي والأرصدة المُدارة في SQL)، ويشمل القياس تنسيق الصفوف كما يفعله العرض:
+- orphans_page_*: صفحة من قائمة الأيتام (format_orphan_row).
+- deceased_page_first: صفحة من قائمة المتوفين.
+- monthly_report_all: بيانات التقرير الشهري لكل الأيتام (generate_monthly_report).
+- deceased_report: بيانات تقرير تركة واحدة (fetch_deceased_report_data).
+
+يطبع الزمن (وسيط repeats تشغيلات) وذروة الذاكرة (tracemalloc) للنسختين، ويفشل
+(رمز خروج 1) إذا كانت النسخة الحالية أبطأ أو أكثر استهلاكاً للذاكرة في أي حالة،
+أو إذا اختلفت البيانات المعروضة بين النسختين.
+
+التشغيل: python -m benchmarks.bench_read_models [--orphans 50000] [--per-page 100]
+"""
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, time as dt_time
+
+from sqlalchemy.orm import selectinload
+
+from benchmarks.dataset import create_benchmark_engine, seed_orphans_dataset
+from database.models import Deceased, Orphan, OrphanBalance
+from services.db_services import DBService
+from services.reporting import _build_full_balances, _pivoted_balances
+from utils.helpers import calculate_age
+
+REPORT_FROM = datetime(2023, 1, 1)
+REPORT_TO = datetime(2024, 12, 31)
+
+
+# ===== النسخة السابقة (ORM) =====
+def legacy_orphans_page(service, page, per_page):
+    query = service.session.query(Orphan).options(selectinload(Orphan.primary_guardian)).order_by(Orphan.id.desc())
+    items = service.paginate(query, page, per_page)["items"]
+    return [
+        (o.id, o.name, o.national_id, o.date_birth, o.gender.value, str(o.age), o.primary_guardian.name if o.primary_guardian else "---")
+        for o in items
+    ]
+
+
+def legacy_deceased_page(service, page, per_page):
+    query = service.session.query(Deceased, Deceased.orphans_count).order_by(Deceased.id.desc())
+    return [
+        (d.id, d.name, d.national_id, d.date_death, d.archives_number, count)
+        for d, count in service.paginate(query, page, per_page)["items"]
+    ]
+
+
+def legacy_monthly_report(service):
+    end_dt_full = datetime.combine(REPORT_TO.date(), dt_time.max)
+    orphans = service.session.query(Orphan).options(
+        selectinload(Orphan.balances).joinedload(OrphanBalance.currency), selectinload(Orphan.primary_guardian)
+    ).filter(Orphan.created_at >= REPORT_FROM).filter(Orphan.created_at <= end_dt_full).all()
+    currencies = service.get_currencies()
+    return [
+        (o.name, o.national_id, calculate_age(o.date_birth), o.primary_guardian.name if o.primary_guardian else "غير محدد",
+         _build_full_balances(o.balances, currencies))
+        for o in orphans
+    ]
+
+
+def legacy_deceased_report(service, deceased_id):
+    deceased, orphans, _ = service.get_deceased_details(deceased_id)
+    currencies = service.get_currencies()
+    rows = []
+    for o in orphans:
+        link = o.primary_guardian_link
+        guardian = link.guardian if link else None
+        rows.append((o.name, guardian.name if guardian else "غير محدد", link.start_date if link else None,
+                     _build_full_balances(o.balances, currencies)))
+    return rows
+
+
+# ===== النسخة الحالية (read_models) =====
+def current_orphans_page(service, page, per_page):
+    return [
+        (o.id, o.name, o.national_id, o.date_birth, o.gender.value, str(o.age), o.guardian_name or "---")
+        for o in service.get_orphans_paginated(page, per_page)["items"]
+    ]
+
+
+def current_deceased_page(service, page, per_page):
+    return [
+        (d.id, d.name, d.national_id, d.date_death, d.archives_number, d.orphans_count)
+        for d in service.get_deceased_people_paginated(page, per_page)["items"]
+    ]
+
+
+def current_monthly_report(service):
+    currencies = service.get_currencies()
+    return [
+        (o.name, o.national_id, calculate_age(o.date_birth), o.guardian_name or "غير محدد",
+         _pivoted_balances(o.balances, currencies))
+        for o in service.get_orphan_report_rows_by_date_range(REPORT_FROM, REPORT_TO)
+    ]
+
+
+def current_deceased_report(service, deceased_id):
+    _, orphans = service.get_deceased_report_rows(deceased_id)
+    currencies = service.get_currencies()
+    return [
+        (o.name, o.guardian_name or "غير محدد", o.guardian_start_date, _pivoted_balances(o.balances, currencies))
+        for o in orphans
+    ]
+
+
+def measure(case, repeats):
+    timings = []
+    service = DBService()
+    try:
+        for _ in range(repeats):
+            service.session.expunge_all()
+            start = time.perf_counter()
+            case(service)
+            timings.append(time.perf_counter() - start)
+            service.session.rollback()
+
+        service.session.expunge_all()
+        tracemalloc.start()
+        result = case(service)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        service.session.rollback()
+    finally:
+        service.close()
+    return statistics.median(timings), peak, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orphans", type=int, default=50_000)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--db-url", default=None, help="رابط قاعدة بيانات بديلة (افتراضياً SQLite مؤقتة)")
+    args = parser.parse_args(argv)
+
+    engine = create_benchmark_engine(args.db_url)
+    counts = seed_orphans_dataset(engine, orphans=args.orphans, with_balances=True)
+    print(f"Dataset: {counts}")
+
+    per_page = args.per_page
+    middle = max(1, args.orphans // per_page // 2)
+    deceased_id = max(1, counts["deceased"] // 2)
+    cases = [
+        ("orphans_page_first", lambda s: legacy_orphans_page(s, 1, per_page), lambda s: current_orphans_page(s, 1, per_page)),
+        ("orphans_page_middle", lambda s: legacy_orphans_page(s, middle, per_page), lambda s: current_orphans_page(s, middle, per_page)),
+        ("deceased_page_first", lambda s: legacy_deceased_page(s, 1, per_page), lambda s: current_deceased_page(s, 1, per_page)),
+        ("monthly_report_all", legacy_monthly_report, current_monthly_report),
+        ("deceased_report", lambda s: legacy_deceased_report(s, deceased_id), lambda s: current_deceased_report(s, deceased_id)),
+    ]
+
+    regressions = []
+    print(f"{'case':<22} | {'orm ms':>9} | {'dto ms':>9} | {'orm KiB':>10} | {'dto KiB':>10} | rows")
+    for name, legacy, current in cases:
+        old_t, old_mem, old_res = measure(legacy, args.repeats)
+        new_t, new_mem, new_res = measure(current, args.repeats)
+        print(
+            f"{name:<22} | {old_t * 1000:>9.1f} | {new_t * 1000:>9.1f} | "
+            f"{old_mem / 1024:>10.1f} | {new_mem / 1024:>10.1f} | {len(new_res)}"
+        )
+        if new_res != old_res:
+            print(f"  ! {name}: rows differ from the ORM version")
+            regressions.append(name)
+        elif new_t > old_t or new_mem > old_mem:
+            regressions.append(name)
+
+    if regressions:
+        print(f"REGRESSION: {', '.join(regressions)}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+قياس استجابة الواجهة أثناء تصدير التقارير: في خيط الواجهة (generate_monthly_report)
+مقابل الخلفية (submit_monthly_report: بناء البيانات في خيط وتحويل PDF في عملية عاملة).
+
+أثناء كل تصدير يعمل مؤقت Qt كل TICK_MS، ويُقاس أطول انقطاع بين نبضاته (زمن تجمد
+الواجهة)، وزيادة الذاكرة المقيمة لعملية الواجهة (ru_maxrss، على Linux/macOS فقط).
+يفشل السكربت (رمز خروج 1) إذا تجمدت الواجهة في التصدير الخلفي أكثر من --max-stall-ms،
+أو لم يكتمل تصدير خلفي بعد report_pool.shutdown() (كما بعد تسجيل خروج ثم دخول).
+
+التشغيل: python -m benchmarks.bench_report_pool [--deceased 200] [--format pdf|excel] [--repeats 3]
+"""
+import argparse
+import importlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.dataset import create_benchmark_engine, seed_estates_dataset
+
+TICK_MS = 10
+
+
+def peak_rss_kib():
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(app, run):
+    """(الزمن الكلي، أطول انقطاع لمؤقت الواجهة) لتصدير واحد؛ run(done) تستدعي done() عند الانتهاء."""
+    from PyQt6.QtCore import QTimer
+
+    ticks = [time.perf_counter()]
+    timer = QTimer()
+    timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+    timer.start(TICK_MS)
+    finished = []
+    start = time.perf_counter()
+    run(lambda *args: finished.append(args))
+    while not finished:
+        app.processEvents()
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    app.processEvents()
+    timer.stop()
+    ticks.append(time.perf_counter())
+    stall = max(b - a for a, b in zip(ticks, ticks[1:]))
+    return elapsed, stall, finished[0]
+
+
+def finishes_after_shutdown(app, run, timeout_s=120):
+    """shutdown ثم تصدير جديد: يجب أن يعيد المجمع فتح نفسه ويكتمل التصدير."""
+    from services.report_pool import report_pool
+
+    report_pool.shutdown()
+    finished = []
+    run(lambda *args: finished.append(args))
+    deadline = time.monotonic() + timeout_s
+    while not finished and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    return bool(finished) and finished[0][0] == "ok"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--deceased", type=int, default=200)
+    parser.add_argument("--format", choices=("pdf", "excel"), default="pdf")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-stall-ms", type=float, default=250)
+    parser.add_argument("--db-url", default=None, help="رابط قاعدة بيانات بديلة (افتراضياً SQLite مؤقتة)")
+    args = parser.parse_args(argv)
+
+    engine = create_benchmark_engine(args.db_url)
+    print(f"Dataset: {seed_estates_dataset(engine, deceased=args.deceased)}")
+
+    from PyQt6.QtWidgets import QApplication
+
+    from services.db_services import DBService
+    from services.report_pool import report_pool
+    from services.reports import generate_monthly_report, submit_monthly_report
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    out_dir = tempfile.mkdtemp(prefix="oms-report-bench-")
+    ext = "pdf" if args.format == "pdf" else "xlsx"
+    service = DBService()
+
+    def inline(done):
+        path = os.path.join(out_dir, f"inline.{ext}")
+        try:
+            with service.session_scope():
+                generate_monthly_report("2000-01-01", "2100-01-01", path, service, "bench", args.format)
+        except Exception as e:
+            done("error", e)
+        else:
+            done("ok", path)
+
+    def background(done):
+        job = submit_monthly_report("2000-01-01", "2100-01-01", os.path.join(out_dir, f"pool.{ext}"), "bench", args.format)
+        job.finished.connect(lambda path: done("ok", path))
+        job.failed.connect(lambda e: done("error", e))
+        background.job = job  # مرجع حتى الانتهاء
+
+    results = {}
+    try:
+        # كما بعد تسجيل الدخول (prewarm_reporting): الاستيراد وأول تشغيل للعامل خارج القياس
+        importlib.import_module("services.reporting")
+        report_pool.prewarm()
+        for name, run in (("inline", inline), ("background", background)):
+            rss_before = peak_rss_kib()
+            runs = [measure(app, run) for _ in range(args.repeats)]
+            errors = [outcome[1] for _, _, outcome in runs if outcome[0] == "error"]
+            if errors:
+                print(f"{name}: export failed: {errors[0]}")
+                return 1
+            rss_after = peak_rss_kib()
+            results[name] = (
+                statistics.median(r[0] for r in runs),
+                max(r[1] for r in runs),
+                None if rss_before is None else rss_after - rss_before,
+            )
+        restarted = finishes_after_shutdown(app, background)
+    finally:
+        service.close()
+        report_pool.shutdown()
+
+    print(f"{'case':<11} | {'total ms':>9} | {'max stall ms':>12} | peak RSS growth KiB")
+    for name, (elapsed, stall, rss) in results.items():
+        print(f"{name:<11} | {elapsed * 1000:>9.1f} | {stall * 1000:>12.1f} | {'---' if rss is None else rss}")
+
+    if not restarted:
+        print("REGRESSION: background export did not finish after report_pool.shutdown()")
+        return 1
+    if results["background"][1] * 1000 > args.max_stall_ms:
+        print(f"REGRESSION: UI stalled {results['background'][1] * 1000:.0f} ms during background export")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+قياس الملخصات الشهرية للحركات (database/rollups.py) على عشر سنوات من الحركات.
+
+- read: تحليلات المدى كاملاً لكل العملات بتجميع GROUP BY على جداول الحركات الثلاثة عند
+  الطلب، مقابل قراءة خانات monthly_transaction_rollups (get_monthly_rollups).
+- write: إضافة حركة يتيم وحفظها (commit لكل حركة كما في الواجهة) بدون مستمعي الملخصات
+  ومعهم، أي كلفة تحديث الخانة داخل نفس المعاملة.
+- rebuild: زمن rebuild_monthly_rollups وعدد الخانات.
+يفشل السكربت (رمز خروج 1) إذا اختلفت النتائج عن التجميع المباشر، أو كانت القراءة من
+الملخصات أبطأ، أو بقيت فروق بعد إعادة البناء.
+
+التشغيل: python -m benchmarks.bench_rollups [--deceased 100] [--years 10] [--writes 200]
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+import database.db as db_module
+from benchmarks.dataset import create_benchmark_engine, seed_estates_dataset
+from database import rollups
+from database.models import Orphan, Transaction, TransactionTypeEnum
+from services.db_services import DBService
+
+_LISTENERS = (
+    ("before_flush", rollups._collect_before_flush),
+    ("after_flush", rollups._collect_after_flush),
+    ("before_commit", rollups._refresh_before_commit),
+    ("do_orm_execute", rollups._refresh_after_bulk),
+)
+
+
+def on_demand(connection, month_from, month_to):
+    """{(شهر، عملة، جهة، نوع): (المجموع، العدد)} بتجميع الحركات مباشرة في المدى."""
+    result = {}
+    start = datetime.combine(month_from, datetime.min.time())
+    end = datetime.combine(rollups.next_month(month_to), datetime.min.time())
+    for kind, source in rollups.SOURCES.items():
+        month = rollups._month_key(connection, source.c.created_date)
+        rows = connection.execute(
+            select(month, source.c.currency_id, source.c.type, func.sum(source.c.amount), func.count())
+            .where(source.c.created_date >= start, source.c.created_date < end)
+            .group_by(month, source.c.currency_id, source.c.type)
+        )
+        for key, currency_id, txn_type, total, count in rows:
+            result[(rollups._parse_month_key(key), currency_id, kind, txn_type)] = (float(total or 0), count)
+    return result
+
+
+def from_rollups(service, month_from, month_to):
+    return {(r.month, r.currency_id, r.entity_kind, r.type): (r.total, r.count) for r in service.get_monthly_rollups(month_from, month_to)}
+
+
+def timed(case, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = case()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def write_transactions(count, seed_date):
+    """count حركة يتيم، كل واحدة في معاملة مستقلة؛ يعيد الزمن الكلي."""
+    session = db_module.SessionLocal()
+    try:
+        orphan_id = session.scalar(select(Orphan.id).limit(1))
+        start = time.perf_counter()
+        for i in range(count):
+            session.add(Transaction(
+                orphan_id=orphan_id, currency_id=i % 4 + 1, amount=Decimal("10.00"),
+                type=TransactionTypeEnum.deposit, created_date=seed_date + timedelta(days=i),
+            ))
+            session.commit()
+        return time.perf_counter() - start
+    finally:
+        session.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--deceased", type=int, default=100)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--db-url", default=None, help="رابط قاعدة بيانات بديلة (افتراضياً SQLite مؤقتة)")
+    args = parser.parse_args(argv)
+
+    engine = create_benchmark_engine(args.db_url)
+    # صف أسبوعي لكل جهة (انظر seed_estates_dataset) => years * 52 صفاً
+    print(f"Dataset: {seed_estates_dataset(engine, deceased=args.deceased, transactions_per_entity=args.years * 52)}")
+    month_from, month_to = date(2020, 1, 1), date(2020 + args.years - 1, 12, 1)
+    regressions = []
+
+    service = DBService()
+    try:
+        with engine.connect() as conn:
+            old_t, old_result = timed(lambda: on_demand(conn, month_from, month_to), args.repeats)
+        new_t, new_result = timed(lambda: from_rollups(service, month_from, month_to), args.repeats)
+        service.session.rollback()
+    finally:
+        service.close()
+    print(f"{'case':<10} | {'on-demand ms':>12} | {'rollup ms':>10} | buckets")
+    print(f"{'read':<10} | {old_t * 1000:>12.2f} | {new_t * 1000:>10.2f} | {len(new_result)}")
+    if old_result.keys() != new_result.keys() or any(abs(old_result[k][0] - new_result[k][0]) > 0.005 or old_result[k][1] != new_result[k][1] for k in old_result):
+        print("  ! read: rollups differ from on-demand aggregation")
+        regressions.append("read")
+    elif new_t > old_t:
+        regressions.append("read")
+
+    for name, listener in _LISTENERS:
+        event.remove(Session, name, listener)
+    try:
+        plain_t = write_transactions(args.writes, datetime(2030, 1, 1))
+    finally:
+        for name, listener in _LISTENERS:
+            event.listen(Session, name, listener)
+    tracked_t = write_transactions(args.writes, datetime(2031, 1, 1))
+    print(
+        f"write: {plain_t / args.writes * 1000:.2f} ms/commit without rollups, "
+        f"{tracked_t / args.writes * 1000:.2f} ms/commit with rollups"
+    )
+
+    with engine.begin() as conn:
+        # حركات 2030 كُتبت بدون تحديث الخانات فالفرق متوقع هنا؛ إعادة البناء تصلحه
+        stale = sum(rollups.check_monthly_rollups(conn).values())
+        start = time.perf_counter()
+        buckets = rollups.rebuild_monthly_rollups(conn)
+        rebuild_t = time.perf_counter() - start
+        mismatches = rollups.check_monthly_rollups(conn)
+    print(f"rebuild: {buckets} buckets in {rebuild_t * 1000:.1f} ms ({stale} stale buckets before)")
+    if any(mismatches.values()):
+        print(f"  ! rebuild: mismatches remain {mismatches}")
+        regressions.append("rebuild")
+
+    if regressions:
+        print(f"REGRESSION: {', '.join(regressions)}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+قياس زمن بدء التشغيل مقابل ميزانية محددة.
+
+كل قياس يعمل في عملية Python جديدة حتى لا تؤثر ذاكرة الاستيراد بين القياسات:
+- forms: تحميل نماذج الواجهة بـ loadUiType (الطريقة السابقة) مقابل الوحدات المولّدة
+  مسبقاً عبر utils.ui_compiler.
+- login: من بدء العملية حتى ظهور نافذة الدخول (import app + QApplication + LoginWindow).
+- main_window: إنشاء MainWindow (بدون صفحات الإدارة المؤجلة) ثم زمن بناء كل صفحة
+  مؤجلة عند أول زيارة.
+يفشل السكربت (رمز خروج 1) إذا تجاوز أي قياس ميزانيته أو لم تكن الوحدات المولّدة
+أسرع من loadUiType، ليصلح كاختبار تراجع. يعمل بدون شاشة (QT_QPA_PLATFORM=offscreen).
+
+التشغيل: python -m benchmarks.bench_startup [--repeats 3] [--login-budget-ms 2500] [--main-window-budget-ms 1500]
+"""
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UI_FILES = [os.path.join(ROOT, "ui", "app.ui"), os.path.join(ROOT, "ui", "login.ui")]
+
+
+# ===== Child measurements (run in a fresh interpreter) =====
+def _child_forms(mode):
+    # الاعتماديات الثقيلة تُستورد في app.py على أي حال؛ نستبعدها لقياس تحميل النماذج فقط
+    importlib.import_module("PyQt6.QtWidgets")
+    import utils.ui_compiler as ui_compiler
+    from PyQt6.uic import loadUiType
+
+    start = time.perf_counter()
+    for path in UI_FILES:
+        if mode == "legacy":
+            loadUiType(path)
+        else:
+            ui_compiler.load_form_class(path)
+    return {"ms": (time.perf_counter() - start) * 1000}
+
+
+def _child_login(process_start):
+    from benchmarks.dataset import create_benchmark_engine
+    create_benchmark_engine()
+
+    import app
+    from PyQt6.QtWidgets import QApplication
+
+    qt_app = QApplication(sys.argv)
+    window = app.LoginWindow(app.DBService())
+    window.show()
+    qt_app.processEvents()
+    return {"ms": (time.perf_counter() - process_start) * 1000}
+
+
+def _child_main_window():
+    from benchmarks.dataset import create_benchmark_engine
+    create_benchmark_engine()
+
+    import app
+    from PyQt6.QtWidgets import QApplication
+
+    qt_app = QApplication(sys.argv)
+    db = app.DBService()
+    start = time.perf_counter()
+    window = app.MainWindow(db)
+    construct_ms = (time.perf_counter() - start) * 1000
+
+    pages = {}
+    for index in range(window.tabWidget.count()):
+        name = window.tabWidget.widget(index).objectName()
+        if name in window._lazy_page_setups:
+            start = time.perf_counter()
+            window.ensure_page_built(index)
+            pages[name] = (time.perf_counter() - start) * 1000
+    # الأحداث المؤجلة من بناء الصفحات خارج القياس قبل خروج العملية
+    qt_app.processEvents()
+    return {"ms": construct_ms, "pages": pages}
+
+
+def _run_child(*args):
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _median(results, key="ms"):
+    return statistics.median(r[key] for r in results)
+
+
+def main(argv=None):
+    process_start = time.perf_counter()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--login-budget-ms", type=float, default=2500)
+    parser.add_argument("--main-window-budget-ms", type=float, default=1500)
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        kind, *rest = args.child
+        if kind == "forms":
+            result = _child_forms(rest[0])
+        elif kind == "login":
+            result = _child_login(process_start)
+        else:
+            result = _child_main_window()
+        print(json.dumps(result))
+        return 0
+
+    from utils.ui_compiler import compile_ui
+    for path in UI_FILES:
+        compile_ui(path)
+
+    legacy = _median([_run_child("forms", "legacy") for _ in range(args.repeats)])
+    compiled = _median([_run_child("forms", "compiled") for _ in range(args.repeats)])
+    login = _median([_run_child("login") for _ in range(args.repeats)])
+    main_runs = [_run_child("main_window") for _ in range(args.repeats)]
+    main_window = _median(main_runs)
+
+    print(f"{'measurement':<28} | {'ms':>8} | budget")
+    print(f"{'forms (loadUiType)':<28} | {legacy:>8.1f} |")
+    print(f"{'forms (compiled)':<28} | {compiled:>8.1f} | < loadUiType")
+    print(f"{'login window ready':<28} | {login:>8.1f} | {args.login_budget_ms:.0f}")
+    print(f"{'MainWindow construction':<28} | {main_window:>8.1f} | {args.main_window_budget_ms:.0f}")
+    for name in main_runs[0]["pages"]:
+        page_ms = statistics.median(r["pages"][name] for r in main_runs)
+        print(f"{'  first visit ' + name:<28} | {page_ms:>8.1f} |")
+
+    failures = []
+    if compiled >= legacy:
+        failures.append("compiled forms are not faster than loadUiType")
+    if login > args.login_budget_ms:
+        failures.append("login window over budget")
+    if main_window > args.main_window_budget_ms:
+        failures.append("MainWindow construction over budget")
+    if failures:
+        print("OVER BUDGET: " + "; ".join(failures))
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+قياس كلفة الاستدعاء الواحد لاستعلامات DBService الساخنة قبل وبعد العبارات المخزنة
+(services/statements) على SQLite.
+
+النسخة السابقة تبني session.query(...) في كل استدعاء كما كانت في DBService، والحالية
+تنفذ عبارة select() مبنية مرة واحدة مع المعاملات فقط. البيانات صغيرة عمداً
+(benchmarks.dataset.seed_estates_dataset) حتى يغلب زمن بناء الاستعلام على زمن
+تنفيذه. لكل حالة: وسيط --rounds جولات، كل جولة --calls استدعاء، بالميكروثانية لكل
+استدعاء. يفشل السكربت (رمز خروج 1) إذا كانت النسخة الحالية أبطأ في أي حالة أو
+أعادت نتيجة مختلفة.
+
+التشغيل: python -m benchmarks.bench_statements [--calls 300] [--rounds 5]
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import joinedload, selectinload
+
+from benchmarks.dataset import create_benchmark_engine, seed_estates_dataset
+from database.models import (
+    Currency, Deceased, DeceasedBalance, DeceasedTransaction, Guardian, GuardianBalance, GuardianTransaction,
+    Orphan, OrphanBalance, OrphanGuardian, Transaction, TransactionTypeEnum,
+)
+from services.db_services import DBService
+
+
+# ===== النسخة السابقة كما كانت في DBService =====
+def legacy_search(session, model, text):
+    return session.query(model).filter(or_(model.national_id.ilike(f"%{text}%"), model.name.ilike(f"%{text}%"))).limit(20).all()
+
+
+def legacy_search_orphan(session, text):
+    query = session.query(Orphan).filter(Orphan.deceased_id != None)  # noqa: E711
+    return query.filter(or_(Orphan.national_id.ilike(f"%{text}%"), Orphan.name.ilike(f"%{text}%"))).limit(20).all()
+
+
+def legacy_exists(session, model, name):
+    return session.query(model).filter(model.name == name).first() is not None
+
+
+def legacy_orphan_details(session, orphan_id):
+    return session.query(Orphan).options(
+        joinedload(Orphan.deceased), selectinload(Orphan.guardian_links).joinedload(OrphanGuardian.guardian),
+        selectinload(Orphan.balances).joinedload(OrphanBalance.currency),
+    ).filter(Orphan.id == orphan_id).first()
+
+
+def legacy_deceased_balance(session, deceased_id, currency_code):
+    result = session.query(DeceasedBalance.balance).join(Currency).filter(
+        DeceasedBalance.deceased_id == deceased_id, Currency.code == currency_code
+    ).first()
+    return result[0] if result else None
+
+
+def legacy_summary(session, transaction_model, transaction_owner, balance_model, balance_owner, owner_id):
+    transactions = session.query(
+        transaction_model.currency_id,
+        func.sum(case((transaction_model.type == TransactionTypeEnum.deposit, transaction_model.amount), else_=0)).label('total_deposit'),
+        func.sum(case((transaction_model.type == TransactionTypeEnum.withdraw, transaction_model.amount), else_=0)).label('total_withdraw'),
+    ).filter(transaction_owner == owner_id).group_by(transaction_model.currency_id).subquery()
+    return session.query(
+        Currency.name,
+        func.coalesce(transactions.c.total_deposit, 0).label('deposited'),
+        func.coalesce(transactions.c.total_withdraw, 0).label('withdrawn'),
+        func.coalesce(balance_model.balance, 0).label('available'),
+    ).outerjoin(
+        balance_model, (balance_model.currency_id == Currency.id) & (balance_owner == owner_id)
+    ).outerjoin(transactions, transactions.c.currency_id == Currency.id).all()
+
+
+def build_cases(counts):
+    deceased_id = counts["deceased"] // 2 or 1
+    orphan_id = deceased_id * 4
+    guardian_id = deceased_id
+    return [
+        ("search_guardian",
+         lambda s: legacy_search(s.session, Guardian, "وصي 1"), lambda s: s.search_guardian("وصي 1")),
+        ("search_deceased",
+         lambda s: legacy_search(s.session, Deceased, "متوفى 1"), lambda s: s.search_deceased("متوفى 1")),
+        ("search_orphan_linked",
+         lambda s: legacy_search_orphan(s.session, "يتيم 1"), lambda s: s.search_orphan("يتيم 1", linked=True)),
+        ("check_if_orphan_exists",
+         lambda s: legacy_exists(s.session, Orphan, "يتيم 7"), lambda s: s.check_if_orphan_exists("يتيم 7")),
+        ("check_if_guardian_exists",
+         lambda s: legacy_exists(s.session, Guardian, "غير موجود"), lambda s: s.check_if_guardian_exists("غير موجود")),
+        ("orphan_details",
+         lambda s: legacy_orphan_details(s.session, orphan_id), lambda s: s.get_orphan_details(orphan_id)),
+        ("deceased_balance",
+         lambda s: legacy_deceased_balance(s.session, deceased_id, "USD"), lambda s: s.get_deceased_balance(deceased_id, "USD")),
+        ("deceased_summary",
+         lambda s: legacy_summary(s.session, DeceasedTransaction, DeceasedTransaction.deceased_id, DeceasedBalance, DeceasedBalance.deceased_id, deceased_id),
+         lambda s: s.get_deceased_summary(deceased_id)),
+        ("orphan_summary",
+         lambda s: legacy_summary(s.session, Transaction, Transaction.orphan_id, OrphanBalance, OrphanBalance.orphan_id, orphan_id),
+         lambda s: s.get_orphan_summary(orphan_id)),
+        ("guardian_summary",
+         lambda s: legacy_summary(s.session, GuardianTransaction, GuardianTransaction.guardian_id, GuardianBalance, GuardianBalance.guardian_id, guardian_id),
+         lambda s: s.get_guardian_summary(guardian_id)),
+    ]
+
+
+def per_call_us(service, case, calls, rounds):
+    case(service)  # إحماء: تجميع SQL وتعبئة ذاكرة المحرك
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            case(service)
+        timings.append((time.perf_counter() - start) / calls)
+    return statistics.median(timings) * 1_000_000
+
+
+def _comparable(result):
+    if isinstance(result, list):
+        return [tuple(r) if not hasattr(r, "id") else r.id for r in result]
+    return getattr(result, "id", result)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--deceased", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    engine = create_benchmark_engine()
+    counts = seed_estates_dataset(engine, deceased=args.deceased)
+    print(f"Dataset: {counts}")
+
+    service = DBService()
+    regressions = []
+    print(f"{'case':<26} | {'query() us':>10} | {'stmt us':>9} | {'saved':>6}")
+    try:
+        for name, legacy, current in build_cases(counts):
+            if _comparable(legacy(service)) != _comparable(current(service)):
+                print(f"  ! {name}: results differ")
+                regressions.append(name)
+            old_us = per_call_us(service, legacy, args.calls, args.rounds)
+            new_us = per_call_us(service, current, args.calls, args.rounds)
+            print(f"{name:<26} | {old_us:>10.1f} | {new_us:>9.1f} | {1 - new_us / old_us:>6.0%}")
+            if new_us > old_us:
+                regressions.append(name)
+    finally:
+        service.close()
+
+    if regressions:
+        print(f"REGRESSION: {', '.join(regressions)}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+مجموعة قياس أداء DBService والتقارير والتوزيع مع خط أساس محفوظ.
+
+تُولَّد تركات اصطناعية حتمية (benchmarks.dataset.seed_estates_dataset) على SQLite
+مؤقتة، وعلى MySQL أيضاً مع --mysql إذا كان الخادم متاحاً (قاعدة oms_bench منفصلة).
+لكل حالة يُؤخذ وسيط repeats تشغيلات بعد تشغيل إحماء، مع تفريغ الجلسة قبل كل تشغيل
+حتى لا تُقاس الكائنات المخزنة من التشغيل السابق.
+
+خط الأساس في BASELINE_PATH مفصول حسب نوع القاعدة وحجم البيانات. تُعد الحالة تراجعاً
+إذا زاد زمنها عن خط الأساس بأكثر من --threshold (نسبة) و --min-delta-ms معاً،
+وعندها يخرج السكربت برمز 1. تصدير PDF لا يُقاس لأنه يعتمد على أداة خارجية
+(WeasyPrint/wkhtmltopdf)؛ يُقاس بدلاً منه بناء البيانات وتوليد HTML من القالب.
+
+التشغيل: python -m benchmarks.bench_suite [--deceased 200] [--mysql] [--update-baseline]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from types import SimpleNamespace
+
+from benchmarks.dataset import CURRENCIES, DISTRIBUTION_MODE, create_benchmark_engine, mysql_benchmark_url, seed_estates_dataset
+from database.models import GenderEnum
+from services.db_services import DBService
+from utils.distribution import calculate_beneficiary_distribution
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_MS = 2.0
+
+
+def build_cases(counts, orphans_per_estate, output_dir):
+    """(اسم الحالة، دالة تستقبل DBService) بمعرّفات من منتصف البيانات."""
+    import services.reporting as reporting
+    from services.report_renderer import env
+
+    user = SimpleNamespace(name="benchmark")
+    deceased_id = counts["deceased"] // 2 or 1
+    orphan_id = (deceased_id - 1) * orphans_per_estate + 1
+    guardian_id = deceased_id
+    middle_page = max(1, counts["orphans"] // 100 // 2)
+    heirs = [
+        {"kind": "orphan", "id": i, "gender": GenderEnum.male if i % 2 else GenderEnum.female}
+        for i in range(1, orphans_per_estate + 1)
+    ] + [{"kind": "guardian", "id": 1, "gender": GenderEnum.female}]
+
+    def financial_table(service):
+        return reporting._build_financial_table_report_data(deceased_id, 1, service, user.name)
+
+    def render(template, data):
+        return env.get_template(template).render(**data)
+
+    return [
+        # ===== DBService: القوائم =====
+        ("paginate_deceased_first", lambda s: s.get_deceased_people_paginated(1, 100)),
+        ("paginate_orphans_first", lambda s: s.get_orphans_paginated(1, 100)),
+        ("paginate_orphans_middle", lambda s: s.get_orphans_paginated(middle_page, 100)),
+        ("paginate_guardians_first", lambda s: s.get_guardians_paginated(1, 100)),
+        ("paginate_orphans_over_18", lambda s: s.get_orphans_older_than_or_equal_18_paginated(1, 100)),
+        ("summary_counts", lambda s: s.get_summary_counts(force=True)),
+        # ===== DBService: البحث =====
+        ("search_orphan", lambda s: s.search_orphan("يتيم 1", _all=True)),
+        ("search_deceased", lambda s: s.search_deceased(f"{400000000 + deceased_id}")),
+        ("search_guardian", lambda s: s.search_guardian("وصي 1")),
+        ("find_by_archive_or_id", lambda s: s.find_by_archive_or_id(f"AR-{deceased_id}")),
+        # ===== DBService: التفاصيل والملخصات =====
+        ("deceased_details", lambda s: s.get_deceased_details(deceased_id)),
+        ("orphan_details", lambda s: s.get_orphan_details(orphan_id)),
+        ("guardian_details", lambda s: s.get_guardian_details(guardian_id)),
+        ("deceased_summary", lambda s: s.get_deceased_summary(deceased_id)),
+        ("orphan_summary", lambda s: s.get_orphan_summary(orphan_id)),
+        ("guardian_summary", lambda s: s.get_guardian_summary(guardian_id)),
+        ("orphan_transactions", lambda s: s.get_orphan_transactions(orphan_id)),
+        # ===== التقارير =====
+        ("report_orphan_html", lambda s: render("orphan_report.html", reporting.fetch_entity_data("orphan", orphan_id, s, user))),
+        ("report_deceased_html", lambda s: render("deceased_report.html", reporting.fetch_deceased_report_data(deceased_id, s, user))),
+        ("report_guardian_html", lambda s: render("guardian_report.html", reporting.fetch_guardian_report_data(guardian_id, s, user))),
+        ("report_financial_table_data", financial_table),
+        ("report_financial_table_html", lambda s: render("financial_table_report.html", financial_table(s))),
+        ("report_financial_table_excel", lambda s: reporting._export_financial_table_excel(
+            financial_table(s), os.path.join(output_dir, "financial_table.xlsx"))),
+        ("report_monthly_excel", lambda s: reporting.generate_monthly_report(
+            "2019-12-01", "2020-01-31", os.path.join(output_dir, "monthly.xlsx"), s, user.name, file_format="excel")),
+        # ===== التوزيع =====
+        ("distribution", lambda s: [
+            calculate_beneficiary_distribution(heirs, 1000 + i, DISTRIBUTION_MODE) for i in range(200)
+        ]),
+    ]
+
+
+def measure(case, repeats):
+    timings = []
+    service = DBService()
+    try:
+        for run in range(repeats + 1):
+            service.session.expunge_all()
+            start = time.perf_counter()
+            case(service)
+            if run:  # التشغيل الأول إحماء (تجميع القوالب والاستعلامات المخزنة)
+                timings.append(time.perf_counter() - start)
+            service.session.rollback()
+    finally:
+        service.close()
+    return statistics.median(timings) * 1000
+
+
+def run_backend(label, url, args, output_dir):
+    engine = create_benchmark_engine(url)
+    started = time.perf_counter()
+    counts = seed_estates_dataset(
+        engine, deceased=args.deceased, orphans_per_estate=args.orphans_per_estate,
+        transactions_per_entity=args.transactions,
+    )
+    print(f"[{label}] Dataset ({time.perf_counter() - started:.1f}s): {counts}")
+    results = {}
+    for name, case in build_cases(counts, args.orphans_per_estate, output_dir):
+        results[name] = round(measure(case, args.repeats), 3)
+    engine.dispose()
+    return results
+
+
+def baseline_key(label, args):
+    return f"{label}:{args.deceased}x{args.orphans_per_estate}x{args.transactions}/{len(CURRENCIES)}"
+
+
+def load_baselines(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """طباعة الجدول وإعادة أسماء الحالات المتراجعة."""
+    regressions = []
+    print(f"{'case':<30} | {'ms':>9} | {'baseline':>9} | {'change':>7}")
+    for name, ms in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<30} | {ms:>9.2f} | {'---':>9} | {'new':>7}")
+            continue
+        change = (ms - base) / base if base else 0.0
+        flag = ""
+        if ms > base * (1 + threshold) and ms - base > min_delta_ms:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<30} | {ms:>9.2f} | {base:>9.2f} | {change:>+7.0%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--deceased", type=int, default=200)
+    parser.add_argument("--orphans-per-estate", type=int, default=4)
+    parser.add_argument("--transactions", type=int, default=20, help="عدد صفوف الحركات لكل تركة")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--mysql", action="store_true", help="القياس على MySQL أيضاً إن كان متاحاً")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="حفظ النتائج الحالية كخط أساس")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    args = parser.parse_args(argv)
+
+    backends = [("sqlite", None)]
+    if args.mysql:
+        url = mysql_benchmark_url()
+        if url:
+            backends.append(("mysql", url))
+        else:
+            print("MySQL is not available; skipping.")
+
+    baselines = load_baselines(args.baseline)
+    regressions = []
+    with tempfile.TemporaryDirectory(prefix="oms_bench_") as output_dir:
+        for label, url in backends:
+            results = run_backend(label, url, args, output_dir)
+            key = baseline_key(label, args)
+            if args.update_baseline:
+                baselines[key] = {"recorded_at": date.today().isoformat(), "cases": results}
+                print(f"[{label}] Baseline updated: {key}")
+                continue
+            failed = compare(results, baselines.get(key, {}).get("cases", {}), args.threshold, args.min_delta_ms)
+            regressions += [f"{label}:{name}" for name in failed]
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        return 0
+    if regressions:
+        print(f"REGRESSION: {', '.join(regressions)}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,9 +7,16 @@ from .dialogs import (
     ExportFinancialTableDialog,
     ExportReportDialog,
     GuardianSearchDialog,
+    MonthlyAnalyticsDialog,
     OrphanSearchDialog,
+    ProfileCaptureDialog,
+    QueryStatsDialog,
+    StallLogDialog,
+    StartupTraceDialog,
 )
 from .orphan_dialog import EditOrphanDialog
+from .list_filter_bar import ListFilterBar
+from .table_models import LazyTableModel
 
 __all__ = [
     "AddTransactionDialog",
@@ -19,6 +26,13 @@ __all__ = [
     "ExportFinancialTableDialog",
     "ExportReportDialog",
     "GuardianSearchDialog",
+    "MonthlyAnalyticsDialog",
     "OrphanSearchDialog",
+    "ProfileCaptureDialog",
+    "QueryStatsDialog",
+    "StallLogDialog",
+    "StartupTraceDialog",
     "EditOrphanDialog",
+    "ListFilterBar",
+    "LazyTableModel",
 ]
@@ -4,12 +4,13 @@ from PyQt6.QtWidgets import (
     QAbstractItemView, QDialog, QHeaderView, QTableWidget, QTableWidgetItem, QVBoxLayout, QLineEdit, QListWidget,
     QLabel, QRadioButton, QButtonGroup, QHBoxLayout,
     QPushButton, QFileDialog, QMessageBox, QFormLayout,
-    QComboBox, QDoubleSpinBox, QDateEdit, QWidget, QDialogButtonBox, QCheckBox, QGridLayout, QScrollArea
+    QComboBox, QDoubleSpinBox, QDateEdit, QWidget, QDialogButtonBox, QCheckBox, QGridLayout, QScrollArea,
+    QPlainTextEdit, QProgressBar
 )
 from PyQt6.QtCore import Qt, QDate, QLocale, QTimer
 from decimal import Decimal
 from database.models import Deceased, Orphan, DeceasedBalance
-from services.reporting import generate_monthly_report
+from services.reports import submit_financial_table_report, submit_monthly_report
 
 class GuardianSearchDialog(QDialog):
     def __init__(self, db_service, parent=None):
@@ -195,11 +196,78 @@ class OrphanSearchDialog(QDialog):
             self.selected_orphan = self.current_results[index]
             self.accept()
 
-class ExportReportDialog(QDialog):
+class _ReportJobMixin:
+    """تشغيل تصدير في الخلفية (services/report_pool.ReportJob) داخل نافذة التصدير: التقدم والإيقاف والنتيجة."""
+    job = None
+
+    def _init_job_progress(self, layout):
+        self.job_label = QLabel()
+        self.job_bar = QProgressBar()
+        self.job_bar.setRange(0, 100)
+        for widget in (self.job_label, self.job_bar):
+            widget.hide()
+            layout.addWidget(widget)
+
+    def _run_job(self, job, success_message, busy_widgets):
+        self.job = job
+        self._busy_widgets = busy_widgets
+        self._success_message = success_message
+        for widget in busy_widgets:
+            widget.setEnabled(False)
+        self.job_bar.setValue(0)
+        self.job_label.setText("جمع البيانات")
+        self.job_bar.show()
+        self.job_label.show()
+        self.btn_cancel.setText("إيقاف التصدير")
+        job.progress.connect(self._on_job_progress)
+        job.finished.connect(self._on_job_finished)
+        job.failed.connect(self._on_job_failed)
+        job.cancelled.connect(self._on_job_cancelled)
+
+    def _on_job_progress(self, percent, text):
+        self.job_bar.setValue(percent)
+        self.job_label.setText(text)
+
+    def _on_job_finished(self, path):
+        self._reset_job()
+        QMessageBox.information(self, "نجاح", self._success_message)
+        self.accept()
+
+    def _on_job_failed(self, error):
+        self._reset_job()
+        QMessageBox.critical(self, "خطأ", f"حدث خطأ أثناء التصدير: {str(error)}")
+
+    def _on_job_cancelled(self):
+        self._reset_job()
+        self.job_label.setText("تم إيقاف التصدير")
+        self.job_label.show()
+
+    def _reset_job(self):
+        self.job = None
+        for widget in self._busy_widgets:
+            widget.setEnabled(True)
+        self.job_bar.hide()
+        self.job_label.hide()
+        self.btn_cancel.setText("إلغاء")
+
+    def reject(self):
+        # أثناء التصدير: زر الإلغاء و Esc يوقفان التصدير وتبقى النافذة مفتوحة
+        if self.job is not None:
+            self.job.cancel()
+            return
+        super().reject()
+
+    def closeEvent(self, event):
+        if self.job is not None:
+            self.job.cancel()
+        super().closeEvent(event)
+
+
+class ExportReportDialog(_ReportJobMixin, QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("تصدير تقرير دوري")
-        self.setFixedSize(350, 250)
+        self.setFixedSize(350, 300)
         self.init_ui()
 
     def init_ui(self):
@@ -247,6 +315,7 @@ class ExportReportDialog(QDialog):
         radio_layout.addWidget(self.radio_pdf)
         radio_layout.addWidget(self.radio_excel)
         layout.addLayout(radio_layout)
+        self._init_job_progress(layout)
         
         btn_layout.addWidget(self.btn_export)
         btn_layout.addWidget(self.btn_cancel)
@@ -310,26 +379,24 @@ class ExportReportDialog(QDialog):
 
         if path:
             try:
-                # التأكد من وصول الكائنات الصحيحة من الأب (Parent)
-                db_service = self.parent().db_service
-                user_name = self.parent().current_user.name
-                
-                generate_monthly_report(
-                    from_dt, to_dt, path, 
-                    db_service, 
-                    user_name, 
-                    format_type
-                )
-                QMessageBox.information(self, "نجاح", "تم تصدير التقرير بنجاح")
-                self.accept()
+                # البيانات تُجمع في خيط خلفي بجلسة خاصة، وملف PDF يُكتب في عملية منفصلة
+                job = submit_monthly_report(from_dt, to_dt, path, self.parent().current_user.name, format_type)
             except Exception as e:
                 QMessageBox.critical(self, "خطأ", f"حدث خطأ أثناء التصدير: {str(e)}")
+                return
+            self._run_job(
+                job, "تم تصدير التقرير بنجاح",
+                [self.date_from, self.date_to, self.radio_pdf, self.radio_excel, self.btn_export],
+            )
 
-class ExportFinancialTableDialog(QDialog):
-    def __init__(self, parent=None):
+class ExportFinancialTableDialog(_ReportJobMixin, QDialog):
+    def __init__(self, deceased_id, currency_id, exported_by, parent=None):
         super().__init__(parent)
+        self.deceased_id = deceased_id
+        self.currency_id = currency_id
+        self.exported_by = exported_by
         self.setWindowTitle("تصدير تقرير جدول الحركات")
-        self.setFixedSize(340, 180)
+        self.setFixedSize(340, 220)
         self.selected_format = "pdf"
         self._init_ui()
 
@@ -350,19 +417,37 @@ class ExportFinancialTableDialog(QDialog):
 
         layout.addWidget(self.radio_pdf)
         layout.addWidget(self.radio_excel)
+        self._init_job_progress(layout)
 
         btn_row = QHBoxLayout()
-        btn_export = QPushButton("متابعة")
-        btn_cancel = QPushButton("إلغاء")
-        btn_export.clicked.connect(self._accept_choice)
-        btn_cancel.clicked.connect(self.reject)
-        btn_row.addWidget(btn_export)
-        btn_row.addWidget(btn_cancel)
+        self.btn_export = QPushButton("متابعة")
+        self.btn_cancel = QPushButton("إلغاء")
+        self.btn_export.clicked.connect(self._accept_choice)
+        self.btn_cancel.clicked.connect(self.reject)
+        btn_row.addWidget(self.btn_export)
+        btn_row.addWidget(self.btn_cancel)
         layout.addLayout(btn_row)
 
     def _accept_choice(self):
+        from datetime import date
         self.selected_format = "excel" if self.radio_excel.isChecked() else "pdf"
-        self.accept()
+        ext = "pdf" if self.selected_format == "pdf" else "xlsx"
+        default_name = f"تقرير_حركات_المتوفى_{self.deceased_id}_{date.today().strftime('%Y%m%d')}.{ext}"
+        filter_text = "PDF Files (*.pdf)" if self.selected_format == "pdf" else "Excel Files (*.xlsx)"
+        path, _ = QFileDialog.getSaveFileName(self, "حفظ تقرير جدول الحركات", default_name, filter_text)
+        if not path:
+            return
+        try:
+            job = submit_financial_table_report(
+                self.deceased_id, self.currency_id, path, self.exported_by, self.selected_format
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "خطأ", f"تعذر تصدير تقرير جدول الحركات: {str(e)}")
+            return
+        self._run_job(
+            job, "تم تصدير تقرير جدول الحركات بنجاح.",
+            [self.radio_pdf, self.radio_excel, self.btn_export],
+        )
 
 class AddTransactionDialog(QDialog):
     def __init__(self, deceased_id, db_service, parent=None, forced_currency_code=None, hide_currency_field=False, hide_date_field=False):
@@ -2498,4 +2583,519 @@ class AddDeceasedTransactionDialog(AddTTableRowDialog):
                 self.currency_input.setFocus()
                 return
 
-        super().validate_and_accept()
\ No newline at end of file
+        super().validate_and_accept()
+class StartupTraceDialog(QDialog):
+    """عرض مراحل بدء التشغيل المسجلة (utils/startup_trace.py) لآخر التشغيلات."""
+    SLOW_PHASE_MS = 100
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        from utils.startup_trace import load_runs
+        self.runs = list(reversed(load_runs()))  # الأحدث أولاً
+        self.setWindowTitle("توقيت بدء التشغيل")
+        self.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+        self.resize(640, 480)
+
+        layout = QVBoxLayout(self)
+        self.run_combo = QComboBox()
+        for run in self.runs:
+            self.run_combo.addItem(f"{run.get('started_at', '---')}  —  {run.get('total_ms', 0):.0f} ms")
+        layout.addWidget(self.run_combo)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["المرحلة", "البداية (ms)", "المدة (ms)", "الخيط"])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        if not self.runs:
+            layout.addWidget(QLabel("لا توجد تشغيلات مسجلة بعد."))
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.run_combo.currentIndexChanged.connect(self.show_run)
+        self.show_run(0)
+
+    def show_run(self, index):
+        phases = self.runs[index].get("phases", []) if 0 <= index < len(self.runs) else []
+        self.table.setRowCount(len(phases))
+        open_ends = []  # نهايات المراحل المفتوحة لإظهار التداخل بالإزاحة
+        for row, phase in enumerate(phases):
+            start = phase.get("start_ms", 0)
+            while open_ends and start >= open_ends[-1]:
+                open_ends.pop()
+            depth = len(open_ends)
+            open_ends.append(start + phase.get("duration_ms", 0))
+            values = [
+                "    " * depth + phase.get("name", ""),
+                f"{phase.get('start_ms', 0):.1f}",
+                f"{phase.get('duration_ms', 0):.1f}",
+                phase.get("thread", ""),
+            ]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if phase.get("duration_ms", 0) >= self.SLOW_PHASE_MS:
+                    item.setForeground(Qt.GlobalColor.darkRed)
+                self.table.setItem(row, col, item)
+        self.table.resizeColumnsToContents()
+
+
+class QueryStatsDialog(QDialog):
+    """تشخيص الاستعلامات: أكثر الاستعلامات كلفة وحالات N+1 (database/query_stats.py)."""
+    REFRESH_MS = 2000
+    MAX_COLUMN_WIDTH = 360
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        from database.query_stats import query_stats
+        self.query_stats = query_stats
+        self.setWindowTitle("تشخيص الاستعلامات")
+        self.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+        self.resize(900, 640)
+
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.enabled_check = QCheckBox("تفعيل قياس الاستعلامات")
+        self.enabled_check.setChecked(query_stats.enabled)
+        self.enabled_check.toggled.connect(self.toggle_enabled)
+        top.addWidget(self.enabled_check)
+        self.count_rows_check = QCheckBox("عدّ صفوف SQLite")
+        self.count_rows_check.setToolTip(
+            "SQLite لا يعطي عدد صفوف SELECT قبل جلبها؛ عدّها يجمع كل نتيجة استعلام ORM في الذاكرة\n"
+            "قبل تسليمها، فيزيد استهلاك الذاكرة في الصفحات الكبيرة ويبطئها أثناء التفعيل.\n"
+            "في MySQL يُؤخذ العدد من المشغّل دون هذه الكلفة."
+        )
+        self.count_rows_check.setChecked(query_stats.count_orm_rows)
+        self.count_rows_check.toggled.connect(self.toggle_count_rows)
+        top.addWidget(self.count_rows_check)
+        self.summary_label = QLabel()
+        top.addWidget(self.summary_label, 1)
+        layout.addLayout(top)
+
+        self.queries_table = self._make_table(["الاستعلام", "العدد", "الإجمالي (ms)", "الأقصى (ms)", "الصفوف", "المصدر"])
+        layout.addWidget(self.queries_table, 3)
+
+        layout.addWidget(QLabel("حالات N+1 (تكرار الاستعلام نفسه داخل إجراء واحد):"))
+        self.findings_table = self._make_table(["الإجراء", "الوقت", "التكرار", "الإجمالي (ms)", "الاستعلام"])
+        layout.addWidget(self.findings_table, 2)
+
+        buttons = QHBoxLayout()
+        refresh_btn = QPushButton("تحديث")
+        refresh_btn.clicked.connect(self.refresh)
+        reset_btn = QPushButton("تصفير")
+        reset_btn.clicked.connect(self.reset_stats)
+        save_btn = QPushButton("حفظ JSON")
+        save_btn.clicked.connect(self.save_json)
+        close_btn = QPushButton("إغلاق")
+        close_btn.clicked.connect(self.close)
+        for button in (refresh_btn, reset_btn, save_btn):
+            buttons.addWidget(button)
+        buttons.addStretch(1)
+        buttons.addWidget(close_btn)
+        layout.addLayout(buttons)
+
+        # التحديث الدوري فقط أثناء ظهور النافذة (النافذة غير حاجبة وتبقى مفتوحة أثناء العمل)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def _make_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.verticalHeader().setVisible(False)
+        table.setWordWrap(False)
+        return table
+
+    def _fill(self, table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col == 0 or len(value) > 80:
+                    item.setToolTip(value)
+                table.setItem(row, col, item)
+        table.resizeColumnsToContents()
+        # نص SQL طويل؛ نحد عرض عموده حتى تبقى الأعمدة الرقمية ظاهرة
+        for col in range(table.columnCount()):
+            if table.columnWidth(col) > self.MAX_COLUMN_WIDTH:
+                table.setColumnWidth(col, self.MAX_COLUMN_WIDTH)
+
+    def refresh(self):
+        snapshot = self.query_stats.snapshot()
+        self.summary_label.setText(
+            f"منذ {snapshot['since']}  —  {snapshot['total_queries']} استعلام، {snapshot['total_ms']:.0f} ms"
+        )
+        self._fill(self.queries_table, [
+            [
+                query["fingerprint"][:160],
+                str(query["count"]),
+                f"{query['total_ms']:.1f}",
+                f"{query['max_ms']:.1f}",
+                str(query["rows"]),
+                "، ".join(f"{name} ({count})" for name, count in list(query["callers"].items())[:3]),
+            ]
+            for query in snapshot["queries"]
+        ])
+        self._fill(self.findings_table, [
+            [
+                finding["action"],
+                finding["at"],
+                str(finding["count"]),
+                f"{finding['total_ms']:.1f}",
+                finding["fingerprint"][:160],
+            ]
+            for finding in reversed(snapshot["n_plus_one"])
+        ])
+
+    def toggle_enabled(self, checked):
+        if checked:
+            self.query_stats.enable()
+        else:
+            self.query_stats.disable()
+        self.refresh()
+
+    def toggle_count_rows(self, checked):
+        self.query_stats.count_orm_rows = checked
+
+    def reset_stats(self):
+        self.query_stats.reset()
+        self.refresh()
+
+    def save_json(self, _=False):
+        path, _ = QFileDialog.getSaveFileName(self, "حفظ تشخيص الاستعلامات", "query_stats.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            self.query_stats.dump_json(path)
+        except OSError as e:
+            QMessageBox.critical(self, "خطأ", f"تعذر حفظ الملف:\n{e}")
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start(self.REFRESH_MS)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+
+class StallLogDialog(QDialog):
+    """تجمّد الواجهة المسجل (utils/stall_watchdog.py) مجمّعاً حسب موضع الاستدعاء."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        from utils.stall_watchdog import aggregate_stalls, load_stalls, stall_watchdog
+        stalls = load_stalls()
+        self.groups = aggregate_stalls(stalls)
+        self.setWindowTitle("تجمّد الواجهة")
+        self.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+        self.resize(860, 600)
+
+        layout = QVBoxLayout(self)
+        status = f"العتبة {stall_watchdog.threshold_ms} ms" if stall_watchdog.running else "المراقب غير مفعل"
+        layout.addWidget(QLabel(f"{len(stalls)} حالة تجمّد مسجلة  —  {status}"))
+
+        self.table = QTableWidget(len(self.groups), 6)
+        self.table.setHorizontalHeaderLabels(["موضع الاستدعاء", "العدد", "الإجمالي (ms)", "الأقصى (ms)", "آخر مرة", "السطر"])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.verticalHeader().setVisible(False)
+        for row, group in enumerate(self.groups):
+            values = [
+                group["site"],
+                str(group["count"]),
+                f"{group['total_ms']:.0f}",
+                f"{group['max_ms']:.0f}",
+                group["last_at"],
+                group["locations"].most_common(1)[0][0],
+            ]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+        self.table.resizeColumnsToContents()
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table, 2)
+
+        layout.addWidget(QLabel("مكدس أطول تجمّد لموضع الاستدعاء المحدد:"))
+        self.stack_view = QPlainTextEdit()
+        self.stack_view.setReadOnly(True)
+        self.stack_view.setLayoutDirection(Qt.LayoutDirection.LeftToRight)
+        self.stack_view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        layout.addWidget(self.stack_view, 3)
+
+        if not self.groups:
+            self.stack_view.setPlainText("لا توجد حالات تجمّد مسجلة.")
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.table.currentCellChanged.connect(lambda row, *_: self.show_stack(row))
+        if self.groups:
+            self.table.selectRow(0)
+
+    def show_stack(self, row):
+        if 0 <= row < len(self.groups):
+            self.stack_view.setPlainText(self.groups[row]["stack"])
+
+
+class ProfileCaptureDialog(QDialog):
+    """تشغيل التقاط cProfile/tracemalloc وعرض ملخصات الالتقاطات المحفوظة (utils/profiler_capture.py)."""
+    TABLE_MAX_COLUMN_WIDTH = 420
+
+    def __init__(self, capture, parent=None, selected_at=None):
+        super().__init__(parent)
+        from utils.profiler_capture import load_captures
+        self.capture = capture
+        self.captures = load_captures()
+        self.setWindowTitle("التقاط الأداء")
+        self.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+        self.resize(900, 660)
+
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        next_btn = QPushButton("قياس العملية التالية")
+        next_btn.setToolTip("يبدأ القياس عند النقرة أو الضغطة التالية (الاختصار Ctrl+Shift+F12)")
+        next_btn.clicked.connect(self.arm_next_operation)
+        controls.addWidget(next_btn)
+        self.seconds_spin = QDoubleSpinBox()
+        self.seconds_spin.setRange(1, 300)
+        self.seconds_spin.setDecimals(0)
+        self.seconds_spin.setValue(10)
+        self.seconds_spin.setSuffix(" ث")
+        window_btn = QPushButton("قياس لمدة")
+        window_btn.clicked.connect(self.start_window)
+        controls.addWidget(window_btn)
+        controls.addWidget(self.seconds_spin)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        self.capture_combo = QComboBox()
+        for item in self.captures:
+            self.capture_combo.addItem(f"{item.get('at', '---')}  —  {item.get('operation', '')}  —  {item.get('duration_ms', 0):.0f} ms")
+        layout.addWidget(self.capture_combo)
+        self.details_label = QLabel()
+        self.details_label.setWordWrap(True)
+        layout.addWidget(self.details_label)
+
+        self.functions_table = self._make_table(["الدالة", "الاستدعاءات", "الذاتي (ms)", "التراكمي (ms)"])
+        layout.addWidget(self.functions_table, 3)
+        layout.addWidget(QLabel("أكبر التخصيصات المتبقية في الذاكرة:"))
+        self.allocations_table = self._make_table(["الموضع", "الحجم (KB)", "العدد"])
+        layout.addWidget(self.allocations_table, 2)
+
+        if not self.captures:
+            self.details_label.setText("لا توجد التقاطات محفوظة بعد.")
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.capture_combo.currentIndexChanged.connect(self.show_capture)
+        index = next((i for i, item in enumerate(self.captures) if item.get("at") == selected_at), 0)
+        self.capture_combo.setCurrentIndex(index)
+        self.show_capture(index)
+
+    def _make_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.verticalHeader().setVisible(False)
+        table.setWordWrap(False)
+        return table
+
+    def _fill(self, table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                table.setItem(row, col, QTableWidgetItem(value))
+        table.resizeColumnsToContents()
+        if table.columnWidth(0) > self.TABLE_MAX_COLUMN_WIDTH:
+            table.setColumnWidth(0, self.TABLE_MAX_COLUMN_WIDTH)
+
+    def show_capture(self, index):
+        item = self.captures[index] if 0 <= index < len(self.captures) else {}
+        if item:
+            dataset = "، ".join(f"{key}: {value}" for key, value in item.get("dataset", {}).items())
+            self.details_label.setText(
+                f"المدة {item.get('duration_ms', 0):.0f} ms  —  ذروة الذاكرة {item.get('peak_kb', 0):.0f} KB"
+                f"  —  البيانات: {dataset or '---'}\n{item.get('prof_path', '')}"
+            )
+        self._fill(self.functions_table, [
+            [f["function"], str(f["calls"]), f"{f['tottime_ms']:.1f}", f"{f['cumtime_ms']:.1f}"]
+            for f in item.get("top_functions", [])
+        ])
+        self._fill(self.allocations_table, [
+            [a["location"], f"{a['size_kb']:.1f}", str(a["count"])]
+            for a in item.get("top_allocations", [])
+        ])
+
+    def arm_next_operation(self):
+        self.capture.arm_next_operation()
+        self.accept()
+
+    def start_window(self):
+        self.capture.start_window(int(self.seconds_spin.value()))
+        self.accept()
+
+
+class MonthlyBarChart(QWidget):
+    """رسم أعمدة بسيط لعدة سلاسل شهرية (بدون مكتبة رسوم: QtCharts غير متوفرة)."""
+    COLORS = ("#1A2A6C", "#C9A227", "#B21F1F")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.months = []
+        self.series = []  # [(العنوان، القيم بترتيب الأشهر)]
+        self.setMinimumHeight(220)
+
+    def set_data(self, months, series):
+        self.months = months
+        self.series = series
+        self.update()
+
+    def paintEvent(self, event):
+        from PyQt6.QtGui import QColor, QPainter
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = self.rect().adjusted(10, 28, -10, -22)
+        peak = max((value for _, values in self.series for value in values), default=0)
+        if not self.months or peak <= 0:
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "لا توجد حركات في هذه الفترة")
+            return
+
+        # مفتاح الألوان
+        x = rect.right()
+        for (label, _), color in zip(self.series, self.COLORS):
+            width = painter.fontMetrics().horizontalAdvance(label)
+            painter.fillRect(x - 12, 8, 12, 12, QColor(color))
+            painter.drawText(x - 18 - width, 19, label)
+            x -= width + 36
+
+        slot = rect.width() / len(self.months)
+        bar = max(1.0, slot * 0.8 / len(self.series))
+        label_every = max(1, int(60 / slot) + 1)
+        for i, month in enumerate(self.months):
+            # الأقدم على اليمين كما في اتجاه الواجهة
+            left = rect.right() - (i + 1) * slot + slot * 0.1
+            for j, ((_, values), color) in enumerate(zip(self.series, self.COLORS)):
+                height = rect.height() * values[i] / peak
+                painter.fillRect(int(left + j * bar), int(rect.bottom() - height), max(1, int(bar)), int(height), QColor(color))
+            if i % label_every == 0:
+                text = month.strftime("%Y-%m")
+                painter.drawText(min(int(left), rect.right() - painter.fontMetrics().horizontalAdvance(text)), rect.bottom() + 16, text)
+
+
+class MonthlyAnalyticsDialog(QDialog):
+    """الإيداعات والتوزيعات والسحوبات الشهرية لكل عملة من الملخصات الشهرية (services/analytics.py)."""
+    CHART_SERIES = ("estate_deposits", "orphan_deposits", "withdrawals")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        from services.reference_cache import reference_cache
+        self.db_service = parent.db_service
+        self.currencies = reference_cache.currencies()
+        self.setWindowTitle("التحليلات الشهرية")
+        self.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+        self.resize(1000, 680)
+
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        today = QDate.currentDate()
+        self.month_from = QDateEdit(QDate(today.year() - 1, today.month(), 1).addMonths(1))
+        self.month_to = QDateEdit(QDate(today.year(), today.month(), 1))
+        for edit in (self.month_from, self.month_to):
+            edit.setDisplayFormat("yyyy-MM")
+            edit.setCalendarPopup(True)
+        self.currency_combo = QComboBox()
+        for currency in self.currencies:
+            self.currency_combo.addItem(currency.name, currency.id)
+        show_btn = QPushButton("عرض")
+        show_btn.clicked.connect(self.refresh)
+        controls.addWidget(QLabel("من شهر:"))
+        controls.addWidget(self.month_from)
+        controls.addWidget(QLabel("إلى شهر:"))
+        controls.addWidget(self.month_to)
+        controls.addWidget(QLabel("العملة:"))
+        controls.addWidget(self.currency_combo)
+        controls.addWidget(show_btn)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        self.chart = MonthlyBarChart()
+        layout.addWidget(self.chart, 2)
+
+        from services.analytics import SERIES_LABELS
+        self.table = QTableWidget(0, len(SERIES_LABELS) + 1)
+        self.table.setHorizontalHeaderLabels(["الشهر", *SERIES_LABELS])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table, 3)
+
+        buttons = QHBoxLayout()
+        export_btn = QPushButton("تصدير Excel")
+        export_btn.clicked.connect(self.export_excel)
+        close_btn = QPushButton("إغلاق")
+        close_btn.clicked.connect(self.close)
+        buttons.addWidget(export_btn)
+        buttons.addStretch(1)
+        buttons.addWidget(close_btn)
+        layout.addLayout(buttons)
+
+        self.data = {}
+        self.currency_combo.currentIndexChanged.connect(self.show_currency)
+        self.refresh()
+
+    def selected_range(self):
+        return self.month_from.date().toPyDate(), self.month_to.date().toPyDate()
+
+    def refresh(self):
+        from services.analytics import load_monthly_analytics
+        month_from, month_to = self.selected_range()
+        if month_from > month_to:
+            QMessageBox.warning(self, "خطأ في النطاق الزمني", "شهر البداية لا يمكن أن يكون بعد شهر النهاية")
+            return
+        try:
+            self.data = load_monthly_analytics(self.db_service, month_from, month_to, self.currencies)
+        except Exception as e:
+            QMessageBox.critical(self, "خطأ", f"تعذر تحميل التحليلات:\n{e}")
+            return
+        self.show_currency()
+
+    def show_currency(self, _=None):
+        from services.analytics import SERIES_KEYS, SERIES_LABELS
+        months = self.data.get(self.currency_combo.currentData(), [])
+        self.table.setRowCount(len(months))
+        for row, month in enumerate(reversed(months)):
+            self.table.setItem(row, 0, QTableWidgetItem(month.month.strftime("%Y-%m")))
+            for col, (total, count) in enumerate(zip(month.totals, month.counts), start=1):
+                item = QTableWidgetItem("{:,.2f}".format(total))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                item.setToolTip(f"{count} حركة")
+                self.table.setItem(row, col, item)
+        indexes = [SERIES_KEYS.index(key) for key in self.CHART_SERIES]
+        self.chart.set_data(
+            [m.month for m in months],
+            [(SERIES_LABELS[i], [m.totals[i] for m in months]) for i in indexes],
+        )
+
+    def export_excel(self):
+        from services.reports import generate_monthly_analytics_report
+        month_from, month_to = self.selected_range()
+        default_name = f"التحليلات_الشهرية_{month_from:%Y-%m}_إلى_{month_to:%Y-%m}.xlsx"
+        path, _ = QFileDialog.getSaveFileName(self, "حفظ التقرير", default_name, "Excel Files (*.xlsx)")
+        if not path:
+            return
+        try:
+            generate_monthly_analytics_report(month_from, month_to, path, self.db_service)
+            QMessageBox.information(self, "نجاح", "تم تصدير التقرير بنجاح")
+        except Exception as e:
+            QMessageBox.critical(self, "خطأ", f"حدث خطأ أثناء التصدير: {str(e)}")
@@ -0,0 +1,147 @@
+from PyQt6.QtWidgets import QComboBox, QDateEdit, QHBoxLayout, QLabel, QLineEdit, QPushButton, QSpinBox, QWidget
+from PyQt6.QtCore import QDate, Qt, QTimer, pyqtSignal
+
+
+class ListFilterBar(QWidget):
+    """
+    شريط تصفية أفقي لتبويبات القوائم.
+
+    fields: قائمة من (key, label, kind, options) حيث kind أحد:
+      - "text": حقل نصي، القيمة تحت key.
+      - "choice": قائمة منسدلة بخيار "الكل"، options قائمة (value, text).
+      - "date_range": تاريخان، القيم تحت key_from و key_to.
+      - "int_range": رقمان، القيم تحت key_min و key_max.
+    يرسل filters_changed(dict) بعد توقف قصير عن الكتابة، ويحتوي القاموس الحقول المعبأة فقط.
+    """
+    filters_changed = pyqtSignal(dict)
+
+    EMPTY_DATE = QDate(1900, 1, 1)
+    DEBOUNCE_MS = 350
+
+    def __init__(self, fields, parent=None):
+        super().__init__(parent)
+        self.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
+        self._editors = {}
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._emit_filters)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(6)
+
+        for key, label, kind, options in fields:
+            if kind == "text":
+                editor = QLineEdit()
+                editor.setPlaceholderText(label)
+                editor.setClearButtonEnabled(True)
+                editor.textChanged.connect(self._schedule)
+                layout.addWidget(editor, 2)
+                self._editors[key] = (kind, editor)
+            elif kind == "choice":
+                layout.addWidget(QLabel(label))
+                editor = QComboBox()
+                self._fill_choices(editor, options or [])
+                editor.currentIndexChanged.connect(self._schedule)
+                layout.addWidget(editor, 1)
+                self._editors[key] = (kind, editor)
+            elif kind == "date_range":
+                layout.addWidget(QLabel(label))
+                editors = (self._date_edit("من"), self._date_edit("إلى"))
+                for editor in editors:
+                    editor.dateChanged.connect(self._schedule)
+                    layout.addWidget(editor, 1)
+                self._editors[key] = (kind, editors)
+            elif kind == "int_range":
+                layout.addWidget(QLabel(label))
+                editors = (self._spin_box("من"), self._spin_box("إلى"))
+                for editor in editors:
+                    editor.valueChanged.connect(self._schedule)
+                    layout.addWidget(editor)
+                self._editors[key] = (kind, editors)
+            else:
+                raise ValueError(f"Unknown filter kind: {kind}")
+
+        clear_btn = QPushButton("مسح")
+        clear_btn.clicked.connect(self.clear)
+        layout.addWidget(clear_btn)
+
+    # ===== Public API =====
+    def filters(self):
+        result = {}
+        for key, (kind, editor) in self._editors.items():
+            if kind == "text":
+                value = editor.text().strip()
+                if value:
+                    result[key] = value
+            elif kind == "choice":
+                value = editor.currentData()
+                if value is not None:
+                    result[key] = value
+            elif kind == "date_range":
+                for suffix, date_edit in zip(("from", "to"), editor):
+                    if date_edit.date() != self.EMPTY_DATE:
+                        result[f"{key}_{suffix}"] = date_edit.date().toPyDate()
+            elif kind == "int_range":
+                for suffix, spin in zip(("min", "max"), editor):
+                    if spin.value() != spin.minimum():
+                        result[f"{key}_{suffix}"] = spin.value()
+        return result
+
+    def set_choices(self, key, options):
+        """تحديث خيارات قائمة منسدلة مع الإبقاء على القيمة المختارة إن وُجدت."""
+        kind, editor = self._editors[key]
+        current = editor.currentData()
+        editor.blockSignals(True)
+        self._fill_choices(editor, options)
+        index = editor.findData(current) if current is not None else 0
+        editor.setCurrentIndex(max(0, index))
+        editor.blockSignals(False)
+
+    def clear(self):
+        for kind, editor in self._editors.values():
+            widgets = editor if isinstance(editor, tuple) else (editor,)
+            for widget in widgets:
+                widget.blockSignals(True)
+                if kind == "text":
+                    widget.clear()
+                elif kind == "choice":
+                    widget.setCurrentIndex(0)
+                elif kind == "date_range":
+                    widget.setDate(self.EMPTY_DATE)
+                elif kind == "int_range":
+                    widget.setValue(widget.minimum())
+                widget.blockSignals(False)
+        self._debounce.stop()
+        self._emit_filters()
+
+    # ===== Internals =====
+    def _fill_choices(self, combo, options):
+        combo.clear()
+        combo.addItem("الكل", None)
+        for value, text in options:
+            combo.addItem(str(text), value)
+
+    def _date_edit(self, placeholder):
+        editor = QDateEdit()
+        editor.setCalendarPopup(True)
+        editor.setDisplayFormat("dd/MM/yyyy")
+        editor.setMinimumDate(self.EMPTY_DATE)
+        editor.setSpecialValueText(placeholder)  # يظهر عند القيمة الدنيا = بدون تصفية
+        editor.setDate(self.EMPTY_DATE)
+        return editor
+
+    def _spin_box(self, placeholder):
+        editor = QSpinBox()
+        editor.setRange(-1, 99999)
+        editor.setSpecialValueText(placeholder)  # -1 = بدون تصفية
+        editor.setValue(-1)
+        return editor
+
+    def _schedule(self, *_):
+        self._debounce.start()
+
+    def _emit_filters(self):
+        self.filters_changed.emit(self.filters())
@@ -0,0 +1,42 @@
+import bcrypt
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from database.models import User
+
+
+class LoginWorker(QThread):
+    """
+    التحقق من اسم المستخدم وكلمة المرور في الخلفية.
+
+    bcrypt.checkpw بطيء عمداً (مئات الميلي ثانية)، فتشغيله في خيط الواجهة يجمّد
+    نافذة الدخول. يرسل succeeded(user_id) عند النجاح؛ وعلى المستدعي إعادة تحميل
+    المستخدم في جلسته، لأن كائنات ORM لا تنتقل بين الجلسات والخيوط.
+    """
+    succeeded = pyqtSignal(int)
+    failed = pyqtSignal(str, bool)  # message, is_validation_error
+
+    def __init__(self, username, password):
+        super().__init__()
+        self.username = username
+        self.password = password
+
+    def run(self):
+        # الجلسة المشتركة في الواجهة ليست آمنة بين الخيوط، لذلك نفتح جلسة خاصة بالعامل
+        from services.db_services import DBService
+        service = DBService()
+        try:
+            row = (
+                service.session.query(User.id, User.password)
+                .filter_by(username=self.username)
+                .first()
+            )
+            if row is None:
+                self.failed.emit("اسم المستخدم غير موجود.", True)
+            elif bcrypt.checkpw(self.password.encode('utf-8'), row.password.encode('utf-8')):
+                self.succeeded.emit(row.id)
+            else:
+                self.failed.emit("كلمة المرور غير صحيحة.", True)
+        except Exception as e:
+            self.failed.emit(str(e), False)
+        finally:
+            service.close()
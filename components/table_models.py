@@ -0,0 +1,227 @@
+from collections import OrderedDict
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+from PyQt6.QtGui import QColor
+
+from services.query_executor import query_executor
+
+
+class LazyTableModel(QAbstractTableModel):
+    """
+    نموذج جدول للقراءة فقط يجلب الصفوف على دفعات عند التمرير (canFetchMore/fetchMore).
+
+    - fetch_func(db_service, page, per_page, **query_params) يعيد قاموساً بصيغة
+      DBService.paginate ({"items", "total", ...}).
+    - row_formatter(item) يحول العنصر إلى قائمة خلايا؛ الخلية نص أو (نص, لون).
+      يُستدعى داخل خيط الجلب، فلا يجب أن يلمس عناصر الواجهة.
+    - كل الدفعات (بما فيها الأولى) تُجلب عبر query_executor فلا يتوقف خيط الواجهة؛
+      الدفعة التالية تُجلب مسبقاً، ويُحتفظ بعدد محدود من الدفعات في الذاكرة؛ الدفعة
+      التي أُخرجت من الذاكرة تُعاد قراءتها في الخلفية عند الحاجة إليها وتظهر عند وصولها.
+    - sort_keys: مفتاح الترتيب لكل عمود (أو None إن لم يكن قابلاً للترتيب)؛ الترتيب
+      والتصفية يُمرران إلى fetch_func كـ sort=(key, descending) و filters=dict
+      فيُنفذان في قاعدة البيانات لا في الذاكرة.
+    """
+    loaded_changed = pyqtSignal(int, int)  # loaded rows, total rows
+    loading_changed = pyqtSignal(bool)     # جاري تحميل الدفعة الأولى
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, headers, fetch_func, row_formatter, chunk_size=100, max_cached_chunks=10, sort_keys=None, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.sort_keys = list(sort_keys or [])
+        self.fetch_func = fetch_func
+        self.row_formatter = row_formatter
+        self.chunk_size = chunk_size
+        self.max_cached_chunks = max(2, max_cached_chunks)
+        self.query_params = {}
+
+        self._generation = 0
+        self._loaded_rows = 0
+        self._total = 0
+        self._chunks = OrderedDict()   # page -> rows (LRU)
+        self._prefetched = {}          # page -> rows جاهزة لم تُعرض بعد
+        self._pending_pages = set()
+        self._awaiting_append = None   # رقم الصفحة التي طلبها fetchMore وتنتظر الوصول
+        self._refetching = set()       # دفعات أُخرجت من الذاكرة ويُعاد جلبها للعرض
+        self._tickets = {}             # page -> QueryTicket
+
+    # ===== Qt model API =====
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            if 0 <= section < len(self.headers):
+                return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ForegroundRole):
+            return None
+        row = self._row(index.row())
+        if row is None or index.column() >= len(row):
+            return None
+        cell = row[index.column()]
+        if isinstance(cell, tuple):
+            text, color = cell
+        else:
+            text, color = cell, None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return "" if text is None else str(text)
+        return QColor(color) if color is not None else None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded_rows < self._total
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        key = self.sort_keys[column] if 0 <= column < len(self.sort_keys) else None
+        sort = (key, order == Qt.SortOrder.DescendingOrder) if key else None
+        if sort == self.query_params.get("sort"):
+            return
+        self.query_params["sort"] = sort
+        if self._generation:  # لا نحمل شيئاً قبل أول فتح للتبويب
+            self.reload()
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self.canFetchMore():
+            return
+        page = self._loaded_rows // self.chunk_size + 1
+        if page in self._prefetched:
+            self._append_chunk(page, self._prefetched.pop(page))
+        else:
+            self._awaiting_append = page
+            self._request_chunk(page)
+
+    # ===== Public API =====
+    def reload(self, **query_params):
+        """إعادة التحميل من البداية؛ الدفعة الأولى تُجلب في الخلفية وتظهر عند وصولها."""
+        if query_params:
+            self.query_params.update(query_params)
+        self._generation += 1
+        for ticket in self._tickets.values():
+            ticket.cancel()
+        self._tickets.clear()
+        self.beginResetModel()
+        self._loaded_rows = 0
+        self._total = 0
+        self._chunks.clear()
+        self._prefetched.clear()
+        self._pending_pages.clear()
+        self._refetching.clear()
+        self._awaiting_append = 1
+        self.endResetModel()
+        self.loading_changed.emit(True)
+        self._request_chunk(1)
+
+    def set_filters(self, filters):
+        filters = dict(filters or {})
+        if filters == self.query_params.get("filters", {}):
+            return
+        self.query_params["filters"] = filters
+        if self._generation:
+            self.reload()
+
+    def row_key(self, row):
+        """قيمة الخلية الأولى (المعرّف) للصف المحدد."""
+        data = self._row(row)
+        if not data:
+            return None
+        cell = data[0]
+        return cell[0] if isinstance(cell, tuple) else cell
+
+    @property
+    def total(self):
+        return self._total
+
+    # ===== Internals =====
+    def _row(self, row):
+        if row < 0 or row >= self._loaded_rows:
+            return None
+        page = row // self.chunk_size + 1
+        rows = self._chunks.get(page)
+        if rows is None:
+            # دفعة أُخرجت من الذاكرة (يحدث فقط عند الرجوع لمسافة بعيدة): تُعرض فارغة حتى تصل
+            self._refetching.add(page)
+            self._request_chunk(page)
+            return None
+        self._chunks.move_to_end(page)
+        offset = row % self.chunk_size
+        return rows[offset] if offset < len(rows) else None
+
+    def _fetch_rows(self, service, page, per_page, query_params):
+        """تعمل في خيط العامل."""
+        result = self.fetch_func(service, page, per_page, **query_params)
+        return [self.row_formatter(item) for item in result["items"]], int(result["total"])
+
+    def _store_chunk(self, page, rows):
+        self._chunks[page] = rows
+        self._chunks.move_to_end(page)
+        while len(self._chunks) > self.max_cached_chunks:
+            self._chunks.popitem(last=False)
+
+    def _append_chunk(self, page, rows):
+        if not rows:
+            self._total = self._loaded_rows
+            self.loaded_changed.emit(self._loaded_rows, self._total)
+            return
+        first = self._loaded_rows
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._store_chunk(page, rows)
+        self._loaded_rows += len(rows)
+        self.endInsertRows()
+        self.loaded_changed.emit(self._loaded_rows, self._total)
+        self._prefetch_next()
+
+    def _prefetch_next(self):
+        if not self.canFetchMore():
+            return
+        next_page = self._loaded_rows // self.chunk_size + 1
+        if next_page not in self._prefetched:
+            self._request_chunk(next_page)
+
+    def _request_chunk(self, page):
+        if page in self._pending_pages:
+            return
+        self._pending_pages.add(page)
+        generation = self._generation
+        self._tickets[page] = query_executor.submit(
+            self._fetch_rows, page, self.chunk_size, dict(self.query_params),
+            on_result=lambda result, g=generation, p=page: self._on_chunk_ready(g, p, *result),
+            on_error=lambda error, g=generation, p=page: self._on_chunk_failed(g, p, str(error)),
+        )
+
+    def _on_chunk_ready(self, generation, page, rows, total):
+        if generation != self._generation:
+            return  # نتيجة قديمة من قبل إعادة التحميل
+        self._pending_pages.discard(page)
+        self._tickets.pop(page, None)
+        self._total = total
+        if self._awaiting_append == page:
+            self._awaiting_append = None
+            if page == 1:
+                self.loading_changed.emit(False)
+            self._append_chunk(page, rows)
+        elif page in self._refetching:
+            self._refetching.discard(page)
+            self._store_chunk(page, rows)
+            first = (page - 1) * self.chunk_size
+            last = min(first + len(rows), self._loaded_rows) - 1
+            if last >= first:
+                self.dataChanged.emit(self.index(first, 0), self.index(last, len(self.headers) - 1))
+        else:
+            self._prefetched[page] = rows
+
+    def _on_chunk_failed(self, generation, page, message):
+        if generation != self._generation:
+            return
+        self._pending_pages.discard(page)
+        self._refetching.discard(page)
+        self._tickets.pop(page, None)
+        if self._awaiting_append == page:
+            self._awaiting_append = None
+            if page == 1:
+                self.loading_changed.emit(False)
+        self.load_failed.emit(message)
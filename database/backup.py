@@ -1,11 +1,14 @@
 import os
 import sys
 import subprocess
+import time
 from datetime import datetime
 from PyQt6.QtWidgets import (QFileDialog, QMessageBox, QProgressDialog, 
                              QMainWindow, QPushButton, QVBoxLayout, QWidget, QApplication)
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from utils.metrics import metrics
+
 # --- 1. الخيط المسؤول عن العمليات الثقيلة (Worker) ---
 class DatabaseWorker(QThread):
     # نعدل الإشارة لتشمل (النجاح، الرسالة، والنمط)
@@ -18,6 +21,7 @@ class DatabaseWorker(QThread):
         self.mode = mode
 
     def run(self):
+        started = time.perf_counter()
         try:
             if self.mode == "backup":
                 with open(self.file_path, "w", encoding="utf-8") as f:
@@ -27,11 +31,14 @@ class DatabaseWorker(QThread):
                 result = subprocess.run(full_command, stderr=subprocess.PIPE, shell=True, text=True)
 
             if result.returncode == 0:
+                metrics.record(self.mode, started)
                 # نرسل النمط (mode) مع إشارة الانتهاء
                 self.finished.emit(True, "تمت العملية بنجاح", self.mode)
             else:
+                metrics.error(self.mode)
                 self.finished.emit(False, result.stderr, self.mode)
         except Exception as e:
+            metrics.error(self.mode)
             self.finished.emit(False, str(e), self.mode)
 
 # --- 2. مدير النسخ الاحتياطي (Backup Manager) ---
@@ -119,6 +126,8 @@ class BackupManager:
     def restart_application(self):
         """إعادة تشغيل البرنامج لضمان تحديث الاتصالات والبيانات"""
         python = sys.executable
+        # execl لا يستدعي atexit؛ نكتب المقاييس قبل استبدال العملية
+        metrics.flush()
         os.execl(python, python, *sys.argv)
 
 # # --- 3. النافذة الرئيسية ---
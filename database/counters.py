@@ -0,0 +1,213 @@
+"""
+الأعمدة المشتقة (denormalized) وصيانتها:
+
+- deceased_people.orphans_count: عدد الأيتام المرتبطين بالمتوفى.
+- guardians.orphans_count: عدد الأيتام المرتبطين بالوصي (كل الروابط، الحالية والمنتهية).
+- orphans.primary_guardian_id: الوصي صاحب الرابط الأساسي (is_primary) لليتيم.
+
+تُحدَّث هذه القيم داخل نفس المعاملة التي تغيّر الأيتام أو روابط الوصاية:
+بعد كل flush نعيد حساب القيم للصفوف المتأثرة فقط، وكذلك بعد عمليات
+query(...).update()/delete() الجماعية على Orphan و OrphanGuardian.
+repair_denormalized_counts يعيد حساب كل الصفوف ويصلح أي انحراف (مثلاً بعد تعديل
+يدوي على القاعدة)، ويمكن تشغيله من سطر الأوامر:
+
+    python -m database.counters            # فحص فقط
+    python -m database.counters --repair   # فحص وإصلاح
+"""
+import logging
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from .models import Deceased, Guardian, Orphan, OrphanGuardian
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "denormalized_refreshed"
+_CHUNK_SIZE = 500
+
+deceased_t = Deceased.__table__
+guardians_t = Guardian.__table__
+orphans_t = Orphan.__table__
+links_t = OrphanGuardian.__table__
+
+
+# ===== Expressions =====
+def _deceased_count_expr():
+    return select(func.count()).select_from(orphans_t).where(orphans_t.c.deceased_id == deceased_t.c.id).scalar_subquery()
+
+
+def _guardian_count_expr():
+    return select(func.count()).select_from(links_t).where(links_t.c.guardian_id == guardians_t.c.id).scalar_subquery()
+
+
+def _primary_guardian_expr():
+    # عند وجود أكثر من رابط أساسي (بيانات قديمة) نعتمد الأحدث
+    return (
+        select(links_t.c.guardian_id)
+        .where(links_t.c.orphan_id == orphans_t.c.id, links_t.c.is_primary == True)
+        .order_by(links_t.c.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _chunks(ids):
+    ids = sorted(ids)
+    for i in range(0, len(ids), _CHUNK_SIZE):
+        yield ids[i:i + _CHUNK_SIZE]
+
+
+def refresh_counts(connection, deceased_ids=(), guardian_ids=(), orphan_ids=()):
+    """إعادة حساب القيم المشتقة لمجموعة محددة من الصفوف."""
+    for ids in _chunks(deceased_ids):
+        connection.execute(update(deceased_t).where(deceased_t.c.id.in_(ids)).values(orphans_count=_deceased_count_expr()))
+    for ids in _chunks(guardian_ids):
+        connection.execute(update(guardians_t).where(guardians_t.c.id.in_(ids)).values(orphans_count=_guardian_count_expr()))
+    for ids in _chunks(orphan_ids):
+        connection.execute(update(orphans_t).where(orphans_t.c.id.in_(ids)).values(primary_guardian_id=_primary_guardian_expr()))
+
+
+# ===== Change tracking =====
+def _column_values(obj, attr):
+    """القيمة الحالية لعمود مع قيمته السابقة إن تغيّر في هذه المعاملة."""
+    history = sa_inspect(obj).attrs[attr].history
+    values = set(history.added) | set(history.deleted) | set(history.unchanged)
+    values.add(sa_inspect(obj).dict.get(attr))
+    values.discard(None)
+    return values
+
+
+def _collect_affected(session):
+    deceased_ids, guardian_ids, orphan_ids = set(), set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Orphan):
+            deceased_ids |= _column_values(obj, "deceased_id")
+            if obj.id is not None:
+                orphan_ids.add(obj.id)
+        elif isinstance(obj, OrphanGuardian):
+            guardian_ids |= _column_values(obj, "guardian_id")
+            orphan_ids |= _column_values(obj, "orphan_id")
+    return deceased_ids, guardian_ids, orphan_ids
+
+
+def _expire_refreshed(session, deceased_ids, guardian_ids, orphan_ids):
+    """الكائنات المحملة في الجلسة تحمل القيم القديمة؛ نجعلها تعيد القراءة عند الوصول التالي."""
+    for cls, ids, attrs in (
+        (Deceased, deceased_ids, ["orphans_count"]),
+        (Guardian, guardian_ids, ["orphans_count"]),
+        (Orphan, orphan_ids, ["primary_guardian_id", "primary_guardian", "primary_guardian_link"]),
+    ):
+        for pk in ids:
+            obj = session.identity_map.get(identity_key(cls, pk))
+            if obj is not None:
+                session.expire(obj, attrs)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_after_flush(session, flush_context):
+    deceased_ids, guardian_ids, orphan_ids = _collect_affected(session)
+    if not (deceased_ids or guardian_ids or orphan_ids):
+        return
+    refresh_counts(session.connection(), deceased_ids, guardian_ids, orphan_ids)
+    session.info[_PENDING_KEY] = (deceased_ids, guardian_ids, orphan_ids)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_after_flush(session, flush_context):
+    refreshed = session.info.pop(_PENDING_KEY, None)
+    if refreshed:
+        _expire_refreshed(session, *refreshed)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _refresh_after_bulk(orm_execute_state):
+    """query(Orphan/OrphanGuardian).update()/delete() لا تمر عبر flush، فنتابعها هنا."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ not in (Orphan, OrphanGuardian):
+        return None
+
+    session = orm_execute_state.session
+    statement = orm_execute_state.statement
+    if mapper.class_ is Orphan:
+        columns = (orphans_t.c.id, orphans_t.c.deceased_id)
+    else:
+        columns = (links_t.c.orphan_id, links_t.c.guardian_id)
+    query = select(*columns)
+    if statement.whereclause is not None:
+        query = query.where(statement.whereclause)
+    before = session.connection().execute(query).all()
+
+    result = orm_execute_state.invoke_statement()
+
+    if mapper.class_ is Orphan:
+        orphan_ids = {r[0] for r in before}
+        deceased_ids = {r[1] for r in before if r[1] is not None}
+        for ids in _chunks(orphan_ids if orm_execute_state.is_update else ()):
+            # المتوفى الجديد بعد التحديث (إن تغيّر deceased_id)
+            deceased_ids |= {
+                d for (d,) in session.connection().execute(select(orphans_t.c.deceased_id).where(orphans_t.c.id.in_(ids))) if d is not None
+            }
+        guardian_ids = set()
+    else:
+        orphan_ids = {r[0] for r in before}
+        guardian_ids = {r[1] for r in before}
+        deceased_ids = set()
+    refresh_counts(session.connection(), deceased_ids, guardian_ids, orphan_ids)
+    _expire_refreshed(session, deceased_ids, guardian_ids, orphan_ids)
+    return result
+
+
+# ===== Repair job =====
+def check_denormalized_counts(connection):
+    """عدد الصفوف التي تختلف قيمها المشتقة عن القيم المحسوبة من الجداول الأصلية."""
+    return {
+        "deceased": connection.execute(
+            select(func.count()).select_from(deceased_t).where(deceased_t.c.orphans_count != _deceased_count_expr())
+        ).scalar() or 0,
+        "guardians": connection.execute(
+            select(func.count()).select_from(guardians_t).where(guardians_t.c.orphans_count != _guardian_count_expr())
+        ).scalar() or 0,
+        "orphans": connection.execute(
+            select(func.count()).select_from(orphans_t).where(
+                func.coalesce(orphans_t.c.primary_guardian_id, 0) != func.coalesce(_primary_guardian_expr(), 0)
+            )
+        ).scalar() or 0,
+    }
+
+
+def repair_denormalized_counts(connection):
+    """إعادة حساب كل القيم المشتقة. يعيد عدد الصفوف التي كانت منحرفة قبل الإصلاح."""
+    mismatches = check_denormalized_counts(connection)
+    if any(mismatches.values()):
+        logger.warning(f"إصلاح القيم المشتقة المنحرفة: {mismatches}")
+    if mismatches["deceased"]:
+        connection.execute(update(deceased_t).values(orphans_count=_deceased_count_expr()))
+    if mismatches["guardians"]:
+        connection.execute(update(guardians_t).values(orphans_count=_guardian_count_expr()))
+    if mismatches["orphans"]:
+        connection.execute(update(orphans_t).values(primary_guardian_id=_primary_guardian_expr()))
+    return mismatches
+
+
+def main(argv=None):
+    import argparse
+    from .db import initialize_database
+
+    parser = argparse.ArgumentParser(description="فحص وإصلاح أعداد الأيتام ومؤشر الوصي الأساسي")
+    parser.add_argument("--repair", action="store_true", help="إصلاح الصفوف المنحرفة")
+    args = parser.parse_args(argv)
+
+    engine, _ = initialize_database()
+    with engine.begin() as conn:
+        result = repair_denormalized_counts(conn) if args.repair else check_denormalized_counts(conn)
+    print(("Repaired: " if args.repair else "Mismatches: ") + ", ".join(f"{k}={v}" for k, v in result.items()))
+    return 1 if any(result.values()) and not args.repair else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, inspect, select, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import declarative_base
 import os
@@ -230,6 +230,69 @@ def apply_schema_updates(engine):
                 except Exception:
                     pass
 
+            # الأعمدة المشتقة: أعداد الأيتام ومؤشر الوصي الأساسي (database/counters.py)
+            added_denormalized = False
+            for table_name, column, ddl in (
+                ("deceased_people", "orphans_count", "INTEGER NOT NULL DEFAULT 0"),
+                ("guardians", "orphans_count", "INTEGER NOT NULL DEFAULT 0"),
+                ("orphans", "primary_guardian_id", "INTEGER"),
+            ):
+                if table_name not in table_names:
+                    continue
+                columns = {col.get("name") for col in inspector.get_columns(table_name)}
+                if column not in columns:
+                    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column} {ddl}"))
+                    logger.info(f"✓ تمت إضافة العمود {table_name}.{column}")
+                    added_denormalized = True
+            if added_denormalized:
+                from .counters import repair_denormalized_counts
+                repair_denormalized_counts(conn)
+                logger.info("✓ تم حساب أعداد الأيتام ومؤشر الوصي الأساسي للسجلات الحالية")
+
+            # فهارس الترتيب والتصفية في تبويبات القوائم
+            list_indexes = {
+                "deceased_people": [
+                    ("ix_deceased_people_date_death", "date_death"),
+                    ("ix_deceased_people_orphans_count", "orphans_count"),
+                ],
+                "guardians": [("ix_guardians_orphans_count", "orphans_count")],
+                "orphans": [
+                    ("ix_orphans_date_birth", "date_birth"),
+                    ("ix_orphans_deceased_id", "deceased_id"),
+                    ("ix_orphans_primary_guardian_id", "primary_guardian_id"),
+                ],
+                "orphan_guardians": [("ix_orphan_guardians_guardian_id", "guardian_id")],
+                "activity_logs": [
+                    ("ix_activity_logs_created_at", "created_at"),
+                    ("ix_activity_logs_user_created", "user_id, created_at"),
+                    ("ix_activity_logs_resource", "resource_type, resource_id"),
+                ],
+                # تحديث الملخصات الشهرية يقرأ حركات شهر واحد (database/rollups.py)
+                "deceased_transactions": [("ix_deceased_transactions_created_date", "created_date")],
+                "transactions": [("ix_transactions_created_date", "created_date")],
+                "guardian_transactions": [("ix_guardian_transactions_created_date", "created_date")],
+            }
+            for table_name, indexes in list_indexes.items():
+                if table_name not in table_names:
+                    continue
+                existing = {ix.get("name") for ix in inspector.get_indexes(table_name)}
+                for index_name, column in indexes:
+                    if index_name in existing:
+                        continue
+                    try:
+                        conn.execute(text(f"CREATE INDEX {index_name} ON {table_name} ({column})"))
+                        logger.info(f"✓ تمت إضافة الفهرس {index_name}")
+                    except Exception:
+                        pass
+
+            # الملخصات الشهرية للحركات: جدول جديد فارغ في قاعدة فيها حركات سابقة
+            from .rollups import SOURCES, rebuild_monthly_rollups, rollups_t
+            if "monthly_transaction_rollups" in table_names:
+                rollups_empty = conn.execute(select(rollups_t.c.id).limit(1)).first() is None
+                if rollups_empty and any(conn.execute(select(t.c.id).limit(1)).first() for t in SOURCES.values()):
+                    rows = rebuild_monthly_rollups(conn)
+                    logger.info(f"✓ تم حساب الملخصات الشهرية للحركات الحالية ({rows} خانة)")
+
     except Exception as e:
         logger.warning(f"تعذر تطبيق تحديثات هيكل القاعدة تلقائياً: {e}")
 
@@ -239,8 +302,15 @@ def initialize_database():
     تحاول الاتصال بـ MySQL، وإذا فشلت تستخدم SQLite كخيار احتياطي.
     تقوم أيضاً بإنشاء جميع الجداول والصلاحيات والأدوار والحسابات.
     """
-    
-    if test_mysql_connection():
+    from utils.startup_trace import startup_tracer
+    from database.query_stats import enable_from_env
+
+    # قياس الاستعلامات (اختياري عبر OMS_QUERY_STATS) يشمل استعلامات التهيئة أيضاً
+    enable_from_env()
+
+    with startup_tracer.phase("mysql probe"):
+        mysql_available = test_mysql_connection()
+    if mysql_available:
         logger.info("استخدام قاعدة بيانات MySQL")
         engine = create_engine(MYSQL_DATABASE_URL, echo=False, pool_pre_ping=True)
         database_type = "MySQL"
@@ -251,15 +321,18 @@ def initialize_database():
     
     # إنشاء جميع الجداول
     logger.info("جاري إنشاء الجداول...")
-    Base.metadata.create_all(engine)
+    with startup_tracer.phase("create_all"):
+        Base.metadata.create_all(engine)
     logger.info("✓ تم إنشاء الجداول بنجاح")
-    apply_schema_updates(engine)
+    with startup_tracer.phase("apply_schema_updates"):
+        apply_schema_updates(engine)
     
     # إعداد الصلاحيات والأدوار والحسابات
     SessionLocal_temp = sessionmaker(bind=engine)
     session = SessionLocal_temp()
     try:
-        setup_default_permissions_and_roles(session)
+        with startup_tracer.phase("default permissions and roles"):
+            setup_default_permissions_and_roles(session)
     finally:
         session.close()
     
@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, Date, Boolean, ForeignKey, Integer, String,
-    DateTime, Numeric, UniqueConstraint, Enum, Index
+    DateTime, Numeric, UniqueConstraint, Enum, Index, LargeBinary
 )
 from sqlalchemy.orm import relationship
 from datetime import date, datetime, timezone
@@ -58,9 +58,11 @@ class Deceased(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False, unique=True, index=True)
     national_id = Column(String(9), index=True, nullable=True)
-    date_death = Column(Date, nullable=True)
+    date_death = Column(Date, nullable=True, index=True)
     account_number = Column(String(50), nullable=True)
     archives_number = Column(String(50), nullable=True)
+    # عدد الأيتام، يُحدَّث تلقائياً (database/counters.py)
+    orphans_count = Column(Integer, nullable=False, default=0, server_default="0", index=True)
     created_at = Column(
         DateTime,
         default=lambda: datetime.now(timezone.utc)
@@ -129,7 +131,7 @@ class DeceasedTransaction(Base):
     row_group_key = Column(String(255), nullable=True, index=True)
 
     note = Column(String(255), nullable=True)
-    created_date = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_date = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
 
     # العلاقات
     deceased = relationship("Deceased")
@@ -142,6 +144,8 @@ class Guardian(Base):
     name = Column(String(255), nullable=False, unique=True, index=True)
     national_id = Column(String(9), index=True, nullable=True)
     phone = Column(String(10), nullable=True)
+    # عدد الأيتام المرتبطين، يُحدَّث تلقائياً (database/counters.py)
+    orphans_count = Column(Integer, nullable=False, default=0, server_default="0", index=True)
     created_at = Column(
         DateTime,
         default=lambda: datetime.now(timezone.utc)
@@ -187,7 +191,7 @@ class GuardianTransaction(Base):
     type = Column(Enum(TransactionTypeEnum), nullable=False)
     note = Column(String(255), nullable=True)
     row_group_key = Column(String(255), nullable=True, index=True)
-    created_date = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_date = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     created_at = Column(
         DateTime,
         default=lambda: datetime.now(timezone.utc)
@@ -230,18 +234,37 @@ class Orphan(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False, unique=True, index=True)
     national_id = Column(String(9), index=True, nullable=True)
-    date_birth = Column(Date, nullable=True)
+    date_birth = Column(Date, nullable=True, index=True)
     gender = Column(Enum(GenderEnum), nullable=False)
     phone = Column(String(10), nullable=True)
 
     deceased_id = Column(
         Integer,
         ForeignKey("deceased_people.id", ondelete="CASCADE"),
-        nullable=True
+        nullable=True,
+        index=True
     )
 
     deceased = relationship("Deceased", back_populates="orphans")
 
+    # مؤشر الوصي الأساسي، يُحدَّث تلقائياً من روابط الوصاية (database/counters.py)
+    primary_guardian_id = Column(
+        Integer,
+        ForeignKey("guardians.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True
+    )
+
+    primary_guardian = relationship("Guardian", foreign_keys=[primary_guardian_id], viewonly=True)
+
+    primary_guardian_link = relationship(
+        "OrphanGuardian",
+        primaryjoin="and_(foreign(OrphanGuardian.orphan_id) == Orphan.id, "
+                    "foreign(OrphanGuardian.guardian_id) == Orphan.primary_guardian_id)",
+        viewonly=True,
+        uselist=False
+    )
+
     guardian_links = relationship(
         "OrphanGuardian",
         back_populates="orphan",
@@ -299,7 +322,8 @@ class OrphanGuardian(Base):
     guardian_id = Column(
         Integer,
         ForeignKey("guardians.id", ondelete="CASCADE"),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     relation = Column(String(20), nullable=False)
@@ -369,7 +393,8 @@ class Transaction(Base):
     deceased_transaction_id = Column(Integer, ForeignKey("deceased_transactions.id"), nullable=True)
     created_date = Column(
         DateTime,
-        default=lambda: datetime.now(timezone.utc)
+        default=lambda: datetime.now(timezone.utc),
+        index=True
     )
     created_at = Column(
         DateTime,
@@ -394,6 +419,11 @@ class Transaction(Base):
 
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
+    __table_args__ = (
+        # تصفية سجل النشاطات حسب المستخدم أو المورد مع الترتيب بالتاريخ
+        Index("ix_activity_logs_user_created", "user_id", "created_at"),
+        Index("ix_activity_logs_resource", "resource_type", "resource_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -401,10 +431,44 @@ class ActivityLog(Base):
     resource_type = Column(String(50))
     resource_id = Column(Integer)
     description = Column(String(500))
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
 
     user = relationship("User")
 
+
+class ActivityLogArchive(Base):
+    """دفعة من سجلات النشاط القديمة المنقولة من activity_logs (services/activity_archive)."""
+    __tablename__ = "activity_log_archives"
+
+    id = Column(Integer, primary_key=True)
+    first_log_id = Column(Integer, nullable=False)
+    last_log_id = Column(Integer, nullable=False)
+    period_start = Column(DateTime, nullable=False, index=True)
+    period_end = Column(DateTime, nullable=False, index=True)
+    entries_count = Column(Integer, nullable=False)
+    # أسطر JSON مضغوطة بـ zlib؛ LONGBLOB على MySQL
+    payload = Column(LargeBinary(length=2**32 - 1), nullable=False)
+    archived_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class MonthlyTransactionRollup(Base):
+    """
+    مجموع الحركات لكل (شهر، عملة، نوع الجهة، نوع الحركة)، يُحدَّث تلقائياً (database/rollups.py).
+    entity_kind: deceased (deceased_transactions) أو orphan (transactions) أو guardian (guardian_transactions).
+    """
+    __tablename__ = "monthly_transaction_rollups"
+    __table_args__ = (
+        UniqueConstraint("month", "currency_id", "entity_kind", "type", name="uq_monthly_transaction_rollups_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    month = Column(Date, nullable=False)  # أول يوم في الشهر
+    currency_id = Column(Integer, ForeignKey("currencies.id", ondelete="CASCADE"), nullable=False)
+    entity_kind = Column(String(10), nullable=False)
+    type = Column(Enum(TransactionTypeEnum), nullable=False)
+    total_amount = Column(Numeric(18, 2), nullable=False, default=0)
+    transactions_count = Column(Integer, nullable=False, default=0)
+
 class Role(Base):
     __tablename__ = "roles"
 
@@ -450,4 +514,8 @@ class RolePermission(Base):
     permission_id = Column(Integer, ForeignKey("permissions.id", ondelete="CASCADE"))
 
     role = relationship("Role", back_populates="permissions")
-    permission = relationship("Permission", back_populates="roles")
\ No newline at end of file
+    permission = relationship("Permission", back_populates="roles")
+
+
+# تسجيل مستمعي صيانة الأعمدة المشتقة والملخصات الشهرية
+from . import counters, rollups  # noqa: E402,F401
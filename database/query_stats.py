@@ -0,0 +1,319 @@
+"""
+قياس استعلامات SQLAlchemy وكشف أنماط N+1 (اختياري، معطل افتراضياً).
+
+عند التفعيل تُربط أحداث المحرك (before/after_cursor_execute) وأحداث الجلسة
+(do_orm_execute) ويُسجل لكل بصمة استعلام (نص SQL بعد توحيد القيم وقوائم IN):
+عدد مرات التنفيذ، الزمن الإجمالي والأقصى، عدد الصفوف المعادة، والدوال التي
+استدعته من شيفرة التطبيق (مثل MainWindow.load_historical_data_for_deceased أو
+DBService.get_orphans).
+
+"إجراء الواجهة" هو كل ما يُنفَّذ في الخيط الرئيسي قبل العودة إلى حلقة أحداث Qt
+(معالج زر، تغيير تبويب ...). إذا تكررت البصمة نفسها أكثر من n_plus_one_threshold
+مرة داخل إجراء واحد سُجلت كحالة N+1. في الخيوط الأخرى تُحدد الإجراءات صراحة:
+
+    with query_stats.action("export"):
+        ...
+
+التفعيل: متغير البيئة OMS_QUERY_STATS (القيمة 1، أو مسار ملف JSON يُكتب فيه
+الملخص عند الخروج)، أو من نافذة "تشخيص الاستعلامات" في صفحة الإعدادات.
+
+عدد الصفوف يؤخذ من cursor.rowcount حين يعرفه المشغّل (MySQL) دون لمس النتائج. SQLite
+لا يعرفه قبل الجلب، فعدّ صفوف استعلامات ORM هناك يتطلب جمع كل نتيجة في الذاكرة
+(freeze) ويلغي تدفقها؛ لذلك هو خيار منفصل معطل افتراضياً: count_orm_rows، أو متغير
+البيئة OMS_QUERY_COUNT_ROWS=1، أو خانته في النافذة.
+"""
+import atexit
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+QUERY_STATS_ENV = "OMS_QUERY_STATS"
+N_PLUS_ONE_ENV = "OMS_QUERY_N_PLUS_ONE"
+COUNT_ROWS_ENV = "OMS_QUERY_COUNT_ROWS"
+DEFAULT_N_PLUS_ONE_THRESHOLD = 10
+MAX_FINDINGS = 200
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_THIS_FILE = os.path.abspath(__file__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement):
+    """توحيد نص SQL: القيم الحرفية -> ?، قوائم IN -> (?...)، والمسافات."""
+    text = _STRING_LITERAL.sub("?", statement)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _PLACEHOLDER_LIST.sub("(?...)", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _frame_label(frame):
+    owner = frame.f_locals.get("self")
+    if owner is not None:
+        return f"{type(owner).__name__}.{frame.f_code.co_name}"
+    return frame.f_code.co_qualname
+
+
+def _app_callers():
+    """(أقرب دالة من شيفرة التطبيق, أبعدها) في مكدس الاستدعاء الحالي."""
+    innermost = outermost = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_ROOT) and filename != _THIS_FILE and "site-packages" not in filename:
+            if innermost is None:
+                innermost = frame
+            outermost = frame
+        frame = frame.f_back
+    return (
+        _frame_label(innermost) if innermost else "<unknown>",
+        _frame_label(outermost) if outermost else "<unknown>",
+    )
+
+
+class _QueryStat:
+    __slots__ = ("count", "total_ms", "max_ms", "rows", "callers")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.callers = Counter()
+
+
+class _Action:
+    __slots__ = ("name", "started", "counts", "callers", "total_ms")
+
+    def __init__(self, name):
+        self.name = name
+        self.started = datetime.now()
+        self.counts = Counter()
+        self.callers = {}
+        self.total_ms = Counter()
+
+
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}
+        self._findings = []
+        self._enabled = False
+        self._since = datetime.now()
+        self.n_plus_one_threshold = DEFAULT_N_PLUS_ONE_THRESHOLD
+        self.count_orm_rows = False
+
+    # ===== Enable / disable =====
+    @property
+    def enabled(self):
+        return self._enabled
+
+    def enable(self):
+        if self._enabled:
+            return
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(Session, "do_orm_execute", self._count_orm_rows)
+        self._enabled = True
+        logger.info("Query instrumentation enabled")
+
+    def disable(self):
+        if not self._enabled:
+            return
+        event.remove(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(Session, "do_orm_execute", self._count_orm_rows)
+        self._enabled = False
+        self._local = threading.local()
+        logger.info("Query instrumentation disabled")
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._findings.clear()
+            self._since = datetime.now()
+
+    # ===== UI actions =====
+    @contextmanager
+    def action(self, name):
+        """تحديد إجراء صراحة (للخيوط الخلفية والسكربتات)."""
+        previous = getattr(self._local, "action", None)
+        self._local.action = _Action(name)
+        try:
+            yield
+        finally:
+            current = self._local.action
+            self._local.action = previous
+            self._close_action(current)
+
+    def _current_action(self, outermost):
+        action = getattr(self._local, "action", None)
+        if action is not None:
+            return action
+        # في خيط الواجهة: الإجراء ينتهي عند العودة إلى حلقة أحداث Qt
+        try:
+            from PyQt6.QtCore import QCoreApplication, QThread, QTimer
+        except ImportError:
+            return None
+        app = QCoreApplication.instance()
+        if app is None or QThread.currentThread() is not app.thread():
+            return None
+        action = self._local.action = _Action(outermost)
+        QTimer.singleShot(0, lambda: self._end_ui_action(action))
+        return action
+
+    def _end_ui_action(self, action):
+        if getattr(self._local, "action", None) is action:
+            self._local.action = None
+        self._close_action(action)
+
+    def _close_action(self, action):
+        if action is None:
+            return
+        for key, count in action.counts.items():
+            if count <= self.n_plus_one_threshold:
+                continue
+            finding = {
+                "action": action.name,
+                "at": action.started.isoformat(timespec="seconds"),
+                "fingerprint": key,
+                "count": count,
+                "total_ms": round(action.total_ms[key], 2),
+                "callers": dict(action.callers[key].most_common(5)),
+            }
+            logger.warning(f"Possible N+1 in {action.name}: {count} x {key[:120]}")
+            with self._lock:
+                self._findings.append(finding)
+                del self._findings[:-MAX_FINDINGS]
+
+    # ===== Event hooks =====
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_stats_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        key = fingerprint(statement)
+        caller, outermost = _app_callers()
+        # عدد صفوف SELECT في SQLite لا يُعرف قبل الجلب (-1)؛ تحسبه _count_orm_rows إن فُعّل
+        rowcount_known = cursor.rowcount is not None and cursor.rowcount >= 0
+        rows = cursor.rowcount if rowcount_known else 0
+
+        with self._lock:
+            stat = self._stats.get(key)
+            if stat is None:
+                stat = self._stats[key] = _QueryStat()
+            stat.count += 1
+            stat.total_ms += elapsed_ms
+            stat.max_ms = max(stat.max_ms, elapsed_ms)
+            stat.rows += rows
+            stat.callers[caller] += 1
+
+        pending = getattr(self._local, "orm_statements", None)
+        if pending:
+            pending[-1].append((key, rowcount_known))
+
+        action = self._current_action(outermost)
+        if action is not None:
+            action.counts[key] += 1
+            action.total_ms[key] += elapsed_ms
+            action.callers.setdefault(key, Counter())[caller] += 1
+
+    def _count_orm_rows(self, orm_execute_state):
+        if not self.count_orm_rows or not orm_execute_state.is_select:
+            return None
+        options = orm_execute_state.execution_options
+        if options.get("yield_per") or options.get("stream_results"):
+            return None  # لا نجلب النتائج المتدفقة مسبقاً
+
+        pending = getattr(self._local, "orm_statements", None)
+        if pending is None:
+            pending = self._local.orm_statements = []
+        pending.append([])
+        try:
+            result = orm_execute_state.invoke_statement()
+        finally:
+            keys = pending.pop()
+        if not keys or keys[0][1]:
+            return result  # المشغّل أعطى العدد في _after_cursor_execute؛ النتيجة تبقى متدفقة
+        frozen = result.freeze()
+        with self._lock:
+            stat = self._stats.get(keys[0][0])
+            if stat is not None:
+                stat.rows += len(frozen.data)
+        return frozen()
+
+    # ===== Results =====
+    def snapshot(self):
+        with self._lock:
+            queries = [
+                {
+                    "fingerprint": key,
+                    "count": stat.count,
+                    "total_ms": round(stat.total_ms, 2),
+                    "max_ms": round(stat.max_ms, 2),
+                    "avg_ms": round(stat.total_ms / stat.count, 3) if stat.count else 0,
+                    "rows": stat.rows,
+                    "callers": dict(stat.callers.most_common()),
+                }
+                for key, stat in self._stats.items()
+            ]
+            findings = list(self._findings)
+            since = self._since
+        queries.sort(key=lambda q: q["total_ms"], reverse=True)
+        return {
+            "since": since.isoformat(timespec="seconds"),
+            "enabled": self._enabled,
+            "n_plus_one_threshold": self.n_plus_one_threshold,
+            "total_queries": sum(q["count"] for q in queries),
+            "total_ms": round(sum(q["total_ms"] for q in queries), 2),
+            "queries": queries,
+            "n_plus_one": findings,
+        }
+
+    def dump_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+
+query_stats = QueryStats()
+
+
+def enable_from_env():
+    """تفعيل القياس إن عُرّف OMS_QUERY_STATS (يُستدعى من initialize_database)."""
+    value = os.environ.get(QUERY_STATS_ENV)
+    if not value or query_stats.enabled:
+        return
+    threshold = os.environ.get(N_PLUS_ONE_ENV)
+    if threshold and threshold.isdigit():
+        query_stats.n_plus_one_threshold = int(threshold)
+    query_stats.count_orm_rows = os.environ.get(COUNT_ROWS_ENV) == "1"
+    query_stats.enable()
+    if value != "1":
+        atexit.register(_dump_at_exit, value)
+
+
+def _dump_at_exit(path):
+    try:
+        query_stats.dump_json(path)
+    except OSError as e:
+        logger.warning(f"Could not write query stats: {e}")
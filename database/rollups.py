@@ -0,0 +1,323 @@
+"""
+الملخصات الشهرية للحركات (monthly_transaction_rollups) وصيانتها:
+
+لكل (شهر، عملة، نوع الجهة، نوع الحركة) مجموع المبالغ وعدد الحركات، حسب تاريخ الحركة
+created_date، من deceased_transactions (deceased) و transactions (orphan) و
+guardian_transactions (guardian). الحركات بلا تاريخ لا تدخل في الملخص.
+
+تُحدَّث داخل نفس المعاملة التي تكتب الحركات: نجمع الخانات (جهة، عملة، شهر) التي
+تأثرت في كل flush، وقبل commit نعيد حسابها فقط من الجدول الأصلي (قراءة أشهرها عبر
+فهرس created_date)، فلا تتراكم فروق. حذف متوفى أو حركة تركة يحذف حركات مرتبطة عبر
+ON DELETE CASCADE في القاعدة دون المرور بالجلسة، فنجمع خاناتها قبل flush.
+rebuild_monthly_rollups يعيد بناء الجدول كاملاً، ويمكن تشغيله من سطر الأوامر:
+
+    python -m database.rollups             # فحص فقط
+    python -m database.rollups --rebuild   # فحص وإعادة بناء
+"""
+import logging
+from datetime import date, datetime, time
+
+from sqlalchemy import and_, delete, event, func, insert, or_, select
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from .models import (
+    Deceased, DeceasedTransaction, GuardianTransaction, MonthlyTransactionRollup, Transaction,
+)
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "rollup_buckets"
+_MOVED_KEY = "rollup_moved_ids"
+_UNKNOWN = object()
+_CHUNK_SIZE = 500
+_TRACKED_ATTRS = ("currency_id", "created_date", "amount", "type")
+
+rollups_t = MonthlyTransactionRollup.__table__
+deceased_txns_t = DeceasedTransaction.__table__
+guardian_txns_t = GuardianTransaction.__table__
+
+SOURCES = {
+    "deceased": deceased_txns_t,
+    "orphan": Transaction.__table__,
+    "guardian": guardian_txns_t,
+}
+_MODEL_KINDS = {DeceasedTransaction: "deceased", Transaction: "orphan", GuardianTransaction: "guardian"}
+
+
+def month_start(value):
+    return date(value.year, value.month, 1) if value else None
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _month_key(connection, column):
+    """تعبير 'YYYY-MM' من عمود تاريخ حسب نوع القاعدة."""
+    if connection.dialect.name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.date_format(column, "%Y-%m")
+
+
+def _parse_month_key(key):
+    year, month = key.split("-")
+    return date(int(year), int(month), 1)
+
+
+# ===== Refresh =====
+def refresh_buckets(connection, buckets):
+    """
+    إعادة حساب خانات محددة {(جهة، عملة، شهر)} من الجداول الأصلية: لكل جهة استعلام
+    تجميع واحد على مدى الأشهر المطلوبة، ثم حذف الخانات القديمة وإدخال الجديدة دفعة واحدة.
+    """
+    by_kind = {}
+    for kind, currency_id, month in buckets:
+        by_kind.setdefault(kind, set()).add((currency_id, month))
+    for kind, keys in sorted(by_kind.items()):
+        source = SOURCES[kind]
+        months = sorted({month for _, month in keys})
+        month = _month_key(connection, source.c.created_date)
+        rows = connection.execute(
+            select(month, source.c.currency_id, source.c.type, func.sum(source.c.amount), func.count())
+            .where(
+                source.c.currency_id.in_(sorted({currency_id for currency_id, _ in keys})),
+                or_(*(
+                    and_(
+                        source.c.created_date >= datetime.combine(m, time.min),
+                        source.c.created_date < datetime.combine(next_month(m), time.min),
+                    )
+                    for m in months
+                )),
+            )
+            .group_by(month, source.c.currency_id, source.c.type)
+        ).all()
+        connection.execute(delete(rollups_t).where(
+            rollups_t.c.entity_kind == kind,
+            or_(*(and_(rollups_t.c.currency_id == currency_id, rollups_t.c.month == month) for currency_id, month in keys)),
+        ))
+        values = [
+            {
+                "month": month, "currency_id": currency_id, "entity_kind": kind, "type": txn_type,
+                "total_amount": total or 0, "transactions_count": count,
+            }
+            for month, currency_id, txn_type, total, count in (
+                (_parse_month_key(key), currency_id, txn_type, total, count) for key, currency_id, txn_type, total, count in rows
+            )
+            if (currency_id, month) in keys
+        ]
+        if values:
+            connection.execute(insert(rollups_t), values)
+
+
+def _source_buckets(connection, kind, *criteria):
+    source = SOURCES[kind]
+    rows = connection.execute(select(source.c.currency_id, source.c.created_date).where(*criteria).distinct())
+    return {(kind, currency_id, month_start(created)) for currency_id, created in rows if created is not None}
+
+
+# ===== Change tracking =====
+def _changed(obj, attrs=_TRACKED_ATTRS):
+    state = sa_inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _buckets_by_id(connection, ids_by_kind):
+    """خانات الحركات بحالتها الحالية في القاعدة (قبل flush: القيم القديمة، بعده: الجديدة)."""
+    buckets = set()
+    for kind, ids in ids_by_kind.items():
+        ids = sorted(ids)
+        for i in range(0, len(ids), _CHUNK_SIZE):
+            buckets |= _source_buckets(connection, kind, SOURCES[kind].c.id.in_(ids[i:i + _CHUNK_SIZE]))
+    return buckets
+
+
+def _loaded_old_bucket(obj, kind):
+    """
+    الخانة القديمة من الكائن نفسه إن كانت العملة والتاريخ محملين (القيمة قبل التعديل من
+    history)، وإلا _UNKNOWN فتُقرأ من القاعدة (تعديل قيمة منتهية الصلاحية أو كانت None).
+    """
+    state = sa_inspect(obj)
+    values = []
+    for attr in ("currency_id", "created_date"):
+        history = state.attrs[attr].history
+        if history.deleted:
+            values.append(history.deleted[0])
+        elif not history.added and attr in state.dict:
+            values.append(state.dict[attr])
+        else:
+            return _UNKNOWN
+    currency_id, created = values
+    return (kind, currency_id, month_start(created)) if created is not None else None
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_before_flush(session, flush_context, instances):
+    """
+    خانات الحركات المحذوفة والمعدلة بقيمها القديمة (من القاعدة إن لم تكن محملة)، وحركات
+    ستحذفها القاعدة (ON DELETE CASCADE) مع المتوفى أو حركة التركة المحذوفة.
+    """
+    deleted = set(session.deleted)
+    buckets, old_ids, deleted_deceased, deleted_estate_txns = set(), {}, set(), set()
+    for obj in deleted | set(session.dirty):
+        identity = sa_inspect(obj).identity
+        if identity is None:
+            continue
+        kind = _MODEL_KINDS.get(type(obj))
+        if kind is not None and (obj in deleted or _changed(obj)):
+            bucket = _loaded_old_bucket(obj, kind)
+            if bucket is _UNKNOWN:
+                old_ids.setdefault(kind, set()).add(identity[0])
+            elif bucket is not None:
+                buckets.add(bucket)
+        if obj in deleted and isinstance(obj, Deceased):
+            deleted_deceased.add(identity[0])
+        elif obj in deleted and isinstance(obj, DeceasedTransaction):
+            deleted_estate_txns.add(identity[0])
+    if not (old_ids or deleted_deceased or deleted_estate_txns):
+        if buckets:
+            session.info.setdefault(_PENDING_KEY, set()).update(buckets)
+        return
+
+    connection = session.connection()
+    buckets |= _buckets_by_id(connection, old_ids)
+    if deleted_deceased:
+        estate_txns = select(deceased_txns_t.c.id).where(deceased_txns_t.c.deceased_id.in_(deleted_deceased))
+        buckets |= _source_buckets(connection, "deceased", deceased_txns_t.c.deceased_id.in_(deleted_deceased))
+        buckets |= _source_buckets(connection, "guardian", guardian_txns_t.c.deceased_transaction_id.in_(estate_txns))
+    if deleted_estate_txns:
+        buckets |= _source_buckets(connection, "guardian", guardian_txns_t.c.deceased_transaction_id.in_(deleted_estate_txns))
+    if buckets:
+        session.info.setdefault(_PENDING_KEY, set()).update(buckets)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_after_flush(session, flush_context):
+    buckets = session.info.setdefault(_PENDING_KEY, set())
+    moved_ids = session.info.setdefault(_MOVED_KEY, {})
+    for obj in session.new:
+        kind = _MODEL_KINDS.get(type(obj))
+        if kind is not None and obj.created_date is not None:
+            buckets.add((kind, obj.currency_id, month_start(obj.created_date)))
+    for obj in session.dirty:
+        kind = _MODEL_KINDS.get(type(obj))
+        if kind is not None and _changed(obj, ("currency_id", "created_date")):
+            moved_ids.setdefault(kind, set()).add(sa_inspect(obj).identity[0])
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_before_commit(session):
+    """
+    الخانات المتأثرة بكل flush في المعاملة تُعاد حسابها مرة واحدة قبل commit (الحفظ من
+    جدول الحركات يعمل flush عدة مرات على نفس الشهر)، في نفس المعاملة.
+    """
+    session.flush()
+    buckets = session.info.pop(_PENDING_KEY, set())
+    moved_ids = session.info.pop(_MOVED_KEY, {})
+    if moved_ids:
+        # الخانة الجديدة للحركات التي تغير تاريخها أو عملتها
+        buckets |= _buckets_by_id(session.connection(), moved_ids)
+    if buckets:
+        refresh_buckets(session.connection(), buckets)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_MOVED_KEY, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _refresh_after_bulk(orm_execute_state):
+    """query(...).update()/delete() على جداول الحركات لا تمر عبر flush، فنتابعها هنا."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    kind = _MODEL_KINDS.get(mapper.class_) if mapper is not None else None
+    if kind is None:
+        return None
+
+    session = orm_execute_state.session
+    source = SOURCES[kind]
+    statement = orm_execute_state.statement
+    query = select(source.c.id, source.c.currency_id, source.c.created_date)
+    if statement.whereclause is not None:
+        query = query.where(statement.whereclause)
+    before = session.connection().execute(query).all()
+
+    result = orm_execute_state.invoke_statement()
+
+    session.info.setdefault(_PENDING_KEY, set()).update(
+        (kind, currency_id, month_start(created)) for _, currency_id, created in before if created is not None
+    )
+    if orm_execute_state.is_update and before:
+        # الخانة الجديدة بعد التحديث (إن تغيّر التاريخ أو العملة) تُقرأ قبل commit
+        session.info.setdefault(_MOVED_KEY, {}).setdefault(kind, set()).update(row[0] for row in before)
+    return result
+
+
+# ===== Rebuild job =====
+def compute_monthly_rollups(connection):
+    """{(شهر، عملة، جهة، نوع): (المجموع، العدد)} محسوبة من الجداول الأصلية."""
+    computed = {}
+    for kind, source in SOURCES.items():
+        month = _month_key(connection, source.c.created_date)
+        rows = connection.execute(
+            select(month, source.c.currency_id, source.c.type, func.sum(source.c.amount), func.count())
+            .where(source.c.created_date.is_not(None))
+            .group_by(month, source.c.currency_id, source.c.type)
+        )
+        for key, currency_id, txn_type, total, count in rows:
+            computed[(_parse_month_key(key), currency_id, kind, txn_type)] = (total or 0, count)
+    return computed
+
+
+def check_monthly_rollups(connection):
+    """عدد الخانات المختلفة عن القيم المحسوبة من الجداول الأصلية، لكل جهة."""
+    computed = compute_monthly_rollups(connection)
+    stored = {
+        (r.month, r.currency_id, r.entity_kind, r.type): (r.total_amount, r.transactions_count)
+        for r in connection.execute(select(rollups_t))
+    }
+    mismatches = dict.fromkeys(SOURCES, 0)
+    for key in computed.keys() | stored.keys():
+        if computed.get(key) != stored.get(key):
+            mismatches[key[2]] += 1
+    return mismatches
+
+
+def rebuild_monthly_rollups(connection):
+    """إعادة بناء الجدول كاملاً. يعيد عدد الخانات."""
+    computed = compute_monthly_rollups(connection)
+    connection.execute(delete(rollups_t))
+    rows = [
+        {
+            "month": month, "currency_id": currency_id, "entity_kind": kind, "type": txn_type,
+            "total_amount": total, "transactions_count": count,
+        }
+        for (month, currency_id, kind, txn_type), (total, count) in sorted(computed.items(), key=lambda item: item[0][:3])
+    ]
+    for i in range(0, len(rows), 5000):
+        connection.execute(insert(rollups_t), rows[i:i + 5000])
+    return len(rows)
+
+
+def main(argv=None):
+    import argparse
+    from .db import initialize_database
+
+    parser = argparse.ArgumentParser(description="فحص وإعادة بناء الملخصات الشهرية للحركات")
+    parser.add_argument("--rebuild", action="store_true", help="إعادة بناء الجدول من الحركات")
+    args = parser.parse_args(argv)
+
+    engine, _ = initialize_database()
+    with engine.begin() as conn:
+        mismatches = check_monthly_rollups(conn)
+        print("Mismatches: " + ", ".join(f"{k}={v}" for k, v in mismatches.items()))
+        if args.rebuild:
+            print(f"Rebuilt {rebuild_monthly_rollups(conn)} rollup rows")
+    return 1 if any(mismatches.values()) and not args.rebuild else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
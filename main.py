@@ -2,8 +2,22 @@
 نقطة الدخول الرئيسية للتطبيق.
 تشغيل التطبيق: python main.py
 """
+import multiprocessing
 import sys
-from app import main
+import time
+
+_process_start = time.perf_counter()
 
 if __name__ == "__main__":
+    # عاملو التقارير (services/report_pool) عمليات spawn تعيد استيراد هذا الملف، فلا
+    # يُستورد app إلا في العملية الرئيسية
+    multiprocessing.freeze_support()
+
+    from app import main
+    from utils.startup_trace import startup_tracer
+
+    # زمن استيراد app (وكل المكتبات) هو أول مرحلة في مخطط بدء التشغيل
+    startup_tracer.set_origin(_process_start)
+    startup_tracer.record("import app", _process_start, time.perf_counter())
+
     sys.exit(main() or 0)
@@ -1,5 +1,8 @@
 # Services package
 from .db_services import DBService
-from .permissions import has_permission
+from .permissions import has_permission, refresh_user_permissions
+from .query_executor import query_executor
+from .reference_cache import reference_cache
+from .reports import prewarm_reporting
 
-__all__ = ["DBService", "has_permission"]
+__all__ = ["DBService", "has_permission", "refresh_user_permissions", "query_executor", "reference_cache", "prewarm_reporting"]
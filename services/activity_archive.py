@@ -0,0 +1,155 @@
+"""
+أرشفة سجل النشاطات القديم.
+
+archive_activity_logs() تنقل السجلات الأقدم من مدة الاحتفاظ (ACTIVITY_LOG_RETENTION_DAYS
+افتراضياً، أو OMS_ACTIVITY_RETENTION_DAYS؛ القيمة 0 تعطل الأرشفة) من activity_logs إلى
+activity_log_archives، دفعات من ARCHIVE_BATCH_SIZE سجل بالأقدم أولاً. كل دفعة صف واحد
+فيه أسطر JSON مضغوطة بـ zlib مع مدى المعرّفات والتواريخ، وتُنقل في معاملة مستقلة
+(إدخال الأرشيف ثم حذف السجلات)، فلا يُفقد سجل ولا يتكرر إذا توقفت العملية في المنتصف.
+يبقى الجدول النشط صغيراً فتبقى القائمة والتصفية والعد سريعة.
+
+تُشغَّل في الخلفية بعد تسجيل الدخول (MainWindow.archive_old_activity_logs)، ويمكن
+تشغيلها أو تصدير الأرشيف يدوياً:
+
+    python -m services.activity_archive [--retention-days 365]
+    python -m services.activity_archive --export archive.jsonl [--from 2024-01-01] [--to 2024-12-31]
+"""
+import argparse
+import json
+import logging
+import os
+import zlib
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import sessionmaker
+
+import database.db as db_module
+from database.models import ActivityLog, ActivityLogArchive
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_LOG_RETENTION_DAYS = 365
+RETENTION_ENV = "OMS_ACTIVITY_RETENTION_DAYS"
+ARCHIVE_BATCH_SIZE = 5000
+COMPRESSION_LEVEL = 6
+
+_COLUMNS = ("id", "user_id", "action", "resource_type", "resource_id", "description", "created_at")
+
+
+def retention_days():
+    value = os.environ.get(RETENTION_ENV, "")
+    return int(value) if value.isdigit() else ACTIVITY_LOG_RETENTION_DAYS
+
+
+def _encode(rows):
+    lines = []
+    for row in rows:
+        entry = dict(zip(_COLUMNS, row))
+        entry["created_at"] = entry["created_at"].isoformat() if entry["created_at"] else None
+        lines.append(json.dumps(entry, ensure_ascii=False))
+    return zlib.compress("\n".join(lines).encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def _decode(payload):
+    entries = []
+    for line in zlib.decompress(payload).decode("utf-8").splitlines():
+        entry = json.loads(line)
+        if entry.get("created_at"):
+            entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+        entries.append(entry)
+    return entries
+
+
+def archive_activity_logs(days=None, batch_size=ARCHIVE_BATCH_SIZE, now=None):
+    """نقل السجلات الأقدم من days يوماً إلى الأرشيف؛ يعيد عدد السجلات المنقولة."""
+    days = retention_days() if days is None else days
+    if days <= 0:
+        return 0
+    # created_at يُخزن بتوقيت UTC دون منطقة زمنية
+    cutoff = (now or datetime.now(timezone.utc).replace(tzinfo=None)) - timedelta(days=days)
+    moved = 0
+    while True:
+        session = db_module.SessionLocal()
+        try:
+            rows = session.execute(
+                select(*(getattr(ActivityLog, c) for c in _COLUMNS))
+                .where(ActivityLog.created_at < cutoff)
+                .order_by(ActivityLog.created_at, ActivityLog.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            ids = [row.id for row in rows]
+            session.execute(insert(ActivityLogArchive), [{
+                "first_log_id": min(ids),
+                "last_log_id": max(ids),
+                "period_start": rows[0].created_at,
+                "period_end": rows[-1].created_at,
+                "entries_count": len(rows),
+                "payload": _encode(rows),
+                "archived_at": datetime.now(timezone.utc),
+            }])
+            session.execute(delete(ActivityLog).where(ActivityLog.id.in_(ids)))
+            session.commit()
+            moved += len(rows)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        if len(rows) < batch_size:
+            break
+    if moved:
+        logger.info(f"Archived {moved} activity log entries older than {cutoff:%Y-%m-%d}")
+    return moved
+
+
+def load_archived_activity_logs(session, date_from=None, date_to=None):
+    """السجلات المؤرشفة (قواميس بأعمدة ActivityLog) في المدى المطلوب، الأقدم أولاً."""
+    stmt = select(ActivityLogArchive.payload).order_by(ActivityLogArchive.period_start, ActivityLogArchive.id)
+    end = datetime.combine(date_to, time.max) if date_to else None
+    start = datetime.combine(date_from, time.min) if date_from else None
+    if start:
+        stmt = stmt.where(ActivityLogArchive.period_end >= start)
+    if end:
+        stmt = stmt.where(ActivityLogArchive.period_start <= end)
+    entries = []
+    for (payload,) in session.execute(stmt):
+        for entry in _decode(payload):
+            created_at = entry.get("created_at")
+            if created_at and ((start and created_at < start) or (end and created_at > end)):
+                continue
+            entries.append(entry)
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--retention-days", type=int, default=None)
+    parser.add_argument("--export", help="تصدير السجلات المؤرشفة إلى ملف JSON lines بدل الأرشفة")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, default=None)
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, default=None)
+    args = parser.parse_args(argv)
+
+    engine, db_module.DATABASE_TYPE = db_module.initialize_database()
+    db_module.engine = engine
+    db_module.SessionLocal = sessionmaker(bind=engine)
+
+    if args.export:
+        with db_module.SessionLocal() as session:
+            entries = load_archived_activity_logs(session, args.date_from, args.date_to)
+        with open(args.export, "w", encoding="utf-8") as f:
+            for entry in entries:
+                entry["created_at"] = entry["created_at"].isoformat() if entry.get("created_at") else None
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        print(f"Exported {len(entries)} archived entries to {args.export}")
+        return 0
+
+    moved = archive_activity_logs(args.retention_days)
+    print(f"Archived {moved} activity log entries")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
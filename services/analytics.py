@@ -0,0 +1,62 @@
+"""
+التحليلات الشهرية للحركات لكل عملة: إيداعات التركات، التوزيعات على الأيتام، السحوبات.
+
+تُبنى من الملخصات الشهرية المحسوبة مسبقاً (database/rollups.py) لا من جداول الحركات،
+فعشر سنوات من البيانات هي بضعة آلاف من الخانات على الأكثر وتُقرأ بأجزاء من الثانية.
+"""
+from collections import namedtuple
+
+from database.models import TransactionTypeEnum
+from database.rollups import month_start, next_month
+
+DEPOSIT = TransactionTypeEnum.deposit
+WITHDRAW = TransactionTypeEnum.withdraw
+
+# (المفتاح، العنوان، خانات (الجهة، نوع الحركة) التي تُجمع فيه)
+SERIES = (
+    ("estate_deposits", "إيداعات التركات", (("deceased", DEPOSIT),)),
+    ("estate_distributions", "توزيعات التركات", (("deceased", WITHDRAW),)),
+    ("orphan_deposits", "إيداعات الأيتام", (("orphan", DEPOSIT),)),
+    ("guardian_deposits", "إيداعات الأوصياء", (("guardian", DEPOSIT),)),
+    ("withdrawals", "سحوبات الأيتام والأوصياء", (("orphan", WITHDRAW), ("guardian", WITHDRAW))),
+)
+SERIES_KEYS = tuple(key for key, _, _ in SERIES)
+SERIES_LABELS = tuple(label for _, label, _ in SERIES)
+
+# totals و counts بترتيب SERIES
+MonthlyAnalytics = namedtuple("MonthlyAnalytics", "month totals counts")
+
+_SERIES_BY_BUCKET = {bucket: i for i, (_, _, buckets) in enumerate(SERIES) for bucket in buckets}
+
+
+def months_between(month_from, month_to):
+    months, month = [], month_start(month_from)
+    while month <= month_to:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def monthly_series(rows, month_from, month_to):
+    """صف لكل شهر في المدى (بما فيها الأشهر بلا حركات) من خانات عملة واحدة."""
+    totals, counts = {}, {}
+    for row in rows:
+        i = _SERIES_BY_BUCKET.get((row.entity_kind, row.type))
+        if i is None:
+            continue
+        totals.setdefault(row.month, [0.0] * len(SERIES))[i] += row.total
+        counts.setdefault(row.month, [0] * len(SERIES))[i] += row.count
+    return [
+        MonthlyAnalytics(month, tuple(totals.get(month, (0.0,) * len(SERIES))), tuple(counts.get(month, (0,) * len(SERIES))))
+        for month in months_between(month_from, month_to)
+    ]
+
+
+def load_monthly_analytics(db_service, month_from, month_to, currencies):
+    """{currency_id: [MonthlyAnalytics, ...]} لكل العملات الممررة باستعلام واحد."""
+    month_from, month_to = month_start(month_from), month_start(month_to)
+    by_currency = {c.id: [] for c in currencies}
+    for row in db_service.get_monthly_rollups(month_from, month_to):
+        if row.currency_id in by_currency:
+            by_currency[row.currency_id].append(row)
+    return {cid: monthly_series(rows, month_from, month_to) for cid, rows in by_currency.items()}
@@ -0,0 +1,111 @@
+"""
+ملخص لوحة التحكم: أعداد الأيتام والأوصياء والمتوفين ومجاميع الأرصدة لكل عملة.
+
+تُقرأ كلها في رحلة واحدة إلى القاعدة (statements.DASHBOARD_SUMMARY: أربعة COUNT
+ومجموع كل جدول أرصدة لكل عملة في UNION ALL واحد) بدل أربعة استعلامات عد منفصلة،
+وتُحفظ على مستوى العملية لمدة SUMMARY_TTL ثانية. أي كتابة عبر ORM على الأيتام أو
+الأوصياء أو المتوفين أو أرصدتهم تُبطل الملخص بعد commit (كما في reference_cache)،
+فالعودة إلى الصفحة الرئيسية وتسجيل الخروج لا تعيد الاستعلام ما لم يتغير شيء.
+الملخص المُبطل يبقى متاحاً عبر cached_summary() لعرضه فوراً إلى أن يصل التحديث.
+"""
+import threading
+from collections import namedtuple
+from datetime import date
+from time import monotonic
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database.models import Deceased, DeceasedBalance, Guardian, GuardianBalance, Orphan, OrphanBalance
+from services import statements
+from services.reference_cache import reference_cache
+
+SUMMARY_TTL = 60
+COUNT_KEYS = ("orphans", "orphans_over_18", "guardians", "deceased")
+
+# مجاميع الأرصدة لعملة واحدة، بترتيب reference_cache.currencies()
+CurrencyTotals = namedtuple("CurrencyTotals", "currency_id name deceased orphans guardians")
+
+_TRACKED_MODELS = (Orphan, Guardian, Deceased, OrphanBalance, GuardianBalance, DeceasedBalance)
+
+_lock = threading.Lock()
+_cache = {}        # "summary": (وقت الحساب أو None بعد الإبطال, الملخص)
+_generation = 0    # يزيد مع كل إبطال، فلا يُحفظ ملخص بدأ حسابه قبل الإبطال
+
+
+def read_summary(connection, today=None):
+    today = today or date.today()
+    cutoff = date(today.year - 18, today.month, today.day)
+    counts = dict.fromkeys(COUNT_KEYS, 0)
+    totals = {}
+    for metric, currency_id, value in connection.execute(statements.DASHBOARD_SUMMARY, {"cutoff": cutoff}):
+        if currency_id is None:
+            counts[metric] = int(value or 0)
+        else:
+            totals.setdefault(currency_id, {})[metric] = float(value or 0)
+    balances = [
+        CurrencyTotals(c.id, c.name, *(totals.get(c.id, {}).get(key, 0.0) for key in ("deceased", "orphans", "guardians")))
+        for c in reference_cache.currencies()
+    ]
+    return {**counts, "balances": balances}
+
+
+def get_summary(connection, force=False):
+    """الملخص من الذاكرة إن كان حديثاً، وإلا يُقرأ من القاعدة ويُحفظ."""
+    with _lock:
+        computed_at, summary = _cache.get("summary", (None, None))
+        generation = _generation
+    if not force and computed_at is not None and monotonic() - computed_at < SUMMARY_TTL:
+        return summary
+    summary = read_summary(connection)
+    with _lock:
+        if generation == _generation:
+            _cache["summary"] = (monotonic(), summary)
+    return summary
+
+
+def cached_summary():
+    """(آخر ملخص محسوب أو None، هل ما زال صالحاً) بدون أي استعلام."""
+    with _lock:
+        computed_at, summary = _cache.get("summary", (None, None))
+    return summary, computed_at is not None and monotonic() - computed_at < SUMMARY_TTL
+
+
+def invalidate():
+    global _generation
+    with _lock:
+        _generation += 1
+        if "summary" in _cache:
+            _cache["summary"] = (None, _cache["summary"][1])
+
+
+# ===== Automatic invalidation on ORM writes =====
+_PENDING_KEY = "dashboard_summary_dirty"
+
+
+@event.listens_for(Session, "after_flush")
+def _track_summary_writes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, _TRACKED_MODELS):
+            session.info[_PENDING_KEY] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_summary_bulk_writes(orm_execute_state):
+    # query(...).update()/delete() لا تمر عبر flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ in _TRACKED_MODELS:
+            orm_execute_state.session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop(_PENDING_KEY, None):
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
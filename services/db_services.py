@@ -1,16 +1,34 @@
+import threading
+from contextlib import contextmanager
 from decimal import Decimal
-from datetime import datetime, timezone, date, time
+from datetime import datetime, timezone, date, time, timedelta
+from time import monotonic
 from uuid import uuid4
 import database.db as db_module
-from database.models import ActivityLog, DeceasedBalance, DeceasedTransaction, GuardianBalance, GuardianTransaction, Orphan, Guardian, Deceased, Currency, TransactionTypeEnum, OrphanGuardian, GenderEnum, OrphanBalance, Transaction
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import case, or_, text, func
+from database.rollups import month_start
+from database.models import ActivityLog, User, DeceasedBalance, DeceasedTransaction, GuardianBalance, GuardianTransaction, Orphan, Guardian, Deceased, TransactionTypeEnum, OrphanGuardian, GenderEnum, OrphanBalance, Transaction
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import DateTime, inspect, or_, select, text
 
+from services import dashboard_summary, read_models, statements
+from services.reference_cache import reference_cache
 from utils import parse_and_validate_date
 from utils.helpers import try_get_date
+from utils.activity_log import activity_log_writer
+from utils.metrics import metrics
 from utils.notes_generator import generate_transaction_note, generate_deceased_transaction_note, generate_orphan_transaction_note
 from utils.distribution import calculate_beneficiary_distribution
 
+# خيارات التصفية المشتركة بين جميع نسخ DBService (تُحدَّث كل FILTER_OPTIONS_TTL ثانية)
+FILTER_OPTIONS_TTL = 300
+_FILTER_OPTIONS_CACHE = {}
+
+# مؤشرات صفحات سجل النشاطات المشتركة بين نسخ DBService (خيوط query_executor):
+# (الترتيب، الفلاتر) -> {"total": العدد عند تحميل الصفحة الأولى، "cursors": {صفحة: مؤشر}}
+ACTIVITY_LOG_CURSOR_KEYS = 20
+_ACTIVITY_LOG_CURSORS = {}
+_ACTIVITY_LOG_CURSORS_LOCK = threading.Lock()
+
 # ===== DB Service =====
 class DBService:
     def __init__(self):
@@ -29,10 +47,87 @@ class DBService:
             db_module.SessionLocal = sessionmaker(bind=engine)
             session_factory = db_module.SessionLocal
 
-        self.session = session_factory()
+        self._session_factory = session_factory
+        self._default_session = session_factory()
+        self._person_session = None
+        self._scopes = threading.local()
+
+    # ===== Sessions =====
+    # كل توابع DBService تستخدم self.session، وهي حسب السياق:
+    # 1. جلسة session_scope المفتوحة في هذا الخيط (عملية قصيرة).
+    # 2. جلسة ملف الشخص المفتوح (open_person_scope).
+    # 3. الجلسة الافتراضية للواجهة.
+    @property
+    def session(self):
+        stack = getattr(self._scopes, "stack", None)
+        if stack:
+            return stack[-1]
+        return self._person_session or self._default_session
+
+    @contextmanager
+    def session_scope(self):
+        """
+        جلسة قصيرة لعملية واحدة: كل استدعاءات DBService داخل الكتلة (في هذا الخيط)
+        تستخدمها، ويُحفظ العمل عند النجاح ويُتراجع عنه عند الخطأ ثم تُغلق الجلسة
+        فتتحرر كائناتها. الكائنات المعادة تبقى مقروءة بعد الإغلاق (expire_on_commit=False)
+        لكن العلاقات غير المحملة لا تُجلب منها.
+        """
+        session = self._session_factory(expire_on_commit=False)
+        stack = getattr(self._scopes, "stack", None)
+        if stack is None:
+            stack = self._scopes.stack = []
+        stack.append(session)
+        try:
+            yield session
+            session.commit()
+        except BaseException:
+            session.rollback()
+            raise
+        finally:
+            stack.pop()
+            session.close()
+
+    def open_person_scope(self):
+        """
+        بدء جلسة جديدة لملف الشخص الذي يُفتح الآن وإغلاق جلسة الملف السابق.
+        خريطة الهوية لا تحتوي إلا ما لُمس منذ فتح الملف الحالي، وبيانات كل ملف
+        تُقرأ طازجة من القاعدة بدل expire_all على كل الكائنات.
+        """
+        previous = self._person_session
+        self._person_session = self._session_factory()
+        if previous is not None:
+            previous.close()
+        return self._person_session
+
+    def attach(self, obj):
+        """نسخة الكائن في الجلسة الحالية (تُجلب من القاعدة إن كان من جلسة أُغلقت)."""
+        if obj is None:
+            return None
+        state = inspect(obj)
+        if state.session is self.session or state.identity is None:
+            return obj
+        return self.session.get(type(obj), state.identity)
+
+    @staticmethod
+    def same_entity(a, b):
+        """نفس السجل؟ بالمفتاح دون قراءة الصفات، فتعمل أيضاً على كائنات جلسة أُغلقت."""
+        if a is None or b is None or a is b:
+            return a is b
+        identity = inspect(a).identity
+        return identity is not None and type(a) is type(b) and identity == inspect(b).identity
+
+    def get_session_user(self, user_id):
+        """
+        المستخدم المسجل دخوله في الجلسة الافتراضية للواجهة، لا في جلسة ملف الشخص التي
+        تُغلق عند فتح ملف آخر؛ يبقى مرتبطاً حتى تسجيل الخروج (close).
+        """
+        return self._default_session.get(User, user_id)
 
     def close(self):
-        self.session.close()
+        if self._person_session is not None:
+            self._person_session.close()
+            self._person_session = None
+        self._default_session.close()
 
     def find_by_national_id(self, nid):
         orphan = (
@@ -75,7 +170,7 @@ class DBService:
     def _create_opening_balances(self, db, orphan_id: int, balances: dict, create_transactions: bool = False, note=None, transaction_details: dict = None):
         if not balances:
             return
-        currencies = {c.code: c.id for c in db.query(Currency).all()}
+        currencies = reference_cache.currency_ids_by_code()
         for currency_code, amount in balances.items():
             amount_dec = Decimal(amount)
             if amount_dec == Decimal(0):
@@ -154,7 +249,7 @@ class DBService:
                     db.add(orphan)
                 db.flush()
                 for code, new_total in target_balances.items():
-                    currency = db.query(Currency).filter_by(code=code).first()
+                    currency = reference_cache.currency_by_code(code)
                     if not currency: continue
                     bal_obj = db.query(OrphanBalance).filter_by(orphan_id=orphan.id, currency_id=currency.id).first()
                     old_val = bal_obj.balance if bal_obj else Decimal('0')
@@ -179,7 +274,7 @@ class DBService:
                 amount_input = Decimal(str(info.get('amount', 0)))
                 distributed = total_increments.get(code, Decimal('0'))
                 if amount_input <= 0 and distributed <= 0: continue
-                currency = db.query(Currency).filter_by(code=code).first()
+                currency = reference_cache.currency_by_code(code)
                 if not currency: continue
                 if amount_input > 0:
                     note_text = generate_deceased_transaction_note(
@@ -212,18 +307,19 @@ class DBService:
             raise e
 
     def get_currencies(self):
-        return self.session.query(Currency).all()
+        # من الذاكرة المؤقتة المرجعية: CurrencyRef(id, code, name) دون استعلام
+        return reference_cache.currencies()
 
     def get_deceased_people_list(self):
         db = self.session
-        return db.query(Deceased, func.count(Orphan.id).label("orphans_count")).outerjoin(Orphan, Deceased.id == Orphan.deceased_id).group_by(Deceased.id).all()
+        return db.query(Deceased, Deceased.orphans_count).all()
 
     def get_guardians_list(self):
         db = self.session
-        return db.query(Guardian, func.count(OrphanGuardian.orphan_id.distinct()).label("orphans_count")).outerjoin(OrphanGuardian, Guardian.id == OrphanGuardian.guardian_id).group_by(Guardian.id).all()
+        return db.query(Guardian, Guardian.orphans_count).all()
 
     def get_orphans_list(self):
-        return self.session.query(Orphan).outerjoin(OrphanGuardian).options(joinedload(Orphan.guardian_links).joinedload(OrphanGuardian.guardian)).all()
+        return self.session.query(Orphan).options(selectinload(Orphan.guardian_links).selectinload(OrphanGuardian.guardian)).all()
 
     def get_orphans_older_than_or_equal_18_list(self):
         today = date.today()
@@ -235,54 +331,263 @@ class DBService:
         items = query.limit(per_page).offset((page - 1) * per_page).all()
         return {"items": items, "total": total, "page": page, "per_page": per_page, "pages": (total + per_page - 1) // per_page}
 
-    def get_deceased_people_paginated(self, page=1, per_page=20):
-        query = self.session.query(Deceased, func.count(Orphan.id).label("orphans_count")).outerjoin(Orphan, Deceased.id == Orphan.deceased_id).group_by(Deceased.id).order_by(Deceased.id.desc())
-        return self.paginate(query, page, per_page)
-
-    def get_guardians_paginated(self, page=1, per_page=20):
-        query = self.session.query(Guardian, func.count(OrphanGuardian.orphan_id.distinct()).label("orphans_count")).outerjoin(OrphanGuardian, Guardian.id == OrphanGuardian.guardian_id).group_by(Guardian.id).order_by(Guardian.id.desc())
-        return self.paginate(query, page, per_page)
-
-    def get_orphans_paginated(self, page=1, per_page=20):
-        query = self.session.query(Orphan).outerjoin(OrphanGuardian).options(joinedload(Orphan.guardian_links).joinedload(OrphanGuardian.guardian)).order_by(Orphan.id.desc())
-        return self.paginate(query, page, per_page)
-
-    def get_orphans_older_than_or_equal_18_paginated(self, page=1, per_page=20):
+    # ===== Sorting & filtering for list tabs =====
+    # مفاتيح الترتيب المسموح بها لكل قائمة؛ القيمة (عمود, معكوس) تعني أن الترتيب يُعكس
+    # (مثلاً العمر تصاعدياً = تاريخ الميلاد تنازلياً). أي مفتاح غير معروف يعود للترتيب الافتراضي.
+    DECEASED_SORT_COLUMNS = {
+        "id": Deceased.id,
+        "name": Deceased.name,
+        "national_id": Deceased.national_id,
+        "date_death": Deceased.date_death,
+        "account_number": Deceased.account_number,
+        "archives_number": Deceased.archives_number,
+        "orphans_count": Deceased.orphans_count,
+    }
+    GUARDIAN_SORT_COLUMNS = {
+        "id": Guardian.id,
+        "name": Guardian.name,
+        "national_id": Guardian.national_id,
+        "phone": Guardian.phone,
+        "orphans_count": Guardian.orphans_count,
+    }
+    ORPHAN_SORT_COLUMNS = {
+        "id": Orphan.id,
+        "name": Orphan.name,
+        "national_id": Orphan.national_id,
+        "date_birth": Orphan.date_birth,
+        "gender": Orphan.gender,
+        "age": (Orphan.date_birth, True),
+        "guardian": select(Guardian.name).where(Guardian.id == Orphan.primary_guardian_id).scalar_subquery(),
+    }
+    ACTIVITY_LOG_SORT_COLUMNS = {
+        "id": ActivityLog.id,
+        "created_at": ActivityLog.created_at,
+        "user": ActivityLog.user_id,
+        "action": ActivityLog.action,
+        "resource_type": ActivityLog.resource_type,
+    }
+
+    @staticmethod
+    def _apply_sort(query, sort, columns, default_column):
+        """
+        sort = (key, descending). نضيف المعرّف دائماً كمفتاح ثانوي حتى يبقى ترتيب
+        الصفوف ثابتاً بين الدفعات (LIMIT/OFFSET) عند تساوي القيم.
+        """
+        key, descending = sort if sort else (None, True)
+        column = columns.get(key)
+        if column is None:
+            return query.order_by(default_column.desc())
+        if isinstance(column, tuple):
+            column, reverse = column
+            descending = descending != reverse
+        return query.order_by(column.desc() if descending else column.asc(), default_column.desc())
+
+    @staticmethod
+    def _apply_text_filters(query, filters, name_column, national_id_column):
+        name = (filters.get("name") or "").strip()
+        if name:
+            query = query.filter(name_column.ilike(f"%{name}%"))
+        national_id = (filters.get("national_id") or "").strip()
+        if national_id:
+            # مطابقة البادئة تسمح باستخدام فهرس رقم الهوية
+            query = query.filter(national_id_column.like(f"{national_id}%"))
+        return query
+
+    @staticmethod
+    def _apply_date_range(query, filters, column):
+        date_from = filters.get("date_from")
+        date_to = filters.get("date_to")
+        if date_from:
+            query = query.filter(column >= date_from)
+        if date_to:
+            if isinstance(column.type, DateTime) and not isinstance(date_to, datetime):
+                # نطاق شامل لليوم الأخير كاملاً
+                query = query.filter(column < datetime.combine(date_to, time.min) + timedelta(days=1))
+            else:
+                query = query.filter(column <= date_to)
+        return query
+
+    @staticmethod
+    def _apply_count_range(query, filters, count_column):
+        orphans_min = filters.get("orphans_min")
+        orphans_max = filters.get("orphans_max")
+        if orphans_min is not None:
+            query = query.filter(count_column >= orphans_min)
+        if orphans_max is not None:
+            query = query.filter(count_column <= orphans_max)
+        return query
+
+    def get_deceased_people_paginated(self, page=1, per_page=20, sort=None, filters=None):
+        # orphans_count عمود محدَّث تلقائياً، فلا حاجة لـ JOIN و GROUP BY عند كل صفحة
+        filters = filters or {}
+        stmt = read_models.deceased_list_select()
+        stmt = self._apply_text_filters(stmt, filters, Deceased.name, Deceased.national_id)
+        stmt = self._apply_date_range(stmt, filters, Deceased.date_death)
+        stmt = self._apply_count_range(stmt, filters, Deceased.orphans_count)
+        stmt = self._apply_sort(stmt, sort, self.DECEASED_SORT_COLUMNS, Deceased.id)
+        return read_models.fetch_page(self.session.connection(), stmt, read_models.DeceasedRow, page, per_page)
+
+    def get_guardians_paginated(self, page=1, per_page=20, sort=None, filters=None):
+        filters = filters or {}
+        stmt = read_models.guardian_list_select()
+        stmt = self._apply_text_filters(stmt, filters, Guardian.name, Guardian.national_id)
+        stmt = self._apply_count_range(stmt, filters, Guardian.orphans_count)
+        stmt = self._apply_sort(stmt, sort, self.GUARDIAN_SORT_COLUMNS, Guardian.id)
+        return read_models.fetch_page(self.session.connection(), stmt, read_models.GuardianRow, page, per_page)
+
+    def _filtered_orphans_query(self, query, sort, filters):
+        filters = filters or {}
+        query = self._apply_text_filters(query, filters, Orphan.name, Orphan.national_id)
+        query = self._apply_date_range(query, filters, Orphan.date_birth)
+        gender = filters.get("gender")
+        if gender:
+            query = query.filter(Orphan.gender == GenderEnum(gender))
+        guardian = (filters.get("guardian") or "").strip()
+        if guardian:
+            query = query.filter(Orphan.primary_guardian.has(Guardian.name.ilike(f"%{guardian}%")))
+        return self._apply_sort(query, sort, self.ORPHAN_SORT_COLUMNS, Orphan.id)
+
+    def get_orphans_paginated(self, page=1, per_page=20, sort=None, filters=None):
+        # صف واحد لكل يتيم (الوصي الأساسي عبر primary_guardian_id)، فيطبق LIMIT/OFFSET
+        # مباشرة ويأتي اسم الوصي في نفس الاستعلام
+        stmt = self._filtered_orphans_query(read_models.orphan_list_select(), sort, filters)
+        return read_models.fetch_page(self.session.connection(), stmt, read_models.OrphanRow, page, per_page)
+
+    def get_orphans_older_than_or_equal_18_paginated(self, page=1, per_page=20, sort=None, filters=None):
         today = date.today()
         cutoff_date = date(today.year - 18, today.month, today.day)
-        query = self.session.query(Orphan).filter(Orphan.date_birth <= cutoff_date).order_by(Orphan.id.desc())
-        return self.paginate(query, page, per_page)
-
-    def get_activity_logs_paginated(self, page=1, per_page=20):
-        query = self.session.query(ActivityLog).order_by(ActivityLog.id.desc())
-        return self.paginate(query, page, per_page)
-
-    def get_summary_counts(self):
-        db = self.session
-        total_orphans = db.query(func.count(Orphan.id)).scalar() or 0
-        today = date.today()
-        cutoff = date(today.year - 18, today.month, today.day)
-        # Only count orphans where date_birth is not NULL and is <= cutoff
-        orphans_over_18 = db.query(func.count(Orphan.id)).filter(Orphan.date_birth != None, Orphan.date_birth <= cutoff).scalar() or 0
-        total_guardians = db.query(func.count(Guardian.id)).scalar() or 0
-        total_deceased = db.query(func.count(Deceased.id)).scalar() or 0
-        return {"orphans": int(total_orphans), "orphans_over_18": int(orphans_over_18), "guardians": int(total_guardians), "deceased": int(total_deceased)}
-
+        stmt = read_models.orphan_list_select().where(Orphan.date_birth <= cutoff_date)
+        stmt = self._filtered_orphans_query(stmt, sort, filters)
+        return read_models.fetch_page(self.session.connection(), stmt, read_models.OrphanRow, page, per_page)
+
+    @staticmethod
+    def _activity_log_order(sort):
+        """ترتيب قابل للتصفح بمؤشر [(عمود, تنازلي)]، أو None لمفاتيح الترتيب الأخرى."""
+        key, descending = sort if sort else (None, True)
+        if key is None:
+            return [(ActivityLog.id, True)]
+        if key == "id":
+            return [(ActivityLog.id, descending)]
+        if key == "created_at":
+            return [(ActivityLog.created_at, descending), (ActivityLog.id, True)]
+        return None
+
+    def _filter_activity_logs(self, stmt, filters):
+        for key in ("user_id", "action", "resource_type"):
+            value = filters.get(key)
+            if value:
+                stmt = stmt.filter(getattr(ActivityLog, key) == value)
+        resource_id = str(filters.get("resource_id") or "").strip()
+        if resource_id.isdigit():
+            stmt = stmt.filter(ActivityLog.resource_id == int(resource_id))
+        return self._apply_date_range(stmt, filters, ActivityLog.created_at)
+
+    def search_activity_logs(self, filters=None, after=None, limit=100, sort=None):
+        """
+        بحث مصفّى في سجل النشاطات بمؤشر (keyset) بدل OFFSET:
+
+            page = db.search_activity_logs({"user_id": 3, "date_from": d}, limit=100)
+            page = db.search_activity_logs({"user_id": 3, "date_from": d}, after=page["next"])
+
+        الفلاتر: user_id، action، resource_type، resource_id، date_from/date_to.
+        sort = (key, descending) بالمفتاح id أو created_at. next = None في آخر صفحة.
+        """
+        order = self._activity_log_order(sort)
+        if order is None:
+            raise ValueError(f"Keyset paging is not supported for sort key {sort[0]!r}")
+        stmt = self._filter_activity_logs(read_models.activity_log_list_select(), filters or {})
+        if after is not None:
+            stmt = stmt.where(read_models.keyset_after(order, after))
+        stmt = stmt.order_by(*(column.desc() if descending else column.asc() for column, descending in order))
+        items = list(map(read_models.ActivityLogRow._make, self.session.connection().execute(stmt.limit(limit))))
+        next_cursor = None
+        if len(items) == limit:
+            next_cursor = tuple(getattr(items[-1], column.key) for column, _ in order)
+            if None in next_cursor:
+                next_cursor = None
+        return {"items": items, "next": next_cursor}
+
+    def get_activity_logs_paginated(self, page=1, per_page=20, sort=None, filters=None):
+        filters = filters or {}
+        order = self._activity_log_order(sort)
+        # المؤشرات تخص حجم صفحة بعينه: آخر صف في صفحة من 20 ليس آخر صف في صفحة من 50
+        cache_key = (tuple(sort) if sort else None, tuple(sorted(filters.items())), per_page)
+        with _ACTIVITY_LOG_CURSORS_LOCK:
+            entry = _ACTIVITY_LOG_CURSORS.get(cache_key) if page > 1 else None
+            cursor = entry["cursors"].get(page) if entry else None
+        if entry is None:
+            # السجلات تُكتب في الخلفية؛ عند الصفحة الأولى أو تغيير الفلاتر نكتب المنتظر منها
+            # حتى يرى المستخدم آخر عملياته، لا عند كل صفحة تُجلب أثناء التمرير
+            activity_log_writer.flush()
+
+        connection = self.session.connection()
+        if order is None or (page > 1 and cursor is None):
+            # ترتيب بعمود آخر، أو صفحة لم يُعرف مؤشرها بعد: LIMIT/OFFSET
+            stmt = self._filter_activity_logs(read_models.activity_log_list_select(), filters)
+            stmt = self._apply_sort(stmt, sort, self.ACTIVITY_LOG_SORT_COLUMNS, ActivityLog.id)
+            return read_models.fetch_page(connection, stmt, read_models.ActivityLogRow, page, per_page)
+
+        # الصفحة الأولى تعيد العد وتبدأ سلسلة مؤشرات جديدة؛ التالية تكمل من آخر صف
+        if entry is None:
+            total = read_models.count_rows(connection, self._filter_activity_logs(read_models.activity_log_list_select(), filters))
+        else:
+            total = entry["total"]
+        result = self.search_activity_logs(filters, after=cursor, limit=per_page, sort=sort)
+        with _ACTIVITY_LOG_CURSORS_LOCK:
+            if page == 1:
+                if len(_ACTIVITY_LOG_CURSORS) >= ACTIVITY_LOG_CURSOR_KEYS:
+                    _ACTIVITY_LOG_CURSORS.pop(next(iter(_ACTIVITY_LOG_CURSORS)))
+                entry = _ACTIVITY_LOG_CURSORS[cache_key] = {"total": total, "cursors": {}}
+            if result["next"] is not None:
+                entry["cursors"][page + 1] = result["next"]
+        return {"items": result["items"], "total": total, "page": page, "per_page": per_page, "pages": (total + per_page - 1) // per_page}
+
+    def get_list_filter_options(self, force=False):
+        """
+        خيارات قوائم التصفية (المستخدمون، العمليات، أنواع الموارد) مع تخزين مؤقت على
+        مستوى الوحدة، حتى لا تعاد قراءتها عند كل فتح لتبويب أو تغيير لفلتر.
+        """
+        cached = _FILTER_OPTIONS_CACHE.get("options")
+        if cached and not force and monotonic() - cached[0] < FILTER_OPTIONS_TTL:
+            return cached[1]
+        options = {
+            "users": [(u.id, u.username) for u in self.session.query(User.id, User.username).order_by(User.username)],
+            "actions": [a for (a,) in self.session.query(ActivityLog.action).distinct().order_by(ActivityLog.action) if a],
+            "resource_types": [r for (r,) in self.session.query(ActivityLog.resource_type).distinct().order_by(ActivityLog.resource_type) if r],
+        }
+        _FILTER_OPTIONS_CACHE["options"] = (monotonic(), options)
+        return options
+
+    @staticmethod
+    def invalidate_filter_options():
+        _FILTER_OPTIONS_CACHE.clear()
+
+    def get_summary_counts(self, force=False):
+        """
+        أعداد اللوحة (orphans، orphans_over_18، guardians، deceased) ومجاميع الأرصدة
+        لكل عملة (balances) باستعلام واحد، مع تخزين مؤقت (services/dashboard_summary).
+        """
+        return dashboard_summary.get_summary(self.session.connection(), force)
+
+    @metrics.timed("search")
     def search_guardian(self, text):
-        return self.session.query(Guardian).filter(or_(Guardian.national_id.ilike(f"%{text}%"), Guardian.name.ilike(f"%{text}%"))).limit(20).all()
+        return self.session.scalars(statements.SEARCH_GUARDIAN, {"pattern": f"%{text}%"}).all()
 
+    @metrics.timed("search")
     def search_deceased(self, text):
-        return self.session.query(Deceased).filter(or_(Deceased.national_id.ilike(f"%{text}%"), Deceased.name.ilike(f"%{text}%"))).limit(20).all()
+        return self.session.scalars(statements.SEARCH_DECEASED, {"pattern": f"%{text}%"}).all()
 
+    @metrics.timed("search")
     def search_orphan(self, text, _all=False, linked=False):
-        query = self.session.query(Orphan)
-        if not _all:
-            query = query.filter(Orphan.deceased_id == None) if linked is False else query.filter(Orphan.deceased_id != None)
-        return query.filter(or_(Orphan.national_id.ilike(f"%{text}%"), Orphan.name.ilike(f"%{text}%"))).limit(20).all()
+        if _all:
+            stmt = statements.SEARCH_ORPHAN_ALL
+        else:
+            stmt = statements.SEARCH_ORPHAN_UNLINKED if linked is False else statements.SEARCH_ORPHAN_LINKED
+        return self.session.scalars(stmt, {"pattern": f"%{text}%"}).all()
 
     def check_if_orphan_exists(self, name: str) -> bool:
         """Check if orphan exists by NAME (primary key for duplicates)"""
-        return self.session.query(Orphan).filter(Orphan.name == name).first() is not None
+        return self.session.scalar(statements.ORPHAN_EXISTS, {"name": name})
 
     def get_orphan_by_name(self, name):
         """Get orphan by NAME (primary lookup)"""
@@ -294,7 +599,7 @@ class DBService:
 
     def check_if_deceased_exists(self, name: str) -> bool:
         """Check if deceased exists by NAME (primary key for duplicates)"""
-        return self.session.query(Deceased).filter(Deceased.name == name).first() is not None
+        return self.session.scalar(statements.DECEASED_EXISTS, {"name": name})
 
     def get_deceased_by_name(self, name):
         """Get deceased by NAME (primary lookup)"""
@@ -302,20 +607,24 @@ class DBService:
 
     def check_if_guardian_exists(self, name: str) -> bool:
         """Check if guardian exists by NAME (primary key for duplicates)"""
-        return self.session.query(Guardian).filter(Guardian.name == name).first() is not None
+        return self.session.scalar(statements.GUARDIAN_EXISTS, {"name": name})
 
     def get_guardian_by_name(self, name):
         """Get guardian by NAME (primary lookup)"""
         return self.session.query(Guardian).filter_by(name=name).first()
 
     def get_orphan_details(self, orphan_id: int):
-        return self.session.query(Orphan).options(joinedload(Orphan.deceased), joinedload(Orphan.guardian_links).joinedload(OrphanGuardian.guardian), joinedload(Orphan.balances).joinedload(OrphanBalance.currency)).filter(Orphan.id == orphan_id).first()
+        return self.session.scalars(statements.ORPHAN_DETAILS, {"orphan_id": orphan_id}).first()
 
     def get_deceased_details(self, deceased_id: int):
-        deceased = self.session.query(Deceased).options(joinedload(Deceased.orphans).joinedload(Orphan.balances).joinedload(OrphanBalance.currency)).filter(Deceased.id == deceased_id).first()
+        deceased = self.session.query(Deceased).options(
+            selectinload(Deceased.orphans).selectinload(Orphan.balances).joinedload(OrphanBalance.currency),
+            selectinload(Deceased.orphans).selectinload(Orphan.primary_guardian_link).joinedload(OrphanGuardian.guardian),
+            selectinload(Deceased.balances),
+        ).filter(Deceased.id == deceased_id).first()
         guardian = None
         if deceased and deceased.orphans:
-            primary_link = self.session.query(OrphanGuardian).filter_by(orphan_id=deceased.orphans[0].id, is_primary=True).first()
+            primary_link = deceased.orphans[0].primary_guardian_link
             if primary_link:
                 guardian = primary_link.guardian
         return deceased, (deceased.orphans if deceased else []), guardian
@@ -324,7 +633,7 @@ class DBService:
         guardian = self.session.query(Guardian).filter_by(id=guardian_id).first()
         if not guardian:
             return None, []
-        orphans = self.session.query(Orphan).join(OrphanGuardian).options(joinedload(Orphan.balances).joinedload(OrphanBalance.currency)).filter(OrphanGuardian.guardian_id == guardian_id).all()
+        orphans = self.session.query(Orphan).join(OrphanGuardian).options(selectinload(Orphan.balances).joinedload(OrphanBalance.currency), selectinload(Orphan.guardian_links)).filter(OrphanGuardian.guardian_id == guardian_id).all()
         return guardian, orphans
 
     def get_orphan_balances(self, orphan_id: int):
@@ -333,9 +642,35 @@ class DBService:
     def get_orphan_transactions(self, orphan_id: int, limit: int = 15):
         return self.session.query(Transaction).options(joinedload(Transaction.currency)).filter_by(orphan_id=orphan_id).order_by(Transaction.created_date.desc()).limit(limit).all()
 
-    def get_orphans_by_date_range(self, start_dt, end_dt):
+    # ===== Report rows (services/read_models) =====
+    def get_deceased_report_rows(self, deceased_id: int):
+        """(DeceasedReportRow أو None، [OrphanReportRow]) بأرصدة بترتيب get_currencies()."""
+        connection, currencies = self.session.connection(), self.get_currencies()
+        deceased = read_models.read_deceased_report(connection, deceased_id, currencies)
+        if deceased is None:
+            return None, []
+        return deceased, read_models.read_orphans_report(connection, currencies, Orphan.deceased_id == deceased_id)
+
+    def get_guardian_report_rows(self, guardian_id: int):
+        """(GuardianRow أو None، [GuardianOrphanRow])."""
+        connection = self.session.connection()
+        guardian = read_models.read_guardian(connection, guardian_id)
+        if guardian is None:
+            return None, []
+        return guardian, read_models.read_guardian_orphans(connection, guardian_id, self.get_currencies())
+
+    def get_orphan_report_rows_by_date_range(self, start_dt, end_dt):
         end_dt_full = datetime.combine(end_dt.date(), time.max)
-        return self.session.query(Orphan).options(joinedload(Orphan.balances).joinedload(OrphanBalance.currency), joinedload(Orphan.guardian_links).joinedload(OrphanGuardian.guardian)).filter(Orphan.created_at >= start_dt).filter(Orphan.created_at <= end_dt_full).all()
+        return read_models.read_orphans_report(
+            self.session.connection(), self.get_currencies(),
+            Orphan.created_at >= start_dt, Orphan.created_at <= end_dt_full,
+        )
+
+    def get_monthly_rollups(self, month_from, month_to, currency_id=None):
+        """خانات الملخص الشهري للحركات (database/rollups.py) في المدى المطلوب."""
+        return read_models.read_monthly_rollups(
+            self.session.connection(), month_start(month_from), month_start(month_to), currency_id
+        )
 
     def add_single_deceased_transaction(self, data):
         session = self.session
@@ -502,81 +837,21 @@ class DBService:
 
     def get_deceased_balance(self, deceased_id, currency_code):
         try:
-            result = self.session.query(DeceasedBalance.balance).join(Currency).filter(DeceasedBalance.deceased_id == deceased_id, Currency.code == currency_code).first()
+            result = self.session.execute(statements.DECEASED_BALANCE, {"deceased_id": deceased_id, "currency_code": currency_code}).first()
             return result[0] if result else Decimal('0.00')
         except Exception as e:
             print(f"خطأ أثناء جلب الرصيد: {e}")
             return Decimal('0.00')
     
     def get_deceased_summary(self, deceased_id):
-        session = self.session
-        # استعلام لجلب إجمالي الإيداعات والسحوبات من جدول العمليات
-        transactions = session.query(
-            DeceasedTransaction.currency_id,
-            func.sum(case((DeceasedTransaction.type == TransactionTypeEnum.deposit, DeceasedTransaction.amount), else_=0)).label('total_deposit'),
-            func.sum(case((DeceasedTransaction.type == TransactionTypeEnum.withdraw, DeceasedTransaction.amount), else_=0)).label('total_withdraw')
-        ).filter(DeceasedTransaction.deceased_id == deceased_id).group_by(DeceasedTransaction.currency_id).subquery()
-
-        # الربط مع جدول العملات وجدول الأرصدة الحالي
-        results = session.query(
-            Currency.name,
-            func.coalesce(transactions.c.total_deposit, 0).label('deposited'),
-            func.coalesce(transactions.c.total_withdraw, 0).label('withdrawn'),
-            func.coalesce(DeceasedBalance.balance, 0).label('available')
-        ).outerjoin(
-            DeceasedBalance,
-            (DeceasedBalance.currency_id == Currency.id) & (DeceasedBalance.deceased_id == deceased_id)
-        )\
-        .outerjoin(transactions, transactions.c.currency_id == Currency.id)\
-        .all()
-
-        return results
+        # (name, deposited, withdrawn, available) لكل عملة؛ العبارة في services/statements
+        return self.session.execute(statements.DECEASED_SUMMARY, {"owner_id": deceased_id}).all()
     
     def get_orphan_summary(self, orphan_id):
-        session = self.session
-        # حساب العمليات (إيداع/سحب)
-        transactions = session.query(
-            Transaction.currency_id,
-            func.sum(case((Transaction.type == TransactionTypeEnum.deposit, Transaction.amount), else_=0)).label('total_deposit'),
-            func.sum(case((Transaction.type == TransactionTypeEnum.withdraw, Transaction.amount), else_=0)).label('total_withdraw')
-        ).filter(Transaction.orphan_id == orphan_id).group_by(Transaction.currency_id).subquery()
-
-        # الاستعلام النهائي للجدول
-        results = session.query(
-            Currency.name,
-            func.coalesce(transactions.c.total_deposit, 0).label('deposited'),
-            func.coalesce(transactions.c.total_withdraw, 0).label('withdrawn'),
-            func.coalesce(OrphanBalance.balance, 0).label('available')
-        ).outerjoin(
-            OrphanBalance,
-            (OrphanBalance.currency_id == Currency.id) & (OrphanBalance.orphan_id == orphan_id)
-        )\
-        .outerjoin(transactions, transactions.c.currency_id == Currency.id)\
-        .all()
-
-        return results
+        return self.session.execute(statements.ORPHAN_SUMMARY, {"owner_id": orphan_id}).all()
     
     def get_guardian_summary(self, guardian_id):
-        session = self.session
-        transactions = session.query(
-            GuardianTransaction.currency_id,
-            func.sum(case((GuardianTransaction.type == TransactionTypeEnum.deposit, GuardianTransaction.amount), else_=0)).label('total_deposit'),
-            func.sum(case((GuardianTransaction.type == TransactionTypeEnum.withdraw, GuardianTransaction.amount), else_=0)).label('total_withdraw')
-        ).filter(GuardianTransaction.guardian_id == guardian_id).group_by(GuardianTransaction.currency_id).subquery()
-        
-        results = session.query(
-            Currency.name,
-            func.coalesce(transactions.c.total_deposit, 0).label('deposited'),
-            func.coalesce(transactions.c.total_withdraw, 0).label('withdrawn'),
-            func.coalesce(GuardianBalance.balance, 0).label('available')
-        ).outerjoin(
-            GuardianBalance,
-            (GuardianBalance.currency_id == Currency.id) & (GuardianBalance.guardian_id == guardian_id)
-        )\
-        .outerjoin(transactions, transactions.c.currency_id == Currency.id)\
-        .all()
-        
-        return results
+        return self.session.execute(statements.GUARDIAN_SUMMARY, {"owner_id": guardian_id}).all()
 
     def search_deceased_in_db(self, search_term):
         """البحث في قاعدة البيانات بناءً على الاسم أو الهوية أو الأرشيف"""
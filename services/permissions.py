@@ -1,18 +1,45 @@
-from database.models import PermissionEnum, User
+from sqlalchemy.orm import object_session
 
+from database.models import Permission, PermissionEnum, RolePermission, User
 
-def has_permission(user: User, resource: str, action: PermissionEnum) -> bool:
-    if user.is_superuser:
-        return True
+# تُحفظ الصلاحيات المحسوبة على كائن المستخدم نفسه كخاصية غير مرتبطة بالـ ORM،
+# فلا يمسحها expire بعد commit ولا تحتاج أي استعلام عند التحقق.
+_CACHE_ATTR = "_permission_cache"
+
+
+def load_user_permissions(session, user: User) -> frozenset:
+    """صلاحيات دور المستخدم كمجموعة (resource, action) باستعلام واحد."""
+    if not user.role_id:
+        return frozenset()
+    rows = (
+        session.query(Permission.resource, Permission.action)
+        .join(RolePermission, RolePermission.permission_id == Permission.id)
+        .filter(RolePermission.role_id == user.role_id)
+        .all()
+    )
+    return frozenset((resource, action) for resource, action in rows)
 
-    if not user.role:
-        return False
 
-    for rp in user.role.permissions:
-        if (
-            rp.permission.resource == resource and
-            rp.permission.action == action
-        ):
-            return True
+def refresh_user_permissions(user: User, session=None) -> frozenset:
+    """
+    إعادة حساب صلاحيات المستخدم وتخزينها عليه. تُستدعى عند تسجيل الدخول وبعد أي
+    تعديل على الأدوار أو الصلاحيات أو دور المستخدم.
+    """
+    session = session or object_session(user)
+    permissions = load_user_permissions(session, user)
+    user.__dict__[_CACHE_ATTR] = (bool(user.is_superuser), permissions)
+    return permissions
 
-    return False
+
+def has_permission(user: User, resource: str, action: PermissionEnum) -> bool:
+    cached = user.__dict__.get(_CACHE_ATTR)
+    if cached is None:
+        refresh_user_permissions(user)
+        cached = user.__dict__[_CACHE_ATTR]
+
+    is_superuser, permissions = cached
+    if is_superuser:
+        return True
+    if isinstance(action, str):
+        action = PermissionEnum(action)
+    return (resource, action) in permissions
@@ -0,0 +1,148 @@
+"""
+تنفيذ استدعاءات DBService في الخلفية على QThreadPool وتسليم النتائج في خيط الواجهة.
+
+    ticket = query_executor.submit(
+        lambda db: db.get_summary_counts(),
+        key="dashboard_summary",
+        on_result=self.apply_summary,
+    )
+
+- الدالة تُستدعى بنسخة DBService خاصة بخيط العامل، داخل session_scope() فتنتهي
+  جلسة كل استدعاء معه. الكائنات المعادة منفصلة عن الجلسة: يجب أن تكون القيم المطلوبة
+  محملة مسبقاً (أو تعاد بيانات جاهزة للعرض كما في row_formatter).
+- on_result / on_error تُستدعى في خيط الواجهة. ticket.future (concurrent.futures)
+  متاح للسكربتات والاختبارات.
+- ticket.cancel(): المهمة التي لم تبدأ تُزال من الطابور، والتي بدأت تُهمل نتيجتها.
+- سياسة النتائج القديمة: الطلب الجديد بنفس key يلغي السابق، ولا تُسلَّم إلا نتيجة
+  آخر طلب لكل key (مثل تبديل العملة أو الشخص بسرعة).
+"""
+import logging
+import threading
+from concurrent.futures import Future
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+MAX_THREADS = 4
+
+_thread_local = threading.local()
+
+
+def _thread_service():
+    """DBService واحدة لكل خيط عامل (الجلسات نفسها قصيرة عبر session_scope)."""
+    service = getattr(_thread_local, "service", None)
+    if service is None:
+        from services.db_services import DBService
+        service = _thread_local.service = DBService()
+    return service
+
+
+class QueryTicket:
+    def __init__(self, key, on_result, on_error):
+        self.key = key
+        self.on_result = on_result
+        self.on_error = on_error
+        self.future = Future()
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self.future.cancel()
+
+
+class _QueryTask(QRunnable):
+    def __init__(self, executor, ticket, func, args, kwargs):
+        super().__init__()
+        self.setAutoDelete(True)
+        self.executor = executor
+        self.ticket = ticket
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        ticket = self.ticket
+        if ticket.cancelled or not ticket.future.set_running_or_notify_cancel():
+            return
+        try:
+            service = _thread_service()
+            with service.session_scope():
+                result = self.func(service, *self.args, **self.kwargs)
+        except Exception as e:
+            ticket.future.set_exception(e)
+            result, error = None, e
+        else:
+            ticket.future.set_result(result)
+            error = None
+        try:
+            self.executor._task_done.emit(ticket, result, error)
+        except RuntimeError:
+            pass  # التطبيق يُغلق وحُذف المنفذ قبل انتهاء المهمة
+
+
+class QueryExecutor(QObject):
+    # (ticket, result, error) من خيط العامل إلى خيط الواجهة
+    _task_done = pyqtSignal(object, object, object)
+
+    def __init__(self, max_threads=MAX_THREADS, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(max_threads)
+        self._latest = {}   # key -> (ticket, task)
+        self._task_done.connect(self._deliver)
+
+    def submit(self, func, *args, key=None, on_result=None, on_error=None, **kwargs):
+        """تشغيل func(db_service, *args, **kwargs) في الخلفية؛ يُستدعى من خيط الواجهة."""
+        ticket = QueryTicket(key, on_result, on_error)
+        task = _QueryTask(self, ticket, func, args, kwargs)
+        if key is not None:
+            self.cancel(key)
+            self._latest[key] = (ticket, task)
+        self._pool.start(task)
+        return ticket
+
+    def cancel(self, key):
+        """إلغاء آخر طلب بهذا المفتاح (إن وُجد)."""
+        entry = self._latest.pop(key, None)
+        if entry is None:
+            return
+        ticket, task = entry
+        ticket.cancel()
+        try:
+            self._pool.tryTake(task)
+        except RuntimeError:
+            pass  # المهمة انتهت وحُذفت بالفعل
+
+    def _deliver(self, ticket, result, error):
+        if ticket.key is not None:
+            entry = self._latest.get(ticket.key)
+            if entry is None or entry[0] is not ticket:
+                return  # نتيجة قديمة حل محلها طلب أحدث
+            del self._latest[ticket.key]
+        if ticket.cancelled:
+            return
+        if error is not None:
+            if ticket.on_error is not None:
+                ticket.on_error(error)
+            else:
+                logger.warning(f"Background query failed: {error}")
+        elif ticket.on_result is not None:
+            ticket.on_result(result)
+
+    def wait_for_done(self, msecs=-1):
+        return self._pool.waitForDone(msecs)
+
+    def shutdown(self, msecs=2000):
+        """إلغاء ما لم يبدأ وانتظار ما يعمل (عند إغلاق التطبيق)."""
+        for key in list(self._latest):
+            self.cancel(key)
+        self._pool.clear()
+        return self._pool.waitForDone(msecs)
+
+
+query_executor = QueryExecutor()
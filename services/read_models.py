@@ -0,0 +1,191 @@
+"""
+طبقة قراءة خفيفة للقوائم والتقارير.
+
+استعلامات Core (select لأعمدة محددة، تُنفذ على اتصال الجلسة مباشرة) تعيد
+namedtuple بالأعمدة المطلوبة فقط بدل كائنات ORM بعلاقاتها: لا خريطة هوية ولا
+تتبع حالة ولا تحميل علاقات، ولا يمكن أن يحدث تحميل كسول (N+1) من المنسِّقات.
+اسم الوصي الأساسي يأتي بـ JOIN على primary_guardian_id، والأرصدة تُدار (pivot) في
+SQL إلى عمود لكل عملة بترتيب reference_cache.currencies().
+
+الصفوف غير مرتبطة بأي جلسة، فيمكن تمريرها بين الخيوط (query_executor) بأمان.
+"""
+from collections import namedtuple
+
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import aliased
+
+from database.models import (
+    ActivityLog, Deceased, DeceasedBalance, Guardian, MonthlyTransactionRollup, Orphan, OrphanBalance, OrphanGuardian,
+    User,
+)
+from utils.helpers import calculate_age
+
+# ===== DTOs =====
+DeceasedRow = namedtuple("DeceasedRow", "id name national_id date_death account_number archives_number orphans_count")
+GuardianRow = namedtuple("GuardianRow", "id name national_id phone orphans_count")
+ActivityLogRow = namedtuple("ActivityLogRow", "id created_at username action resource_type description")
+
+
+class OrphanRow(namedtuple("OrphanRow", "id name national_id date_birth gender guardian_name")):
+    __slots__ = ()
+
+    @property
+    def age(self):
+        return calculate_age(self.date_birth)
+
+
+# balances: مبالغ float بنفس ترتيب العملات الممررة (0.0 للعملة غير الموجودة)
+DeceasedReportRow = namedtuple(
+    "DeceasedReportRow", "id name national_id date_death account_number archives_number balances"
+)
+OrphanReportRow = namedtuple(
+    "OrphanReportRow",
+    "id name national_id date_birth gender guardian_name guardian_national_id guardian_start_date balances",
+)
+GuardianOrphanRow = namedtuple(
+    "GuardianOrphanRow", "id name national_id relation start_date end_date is_primary balances"
+)
+# خانة من الملخصات الشهرية (database/rollups.py)؛ total بـ float
+MonthlyRollupRow = namedtuple("MonthlyRollupRow", "month currency_id entity_kind type total count")
+
+# الوصي الأساسي باسم مستعار حتى لا يتعارض مع Guardian في شروط التصفية والترتيب
+PrimaryGuardian = aliased(Guardian, name="primary_guardian")
+
+
+# ===== Statements for list pages =====
+def deceased_list_select():
+    return select(
+        Deceased.id, Deceased.name, Deceased.national_id, Deceased.date_death,
+        Deceased.account_number, Deceased.archives_number, Deceased.orphans_count,
+    )
+
+
+def guardian_list_select():
+    return select(Guardian.id, Guardian.name, Guardian.national_id, Guardian.phone, Guardian.orphans_count)
+
+
+def orphan_list_select():
+    return select(
+        Orphan.id, Orphan.name, Orphan.national_id, Orphan.date_birth, Orphan.gender, PrimaryGuardian.name,
+    ).outerjoin(PrimaryGuardian, PrimaryGuardian.id == Orphan.primary_guardian_id)
+
+
+def activity_log_list_select():
+    return select(
+        ActivityLog.id, ActivityLog.created_at, User.username, ActivityLog.action,
+        ActivityLog.resource_type, ActivityLog.description,
+    ).outerjoin(User, User.id == ActivityLog.user_id)
+
+
+def count_rows(connection, stmt):
+    return connection.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar() or 0
+
+
+def fetch_page(connection, stmt, row_type, page=1, per_page=20):
+    """نفس صيغة DBService.paginate لكن بصفوف DTO."""
+    total = count_rows(connection, stmt)
+    result = connection.execute(stmt.limit(per_page).offset((page - 1) * per_page))
+    items = list(map(row_type._make, result))
+    return {"items": items, "total": total, "page": page, "per_page": per_page, "pages": (total + per_page - 1) // per_page}
+
+
+def keyset_after(order, values):
+    """
+    شرط "بعد الصف values" لترتيب order = [(عمود, تنازلي)، ...] ينتهي بمفتاح فريد:
+    (c1 بعد v1) أو (c1 = v1 و c2 بعد v2) ... فيُقرأ ما بعد المؤشر من الفهرس مباشرة
+    بدل تخطي OFFSET صفاً.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        after = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*(c == v for (c, _), v in zip(order[:i], values[:i])), after))
+    return or_(*clauses)
+
+
+# ===== Balances pivot =====
+def select_with_balances(columns, balance_model, owner_column, owner_id, currencies):
+    """
+    select(columns + مجموع لكل عملة) بـ LEFT JOIN على جدول الأرصدة و GROUP BY على
+    columns، فيُقرأ رصيد كل مالك عبر فهرس (owner_id, currency_id) لصفوفه فقط.
+    """
+    sums = [
+        func.sum(case((balance_model.currency_id == c.id, balance_model.balance), else_=0))
+        for c in currencies
+    ]
+    return (
+        select(*columns, *sums)
+        .outerjoin(balance_model, owner_column == owner_id)
+        .group_by(*columns)
+    )
+
+
+def _split_balances(rows, row_type, width):
+    """أول width أعمدة للحقول، والباقي أرصدة العملات (NULL عند عدم وجود أرصدة)."""
+    return [
+        row_type(*row[:width], tuple(float(v) if v is not None else 0.0 for v in row[width:]))
+        for row in rows
+    ]
+
+
+# ===== Report readers =====
+def read_deceased_report(connection, deceased_id, currencies):
+    columns = (
+        Deceased.id, Deceased.name, Deceased.national_id, Deceased.date_death,
+        Deceased.account_number, Deceased.archives_number,
+    )
+    stmt = select_with_balances(columns, DeceasedBalance, DeceasedBalance.deceased_id, Deceased.id, currencies)
+    rows = _split_balances(connection.execute(stmt.where(Deceased.id == deceased_id)), DeceasedReportRow, len(columns))
+    return rows[0] if rows else None
+
+
+def read_orphans_report(connection, currencies, *criteria):
+    """أيتام مع بيانات الوصي الأساسي وأرصدتهم، مرتبين بالمعرّف."""
+    primary_link = aliased(OrphanGuardian, name="primary_link")
+    columns = (
+        Orphan.id, Orphan.name, Orphan.national_id, Orphan.date_birth, Orphan.gender,
+        PrimaryGuardian.name, PrimaryGuardian.national_id, primary_link.start_date,
+    )
+    stmt = (
+        select_with_balances(columns, OrphanBalance, OrphanBalance.orphan_id, Orphan.id, currencies)
+        .outerjoin(PrimaryGuardian, PrimaryGuardian.id == Orphan.primary_guardian_id)
+        .outerjoin(primary_link, (primary_link.orphan_id == Orphan.id) & (primary_link.guardian_id == Orphan.primary_guardian_id))
+        .where(*criteria)
+        .order_by(Orphan.id)
+    )
+    return _split_balances(connection.execute(stmt), OrphanReportRow, len(columns))
+
+
+def read_guardian(connection, guardian_id):
+    row = connection.execute(guardian_list_select().where(Guardian.id == guardian_id)).first()
+    return GuardianRow._make(row) if row else None
+
+
+def read_guardian_orphans(connection, guardian_id, currencies):
+    """الأيتام المرتبطون بالوصي (حالياً وسابقاً) مع بيانات الرابط وأرصدة كل يتيم."""
+    columns = (
+        Orphan.id, Orphan.name, Orphan.national_id, OrphanGuardian.relation,
+        OrphanGuardian.start_date, OrphanGuardian.end_date, OrphanGuardian.is_primary,
+    )
+    stmt = (
+        select_with_balances(columns, OrphanBalance, OrphanBalance.orphan_id, Orphan.id, currencies)
+        .join(OrphanGuardian, OrphanGuardian.orphan_id == Orphan.id)
+        .where(OrphanGuardian.guardian_id == guardian_id)
+        .order_by(Orphan.id)
+    )
+    return _split_balances(connection.execute(stmt), GuardianOrphanRow, len(columns))
+
+
+def read_monthly_rollups(connection, month_from, month_to, currency_id=None):
+    """خانات الملخص الشهري من month_from إلى month_to (أول يوم في الشهر)، مرتبة بالشهر."""
+    R = MonthlyTransactionRollup
+    stmt = (
+        select(R.month, R.currency_id, R.entity_kind, R.type, R.total_amount, R.transactions_count)
+        .where(R.month >= month_from, R.month <= month_to)
+        .order_by(R.month, R.currency_id)
+    )
+    if currency_id is not None:
+        stmt = stmt.where(R.currency_id == currency_id)
+    return [
+        MonthlyRollupRow(month, cid, kind, txn_type, float(total or 0), count)
+        for month, cid, kind, txn_type, total, count in connection.execute(stmt)
+    ]
@@ -0,0 +1,161 @@
+"""
+ذاكرة مؤقتة على مستوى العملية للبيانات المرجعية (العملات، الأدوار، الصلاحيات).
+
+هذه الجداول صغيرة ونادرة التغيير لكنها تُقرأ في كل تقرير وجدول حركات ونافذة إضافة.
+تُحمَّل عند أول طلب بجلسة مستقلة وتُعاد كـ namedtuple غير مرتبطة بأي جلسة، فيمكن
+استخدامها من أي خيط أو جلسة. أي كتابة عبر ORM على Currency أو Role أو Permission أو
+RolePermission تُبطل النوع المعني بعد commit تلقائياً؛ ويمكن الإبطال يدوياً عبر
+invalidate() بعد تعديل مباشر بـ SQL. كل إبطال يرفع version، فيمكن للواجهات التي
+تبني قوائم منسدلة من هذه البيانات مقارنته لمعرفة متى تعيد البناء.
+"""
+import threading
+from collections import namedtuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import database.db as db_module
+from database.models import Currency, Permission, Role, RolePermission
+
+CurrencyRef = namedtuple("CurrencyRef", "id code name")
+RoleRef = namedtuple("RoleRef", "id name")
+PermissionRef = namedtuple("PermissionRef", "id resource action")
+
+CURRENCIES = "currencies"
+ROLES = "roles"
+PERMISSIONS = "permissions"
+
+_MODEL_KINDS = {
+    Currency: (CURRENCIES,),
+    Role: (ROLES,),
+    Permission: (PERMISSIONS,),
+    RolePermission: (ROLES, PERMISSIONS),
+}
+
+
+class ReferenceCache:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._data = {}
+        self._version = 0
+
+    @property
+    def version(self):
+        return self._version
+
+    def invalidate(self, *kinds):
+        """إبطال أنواع محددة (أو الكل إن لم تُحدد) ورفع رقم النسخة."""
+        with self._lock:
+            if kinds:
+                for kind in kinds:
+                    self._data.pop(kind, None)
+            else:
+                self._data.clear()
+            self._version += 1
+
+    # ===== Currencies =====
+    def currencies(self):
+        return self._get(CURRENCIES)["all"]
+
+    def currency_by_id(self, currency_id):
+        return self._get(CURRENCIES)["by_id"].get(currency_id)
+
+    def currency_by_code(self, code):
+        return self._get(CURRENCIES)["by_code"].get(code)
+
+    def currency_by_name(self, name):
+        return self._get(CURRENCIES)["by_name"].get(name)
+
+    def currency_code(self, currency_id):
+        currency = self.currency_by_id(currency_id)
+        return currency.code if currency else None
+
+    def currency_ids_by_code(self):
+        return {c.code: c.id for c in self.currencies()}
+
+    def currency_names(self):
+        return [c.name for c in self.currencies()]
+
+    # ===== Roles & permissions =====
+    def roles(self):
+        return self._get(ROLES)["all"]
+
+    def permissions(self):
+        return self._get(PERMISSIONS)["all"]
+
+    # ===== Internals =====
+    def _get(self, kind):
+        data = self._data.get(kind)
+        if data is not None:
+            return data
+        with self._lock:
+            data = self._data.get(kind)
+            if data is None:
+                data = self._load(kind)
+                self._data[kind] = data
+            return data
+
+    def _load(self, kind):
+        session_factory = db_module.SessionLocal
+        if session_factory is None:
+            # تهيئة القاعدة إن لم تكن مهيأة بعد (مثل DBService)
+            from services.db_services import DBService
+            DBService().close()
+            session_factory = db_module.SessionLocal
+        session = session_factory()
+        try:
+            if kind == CURRENCIES:
+                items = tuple(CurrencyRef(c.id, c.code, c.name) for c in session.query(Currency).order_by(Currency.id))
+                return {
+                    "all": items,
+                    "by_id": {c.id: c for c in items},
+                    "by_code": {c.code: c for c in items},
+                    "by_name": {c.name: c for c in items},
+                }
+            if kind == ROLES:
+                return {"all": tuple(RoleRef(r.id, r.name) for r in session.query(Role).order_by(Role.name))}
+            if kind == PERMISSIONS:
+                return {"all": tuple(
+                    PermissionRef(p.id, p.resource, p.action) for p in session.query(Permission).order_by(Permission.id)
+                )}
+            raise KeyError(kind)
+        finally:
+            session.close()
+
+
+reference_cache = ReferenceCache()
+
+
+# ===== Automatic invalidation on ORM writes =====
+_PENDING_KEY = "reference_cache_dirty"
+
+
+@event.listens_for(Session, "after_flush")
+def _track_reference_writes(session, flush_context):
+    kinds = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        kinds.update(_MODEL_KINDS.get(type(obj), ()))
+    if kinds:
+        session.info.setdefault(_PENDING_KEY, set()).update(kinds)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_reference_bulk_writes(orm_execute_state):
+    # query(...).update()/delete() لا تمر عبر flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        kinds = _MODEL_KINDS.get(mapper.class_, ()) if mapper is not None else ()
+        if kinds:
+            orm_execute_state.session.info.setdefault(_PENDING_KEY, set()).update(kinds)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    kinds = session.info.pop(_PENDING_KEY, None)
+    if kinds:
+        reference_cache.invalidate(*kinds)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,336 @@
+"""
+تصدير التقارير خارج خيط الواجهة.
+
+    job = submit_report(lambda db, path: reporting.build_report("orphan", 5, db, user), path)
+    job.progress.connect(bar_update)      # (نسبة، نص)
+    job.finished.connect(on_saved)        # مسار الملف
+    job.failed.connect(on_error)          # الاستثناء
+    job.cancel()                          # في أي مرحلة
+
+- بناء البيانات (استعلامات القاعدة، وكتابة Excel مباشرة) في خيط خلفي عبر query_executor.
+- تحويل PDF (Jinja + WeasyPrint) في عمليات عاملة منفصلة (report_renderer.worker_main)
+  تستقبل بيانات عادية فقط. العمليات يُعاد استخدامها بين التقارير (استيراد WeasyPrint مرة
+  واحدة)، ولا تعمل أكثر من MAX_WORKERS في الوقت نفسه، وتنتهي بعد MAX_JOBS_PER_WORKER
+  تقريراً أو WORKER_IDLE_TIMEOUT ثانية بلا عمل فتعود ذاكرة WeasyPrint إلى النظام بدل
+  أن تبقى في عملية الواجهة.
+- الإلغاء أثناء التحويل ينهي عملية العامل نفسها (لا يمكن مقاطعة write_pdf)؛ الملف يُكتب
+  باسم مؤقت ثم يُستبدل به المسار المطلوب، فلا يبقى ملف ناقص. Excel كذلك: يُكتب إلى
+  الاسم المؤقت ولا يُنقل إلى المسار المطلوب إذا أُلغي التصدير.
+- shutdown() يلغي ما ينتظر ويوقف العاملين عند الخروج من التطبيق؛ أول تقرير بعده
+  يعيد فتح المجمع (مثلاً بعد تسجيل خروج ودخول في نفس العملية).
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from services import report_renderer
+from services.query_executor import query_executor
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 2
+MAX_JOBS_PER_WORKER = 20
+WORKER_IDLE_TIMEOUT = 600
+BUILD_PROGRESS = 20   # نسبة التقدم المخصصة لبناء البيانات؛ الباقي للتحويل
+PART_SUFFIX = ".part"
+
+
+class ReportCancelled(Exception):
+    pass
+
+
+class ReportJob(QObject):
+    """تقرير واحد قيد التصدير؛ الإشارات تصل في خيط الواجهة."""
+    progress = pyqtSignal(int, str)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(object)
+    cancelled = pyqtSignal()
+
+    def __init__(self, output_path, metric=None, parent=None):
+        super().__init__(parent)
+        self.output_path = output_path
+        self.metric = metric
+        self.started_at = time.perf_counter()
+        self.done = False
+        self._ticket = None
+        self._worker = None
+        self._rendering = False
+        self._started = False
+        self._cancel_requested = False
+        self._saved = False   # ملف Excel نُقل إلى المسار المطلوب؛ الإلغاء بعده لا أثر له
+        self._lock = threading.Lock()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_requested
+
+    def cancel(self):
+        with self._lock:
+            if self.done or self._cancel_requested or self._saved:
+                return
+            self._cancel_requested = True
+        if not self._rendering:
+            # ما زال في خيط البناء: النتيجة لن تُسلَّم بعد إلغاء التذكرة
+            if self._ticket is not None:
+                self._ticket.cancel()
+            self._fail(ReportCancelled())
+            return
+        report_pool.cancel(self)
+
+    # ===== من المنفذ أو خيط العامل =====
+    def _save_part(self, part_path):
+        """نقل الملف المؤقت إلى المسار المطلوب ما لم يُلغَ التصدير (من خيط البناء)."""
+        with self._lock:
+            if self._cancel_requested:
+                _remove_part(part_path)
+                return
+            os.replace(part_path, self.output_path)
+            self._saved = True
+
+    def _finish(self, path):
+        if self.done:
+            return
+        self.done = True
+        if self.metric:
+            metrics.record(self.metric, self.started_at)
+        self.progress.emit(100, "تم")
+        self.finished.emit(path)
+
+    def _fail(self, error):
+        if self.done:
+            return
+        self.done = True
+        if isinstance(error, ReportCancelled):
+            self.cancelled.emit()
+            return
+        if self.metric:
+            metrics.error(self.metric)
+        self.failed.emit(error)
+
+
+def _part_path(output_path):
+    """report.xlsx -> report.part.xlsx؛ الامتداد يبقى آخر الاسم لأن openpyxl يرفض غيره."""
+    root, ext = os.path.splitext(output_path)
+    return root + PART_SUFFIX + ext
+
+
+def _remove_part(part_path):
+    if os.path.exists(part_path):
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=report_renderer.worker_main,
+            args=(child_conn, MAX_JOBS_PER_WORKER, WORKER_IDLE_TIMEOUT),
+            name="report-worker",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        self.idle_since = time.monotonic()
+
+    def reusable(self):
+        # هامش قبل مهلة الخمول حتى لا نرسل عملاً لعامل على وشك الخروج
+        return (
+            self.process.is_alive()
+            and self.jobs < MAX_JOBS_PER_WORKER
+            and time.monotonic() - self.idle_since < WORKER_IDLE_TIMEOUT - 30
+        )
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(2)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(2)
+        self.conn.close()
+
+
+class ReportPool:
+    """عمليات تحويل PDF قابلة لإعادة الاستخدام، بحد أقصى max_workers."""
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.max_workers = max_workers
+        # spawn على كل الأنظمة: عملية نظيفة بدون Qt أو اتصالات القاعدة الموروثة
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._idle = []
+        self._running = 0
+        self._pending = deque()   # (job, template_name, data)
+        self._closed = False
+
+    def render(self, job, template_name, data):
+        with self._lock:
+            self._closed = False
+            self._pending.append((job, template_name, data))
+            self._dispatch_locked()
+
+    def cancel(self, job):
+        with self._lock:
+            for entry in self._pending:
+                if entry[0] is job:
+                    self._pending.remove(entry)
+                    job._fail(ReportCancelled())
+                    return
+            worker = job._worker
+        if worker is not None:
+            # خيط التقرير يرى انقطاع الاتصال ويعلن الإلغاء
+            worker.kill()
+
+    def prewarm(self):
+        """تشغيل عامل واحد مسبقاً (استيراد WeasyPrint) إن لم يكن هناك عامل."""
+        with self._lock:
+            self._closed = False
+            if self._idle or self._running:
+                return
+            self._running += 1
+        threading.Thread(target=self._start_idle_worker, name="report-pool-prewarm", daemon=True).start()
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            pending, self._pending = list(self._pending), deque()
+            idle, self._idle = self._idle, []
+        for job, _, _ in pending:
+            job._fail(ReportCancelled())
+        for worker in idle:
+            worker.stop()
+
+    def _start_idle_worker(self):
+        try:
+            worker = _Worker(self._context)
+        except Exception as e:
+            logger.warning(f"Could not start report worker: {e}")
+            worker = None
+        with self._lock:
+            self._running -= 1
+            if worker is not None:
+                self._idle.append(worker)
+            self._dispatch_locked()
+
+    def _take_idle_locked(self):
+        while self._idle:
+            worker = self._idle.pop()
+            if worker.reusable():
+                return worker
+            threading.Thread(target=worker.stop, daemon=True).start()
+        return None
+
+    def _dispatch_locked(self):
+        while self._pending and not self._closed and (self._idle or self._running < self.max_workers):
+            job, template_name, data = self._pending.popleft()
+            worker = self._take_idle_locked()
+            if worker is None and self._running >= self.max_workers:
+                self._pending.appendleft((job, template_name, data))
+                return
+            self._running += 1
+            threading.Thread(
+                target=self._run, args=(job, worker, template_name, data), name="report-pool-job", daemon=True
+            ).start()
+
+    def _run(self, job, worker, template_name, data):
+        part_path = _part_path(job.output_path)
+        try:
+            for attempt in range(2):
+                if worker is None:
+                    worker = _Worker(self._context)
+                job._worker = worker
+                try:
+                    kind, result = self._render_on(worker, job, (template_name, data, part_path))
+                except (EOFError, OSError):
+                    worker.kill()
+                    if job.cancel_requested:
+                        raise ReportCancelled()
+                    if attempt or job._started:
+                        raise RuntimeError("توقفت عملية تحويل التقرير بشكل غير متوقع")
+                    # خرج العامل (مهلة الخمول) قبل أن يبدأ هذا التقرير: نعيد المحاولة مرة
+                    worker = None
+                    continue
+                break
+            if kind == "error":
+                raise result
+            os.replace(result, job.output_path)
+            job._finish(job.output_path)
+        except Exception as e:
+            job._fail(e)
+        finally:
+            job._worker = None
+            _remove_part(part_path)
+            with self._lock:
+                self._running -= 1
+                if worker is not None and worker.process.is_alive() and not self._closed:
+                    worker.jobs += 1
+                    worker.idle_since = time.monotonic()
+                    self._idle.append(worker)
+                elif worker is not None:
+                    threading.Thread(target=worker.kill, daemon=True).start()
+                self._dispatch_locked()
+
+    @staticmethod
+    def _render_on(worker, job, message):
+        """("done", المسار) أو ("error", الاستثناء من العامل)؛ انقطاع الاتصال يرفع EOFError/OSError."""
+        job._started = False
+        worker.conn.send(message)
+        while True:
+            kind, *payload = worker.conn.recv()
+            job._started = True
+            if kind == "progress":
+                percent, text = payload
+                job.progress.emit(BUILD_PROGRESS + percent * (100 - BUILD_PROGRESS) // 100, text)
+            else:
+                return kind, payload[0]
+
+
+report_pool = ReportPool()
+
+
+def submit_report(build, output_path, metric=None):
+    """
+    build(db_service, path) تعمل في خيط خلفي وتعيد (القالب، البيانات) لتحويلها إلى PDF
+    في عملية عاملة، أو None إذا كتبت الملف بنفسها (Excel) إلى path، وهو اسم مؤقت يُنقل
+    إلى output_path بعد انتهاء الكتابة إن لم يُلغَ التصدير. يُستدعى من خيط الواجهة.
+    """
+    job = ReportJob(output_path, metric)
+    part_path = _part_path(output_path)
+
+    def run_build(db):
+        try:
+            payload = build(db, part_path)
+            if payload is None:
+                job._save_part(part_path)
+        except BaseException:
+            _remove_part(part_path)
+            raise
+        return payload
+
+    def on_built(payload):
+        if job.cancel_requested:
+            return
+        if payload is None:
+            job._finish(output_path)
+            return
+        job._rendering = True
+        job.progress.emit(BUILD_PROGRESS, "بانتظار عملية التحويل")
+        report_pool.render(job, *payload)
+
+    job._ticket = query_executor.submit(run_build, on_result=on_built, on_error=job._fail)
+    return job
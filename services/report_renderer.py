@@ -0,0 +1,92 @@
+"""
+تحويل قوالب التقارير (templates/) إلى PDF.
+
+تُستخدم في عملية التطبيق نفسها (services.reporting) وفي عمليات عاملي التقارير
+(services/report_pool.py، worker_main)، لذلك لا تستورد Qt ولا قاعدة البيانات: العامل
+يستقبل بيانات جاهزة (قواميس وقوائم ونصوص) من دوال البناء في services.reporting
+ويعيد مسار الملف فقط.
+"""
+import os
+
+from jinja2 import Environment, FileSystemLoader
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_PATH = os.path.join(PROJECT_ROOT, "templates")
+
+env = Environment(loader=FileSystemLoader(TEMPLATE_PATH))
+
+_backend = None
+
+
+def pdf_backend():
+    """
+    ("weasy", HTML) أو ("pdfkit", pdfkit). يُستورد عند أول تحويل فقط، فلا تُحمَّل
+    WeasyPrint في عملية الواجهة ما دام التحويل يجري في العاملين.
+    """
+    global _backend
+    if _backend is None:
+        # المكتبات المطلوبة لدعم العربية والـ PDF
+        try:
+            from weasyprint import HTML
+            _backend = ("weasy", HTML)
+        except Exception:
+            import pdfkit
+            _backend = ("pdfkit", pdfkit)
+    return _backend
+
+
+def _no_progress(percent, message):
+    pass
+
+
+def render_pdf(template_name, data, output_path, progress=_no_progress):
+    """
+    كتابة القالب template_name بالبيانات data إلى output_path. progress(نسبة، نص)
+    تُستدعى بين المراحل (القالب، تنسيق الصفحات، الكتابة).
+    """
+    renderer, backend = pdf_backend()
+    progress(5, "تجهيز القالب")
+    html_content = env.get_template(template_name).render(**data)
+    if renderer == "weasy":
+        progress(20, "تنسيق الصفحات")
+        document = backend(string=html_content).render()
+        progress(75, f"كتابة {len(document.pages)} صفحة")
+        document.write_pdf(output_path)
+    else:
+        progress(20, "تحويل إلى PDF")
+        backend.from_string(html_content, output_path)
+    progress(100, "تم")
+    return output_path
+
+
+def worker_main(conn, max_jobs, idle_timeout):
+    """
+    حلقة عملية العامل: تستقبل (القالب، البيانات، المسار) وترسل ("progress", نسبة، نص)
+    ثم ("done", المسار) أو ("error", استثناء). تنتهي بعد max_jobs تقريراً أو idle_timeout
+    ثانية بلا عمل، فتعود ذاكرة WeasyPrint إلى النظام.
+    """
+    try:
+        pdf_backend()  # الاستيراد عند بدء العامل (prewarm) لا عند أول تقرير
+    except Exception:
+        pass  # الخطأ نفسه يُعاد إرساله مع أول تقرير
+    for _ in range(max_jobs):
+        try:
+            if not conn.poll(idle_timeout):
+                break
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        template_name, data, output_path = job
+        try:
+            render_pdf(template_name, data, output_path, lambda percent, message: conn.send(("progress", percent, message)))
+        except Exception as e:
+            try:
+                conn.send(("error", e))
+            except Exception:
+                # استثناء لا يمكن نقله بين العمليات
+                conn.send(("error", RuntimeError(str(e))))
+        else:
+            conn.send(("done", output_path))
+    conn.close()
@@ -1,15 +1,15 @@
 import os
 from datetime import date, datetime
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
 from decimal import Decimal
 import pandas as pd
 from openpyxl.styles import Alignment, Font, PatternFill
 
 from utils import calculate_age
+from services.analytics import SERIES_LABELS, load_monthly_analytics
 from services.db_services import DBService
+from services.reference_cache import reference_cache
 from database.models import (
-    Currency,
     Deceased,
     DeceasedBalance,
     DeceasedTransaction,
@@ -19,20 +19,10 @@ from database.models import (
     TransactionTypeEnum,
 )
 
-# المكتبات المطلوبة لدعم العربية والـ PDF
-try:
-    from weasyprint import HTML
-    RENDERER = "weasy"
-except Exception:
-    import pdfkit
-    RENDERER = "pdfkit"
-
-# مسار جذر المشروع
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-TEMPLATE_PATH = os.path.join(PROJECT_ROOT, "templates")
-ASSETS_IMAGES = Path(os.path.join(PROJECT_ROOT, "assets", "images")).resolve()
+# القوالب وتحويل PDF في وحدة مستقلة تعمل أيضاً في عمليات العاملين (services/report_pool.py)
+from services.report_renderer import PROJECT_ROOT, render_pdf
 
-env = Environment(loader=FileSystemLoader(TEMPLATE_PATH))
+ASSETS_IMAGES = Path(os.path.join(PROJECT_ROOT, "assets", "images")).resolve()
 
 logo_path = (ASSETS_IMAGES / "logo.png").as_uri() if (ASSETS_IMAGES / "logo.png").exists() else None
 ps_logo_path = (ASSETS_IMAGES / "ps_logo.png").as_uri() if (ASSETS_IMAGES / "ps_logo.png").exists() else None
@@ -54,8 +44,9 @@ def _build_full_balances(balances, all_currencies):
     """Return list of balances for all currencies (include 0.0 for missing)."""
     bal_map = {}
     for b in balances:
-        cur = getattr(b, 'currency', None)
-        cid = getattr(cur, 'id', None) if cur is not None else getattr(b, 'currency_id', None)
+        cid = getattr(b, 'currency_id', None)
+        if cid is None:
+            cid = getattr(getattr(b, 'currency', None), 'id', None)
         try:
             bal_map[int(cid)] = float(b.balance)
         except Exception:
@@ -70,6 +61,14 @@ def _build_full_balances(balances, all_currencies):
     return result
 
 
+def _pivoted_balances(amounts, all_currencies):
+    """مثل _build_full_balances لأرصدة صف من read_models (مبلغ لكل عملة بنفس الترتيب)."""
+    return [
+        {"currency": getattr(curr, 'name', None) or getattr(curr, 'code', str(curr.id)), "amount": amt}
+        for curr, amt in zip(all_currencies, amounts)
+    ]
+
+
 def fetch_entity_data(entity_type: str, entity_id: int, db_service: DBService, user):
     common = {
         "generated_at": datetime.now().strftime("%Y/%m/%d %H:%M"),
@@ -130,24 +129,21 @@ def fetch_entity_data(entity_type: str, entity_id: int, db_service: DBService, u
 
 
 def fetch_deceased_report_data(deceased_id: int, db_service: DBService, user):
-    deceased, orphans, _ = db_service.get_deceased_details(deceased_id)
+    deceased, orphans = db_service.get_deceased_report_rows(deceased_id)
     if not deceased: return None
 
     all_currencies = db_service.get_currencies()
-    current_balances = {b.currency_id: float(b.balance) for b in deceased.balances}
-    full_balances_list = [{"currency_name": curr.name, "currency_code": curr.code, "balance": current_balances.get(curr.id, 0.0)} for curr in all_currencies]
+    full_balances_list = [{"currency_name": curr.name, "currency_code": curr.code, "balance": amt} for curr, amt in zip(all_currencies, deceased.balances)]
 
     orphans_list = []
     for o in orphans:
-        primary_link = next((link for link in o.guardian_links if link.is_primary), None)
-        guardian = primary_link.guardian if primary_link else None
         orphans_list.append({
             "name": o.name, "national_id": o.national_id or "---",
             "birth_date": o.date_birth.strftime("%Y/%m/%d") if o.date_birth else "---",
-            "guardian_name": guardian.name if guardian else "غير محدد", 
-            "guardian_nid": guardian.national_id or "---" if guardian else "---",
-            "guardian_start_date": primary_link.start_date.strftime("%Y/%m/%d") if primary_link and primary_link.start_date else "---",
-            "balances": _build_full_balances(o.balances, all_currencies)
+            "guardian_name": o.guardian_name or "غير محدد",
+            "guardian_nid": o.guardian_national_id or "---",
+            "guardian_start_date": o.guardian_start_date.strftime("%Y/%m/%d") if o.guardian_start_date else "---",
+            "balances": _pivoted_balances(o.balances, all_currencies)
         })
 
     return {
@@ -162,22 +158,18 @@ def fetch_deceased_report_data(deceased_id: int, db_service: DBService, user):
 
 
 def fetch_guardian_report_data(guardian_id: int, db_service: DBService, user):
-    guardian, orphans_data = db_service.get_guardian_details(guardian_id)
+    guardian, orphans_data = db_service.get_guardian_report_rows(guardian_id)
     if not guardian: return None
 
-    orphans_under_care = []
-    for orphan in orphans_data:
-        link = next((l for l in orphan.guardian_links if l.guardian_id == guardian_id), None)
-        if link:
-            all_currencies = db_service.get_currencies()
-            orphans_under_care.append({
-                "name": orphan.name, "national_id": orphan.national_id or "---",
-                "relation": link.relation if link else "غير محدد",
-                "start_date": link.start_date.strftime("%Y/%m/%d") if link.start_date else "---",
-                "end_date": link.end_date.strftime("%Y/%m/%d") if link.end_date else "مستمر",
-                "balances": _build_full_balances(orphan.balances, all_currencies),
-                "is_primary": 'نعم' if link.is_primary else 'لا',
-            })
+    all_currencies = db_service.get_currencies()
+    orphans_under_care = [{
+        "name": link.name, "national_id": link.national_id or "---",
+        "relation": link.relation,
+        "start_date": link.start_date.strftime("%Y/%m/%d") if link.start_date else "---",
+        "end_date": link.end_date.strftime("%Y/%m/%d") if link.end_date else "مستمر",
+        "balances": _pivoted_balances(link.balances, all_currencies),
+        "is_primary": 'نعم' if link.is_primary else 'لا',
+    } for link in orphans_data]
 
     return {
         "generated_at": datetime.now().strftime("%Y/%m/%d %H:%M"),
@@ -193,37 +185,43 @@ def fetch_guardian_report_data(guardian_id: int, db_service: DBService, user):
 def fetch_monthly_orphans_report(from_date_str, to_date_str, db_service, current_user):
     from_date = datetime.strptime(from_date_str, "%Y-%m-%d")
     to_date = datetime.strptime(to_date_str, "%Y-%m-%d")
-    orphans = db_service.get_orphans_by_date_range(from_date, to_date)
+    orphans = db_service.get_orphan_report_rows_by_date_range(from_date, to_date)
     all_currencies = db_service.get_currencies()
     return {
         "from_date": from_date_str, "to_date": to_date_str,
         "generated_at": datetime.now().strftime("%Y/%m/%d %H:%M"),
-        "orphans": [{"name": o.name, "national_id": o.national_id or "---", "balances": _build_full_balances(o.balances, all_currencies)} for o in orphans],
+        "orphans": [{"name": o.name, "national_id": o.national_id or "---", "balances": _pivoted_balances(o.balances, all_currencies)} for o in orphans],
         "total_count": len(orphans),
         "exported_by": current_user
     }
 
 
 def generate_monthly_report(from_date_str, to_date_str, output_path, db_service, current_user_name, file_format="pdf"):
+    payload = build_monthly_report(from_date_str, to_date_str, output_path, db_service, current_user_name, file_format)
+    if payload is not None:
+        render_pdf(*payload, output_path)
+    return True
+
+
+def build_monthly_report(from_date_str, to_date_str, output_path, db_service, current_user_name, file_format="pdf"):
+    """(القالب، البيانات) لتقرير PDF، أو يكتب ملف Excel مباشرة ويعيد None."""
     try:
         start_dt = datetime.strptime(from_date_str, "%Y-%m-%d")
         end_dt = datetime.strptime(to_date_str, "%Y-%m-%d")
-        orphans = db_service.get_orphans_by_date_range(start_dt, end_dt)
+        orphans = db_service.get_orphan_report_rows_by_date_range(start_dt, end_dt)
         if not orphans:
             raise ValueError("لا توجد سجلات أيتام في هذه الفترة.")
 
         data_orphans = []
         all_currencies = db_service.get_currencies()
         for o in orphans:
-            primary_link = next((link for link in o.guardian_links if link.is_primary), None)
-            guardian_name = primary_link.guardian.name if primary_link else "غير محدد"
             data_orphans.append({
                 "name": o.name, "national_id": o.national_id or "---",
                 "birth_date": o.date_birth.strftime("%Y/%m/%d") if o.date_birth else "---",
                 "gender": "ذكر" if o.gender.name == "male" else "أنثى",
                 "age": calculate_age(o.date_birth) if o.date_birth else "---",
-                "guardian": guardian_name,
-                "balances": _build_full_balances(o.balances, all_currencies)
+                "guardian": o.guardian_name or "غير محدد",
+                "balances": _pivoted_balances(o.balances, all_currencies)
             })
 
         data = {
@@ -237,21 +235,14 @@ def generate_monthly_report(from_date_str, to_date_str, output_path, db_service,
         }
 
         if file_format == "pdf":
-            return _export_as_pdf(data, output_path)
-        else:
-            return _export_as_excel(data, output_path)
+            return "monthly_report.html", data
+        _export_as_excel(data, output_path)
+        return None
     except Exception as e:
         print(f"Error in generation: {e}")
         raise e
 
 
-def _export_as_pdf(data, output_path):
-    template = env.get_template("monthly_report.html")
-    html_content = template.render(**data)
-    HTML(string=html_content).write_pdf(output_path)
-    return True
-
-
 def _export_as_excel(data, output_path):
     excel_data = []
     for i, o in enumerate(data['orphans'], 1):
@@ -290,7 +281,7 @@ def _build_financial_table_report_data(deceased_id: int, currency_id: int, db_se
     if not currency_id:
         raise ValueError("يرجى اختيار العملة قبل تصدير التقرير.")
 
-    currency = db.query(Currency).filter_by(id=currency_id).first()
+    currency = reference_cache.currency_by_id(currency_id)
     currency_label = f"{currency.name} ({currency.code})" if currency else str(currency_id)
 
     orphans = list(deceased.orphans or [])
@@ -500,6 +491,36 @@ def _export_financial_table_excel(data, output_path):
     return True
 
 
+def generate_monthly_analytics_report(month_from, month_to, output_path: str, db_service: DBService):
+    """Excel بورقة لكل عملة: صف لكل شهر بمجموع كل سلسلة وعدد حركاتها (services/analytics)."""
+    currencies = db_service.get_currencies()
+    data = load_monthly_analytics(db_service, month_from, month_to, currencies)
+
+    header_fill = PatternFill(start_color="1A2A6C", end_color="1A2A6C", fill_type="solid")
+    header_font = Font(color="FFFFFF", bold=True)
+    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+        for currency in currencies:
+            records = []
+            for month in data[currency.id]:
+                record = {"الشهر": month.month.strftime("%Y-%m")}
+                for label, total, count in zip(SERIES_LABELS, month.totals, month.counts):
+                    record[label] = round(total, 2)
+                    record[f"عدد {label}"] = count
+                records.append(record)
+            sheet_name = currency.name[:31]
+            pd.DataFrame(records).to_excel(writer, index=False, sheet_name=sheet_name)
+
+            ws = writer.sheets[sheet_name]
+            ws.sheet_view.rightToLeft = True
+            for cell in ws[1]:
+                cell.fill = header_fill
+                cell.font = header_font
+                cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+            for col in ws.columns:
+                ws.column_dimensions[col[0].column_letter].width = 16
+    return True
+
+
 def generate_financial_table_report(
     deceased_id: int,
     currency_id: int,
@@ -508,6 +529,21 @@ def generate_financial_table_report(
     exported_by: str,
     file_format: str = "pdf",
 ):
+    payload = build_financial_table_report(deceased_id, currency_id, output_path, db_service, exported_by, file_format)
+    if payload is not None:
+        render_pdf(*payload, output_path)
+    return True
+
+
+def build_financial_table_report(
+    deceased_id: int,
+    currency_id: int,
+    output_path: str,
+    db_service: DBService,
+    exported_by: str,
+    file_format: str = "pdf",
+):
+    """(القالب، البيانات) لتقرير PDF، أو يكتب ملف Excel مباشرة ويعيد None."""
     data = _build_financial_table_report_data(
         deceased_id=deceased_id,
         currency_id=currency_id,
@@ -516,41 +552,34 @@ def generate_financial_table_report(
     )
 
     if str(file_format).lower() == "excel":
-        return _export_financial_table_excel(data, output_path)
-
-    template = env.get_template("financial_table_report.html")
-    html_content = template.render(**data)
-    if RENDERER == "weasy":
-        HTML(string=html_content).write_pdf(output_path)
-    else:
-        pdfkit.from_string(html_content, output_path)
-    return True
+        _export_financial_table_excel(data, output_path)
+        return None
+    return "financial_table_report.html", data
 
 
 def generate_report(entity_type: str, entity_id: int, output_path: str, user):
     db = DBService()
     try:
-        if entity_type == "deceased":
-            data = fetch_deceased_report_data(entity_id, db, user)
-            template_name = "deceased_report.html"
-        elif entity_type == "orphan":
-            data = fetch_entity_data("orphan", entity_id, db, user)
-            template_name = "orphan_report.html"
-        elif entity_type == "guardian":
-            data = fetch_guardian_report_data(entity_id, db, user)
-            template_name = "guardian_report.html"
-        else:
-            raise ValueError("نوع التقرير غير مدعوم حالياً")
-
-        if not data:
-            raise Exception("لم يتم العثور على بيانات للسجل المطلوب")
-
-        template = env.get_template(template_name)
-        html_content = template.render(**data)
-        if RENDERER == "weasy":
-            HTML(string=html_content).write_pdf(output_path)
-        else:
-            pdfkit.from_string(html_content, output_path)
+        render_pdf(*build_report(entity_type, entity_id, db, user), output_path)
         return output_path
     finally:
         db.close()
+
+
+def build_report(entity_type: str, entity_id: int, db_service: DBService, user):
+    """(القالب، البيانات) لتقرير يتيم أو وصي أو متوفى."""
+    if entity_type == "deceased":
+        data = fetch_deceased_report_data(entity_id, db_service, user)
+        template_name = "deceased_report.html"
+    elif entity_type == "orphan":
+        data = fetch_entity_data("orphan", entity_id, db_service, user)
+        template_name = "orphan_report.html"
+    elif entity_type == "guardian":
+        data = fetch_guardian_report_data(entity_id, db_service, user)
+        template_name = "guardian_report.html"
+    else:
+        raise ValueError("نوع التقرير غير مدعوم حالياً")
+
+    if not data:
+        raise Exception("لم يتم العثور على بيانات للسجل المطلوب")
+    return template_name, data
@@ -0,0 +1,120 @@
+"""
+واجهة خفيفة لنظام التقارير.
+
+services.reporting يستورد pandas و openpyxl و Jinja و WeasyPrint/pdfkit ويبني بيئة
+القوالب عند تحميله، وهذه من أثقل الاستيرادات في التطبيق ولا يحتاجها إلا التصدير.
+هذه الوحدة تؤجل استيراده إلى أول استدعاء لإحدى دوال التصدير، ويمكن تسخينه مسبقاً
+في خيط خلفي (prewarm_reporting) بعد تسجيل الدخول حتى لا ينتظر المستخدم أول تصدير.
+دوال submit_* تصدّر دون حجز الواجهة وتحوّل PDF في عمليات منفصلة (services/report_pool.py).
+"""
+import importlib
+import logging
+import threading
+from types import SimpleNamespace
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_REPORTING_MODULE = "services.reporting"
+_lock = threading.Lock()
+_module = None
+_prewarm_thread = None
+
+
+def _reporting():
+    global _module
+    if _module is None:
+        with _lock:
+            if _module is None:
+                _module = importlib.import_module(_REPORTING_MODULE)
+    return _module
+
+
+def is_reporting_loaded():
+    return _module is not None
+
+
+def prewarm_reporting():
+    """بدء استيراد نظام التقارير في خيط خلفي إن لم يكن محملاً (لا ينتظر ولا يرفع أخطاء)."""
+    global _prewarm_thread
+    if _module is not None or (_prewarm_thread is not None and _prewarm_thread.is_alive()):
+        return
+    _prewarm_thread = threading.Thread(target=_prewarm, name="reporting-prewarm", daemon=True)
+    _prewarm_thread.start()
+
+
+def _prewarm():
+    try:
+        _reporting()
+        from services.report_pool import report_pool
+        report_pool.prewarm()
+    except Exception as e:
+        # الخطأ الحقيقي سيظهر للمستخدم عند أول تصدير
+        logger.warning(f"Could not preload reporting: {e}")
+
+
+# ===== Facade =====
+# زمن التصدير يشمل استيراد نظام التقارير إن لم يكن قد سُخّن بعد، فهو ما ينتظره المستخدم فعلاً
+@metrics.timed("report_entity")
+def generate_report(entity_type, entity_id, output_path, user):
+    return _reporting().generate_report(entity_type, entity_id, output_path, user)
+
+
+@metrics.timed("report_financial_table")
+def generate_financial_table_report(deceased_id, currency_id, output_path, db_service, exported_by, file_format="pdf"):
+    return _reporting().generate_financial_table_report(
+        deceased_id=deceased_id,
+        currency_id=currency_id,
+        output_path=output_path,
+        db_service=db_service,
+        exported_by=exported_by,
+        file_format=file_format,
+    )
+
+
+@metrics.timed("report_monthly")
+def generate_monthly_report(from_date_str, to_date_str, output_path, db_service, current_user_name, file_format="pdf"):
+    return _reporting().generate_monthly_report(
+        from_date_str, to_date_str, output_path, db_service, current_user_name, file_format
+    )
+
+
+@metrics.timed("report_monthly_analytics")
+def generate_monthly_analytics_report(month_from, month_to, output_path, db_service):
+    return _reporting().generate_monthly_analytics_report(month_from, month_to, output_path, db_service)
+
+
+# ===== Background export (services/report_pool) =====
+# بناء البيانات في خيط خلفي وتحويل PDF في عملية عاملة؛ تعيد ReportJob بإشارات التقدم والنتيجة
+def submit_report(entity_type, entity_id, output_path, exported_by):
+    from services.report_pool import submit_report as submit
+    # كائن المستخدم مرتبط بجلسة الواجهة؛ خيط البناء لا يحتاج منه إلا الاسم
+    user = SimpleNamespace(name=exported_by)
+    return submit(
+        lambda db, path: _reporting().build_report(entity_type, entity_id, db, user),
+        output_path,
+        metric="report_entity",
+    )
+
+
+def submit_financial_table_report(deceased_id, currency_id, output_path, exported_by, file_format="pdf"):
+    from services.report_pool import submit_report as submit
+    return submit(
+        lambda db, path: _reporting().build_financial_table_report(
+            deceased_id, currency_id, path, db, exported_by, file_format
+        ),
+        output_path,
+        metric="report_financial_table",
+    )
+
+
+def submit_monthly_report(from_date_str, to_date_str, output_path, current_user_name, file_format="pdf"):
+    from services.report_pool import submit_report as submit
+    return submit(
+        lambda db, path: _reporting().build_monthly_report(
+            from_date_str, to_date_str, path, db, current_user_name, file_format
+        ),
+        output_path,
+        metric="report_monthly",
+    )
@@ -0,0 +1,129 @@
+"""
+استعلامات DBService الساخنة كعبارات select() مبنية مرة واحدة عند استيراد الوحدة.
+
+بناء session.query(...) في كل استدعاء يعيد إنشاء شجرة التعبير ومفتاح ذاكرة
+التجميع وسياق ORM، حتى لو وُجد SQL المجمَّع في ذاكرة المحرك. هنا تُبنى العبارة مرة
+واحدة بمعاملات مسماة (bindparam) وتُمرر القيم عند التنفيذ فقط:
+
+    session.scalars(statements.SEARCH_GUARDIAN, {"pattern": "%نص%"}).all()
+
+فيُحسب مفتاح التخزين مرة واحدة لكل عبارة ويُعاد استخدام SQL المجمَّع طوال عمر
+العملية. العبارات لا ترتبط بجلسة، فتصلح لأي خيط أو جلسة.
+"""
+from sqlalchemy import Date, Numeric, bindparam, case, exists, func, literal, null, or_, select, type_coerce, union_all
+from sqlalchemy.orm import joinedload, selectinload
+
+from database.models import (
+    Currency, Deceased, DeceasedBalance, DeceasedTransaction, Guardian, GuardianBalance, GuardianTransaction,
+    Orphan, OrphanBalance, OrphanGuardian, Transaction, TransactionTypeEnum,
+)
+
+SEARCH_LIMIT = 20
+
+
+# ===== Search (pattern = "%text%") =====
+def _search(model, *criteria):
+    pattern = bindparam("pattern")
+    return (
+        select(model)
+        .where(*criteria, or_(model.national_id.ilike(pattern), model.name.ilike(pattern)))
+        .limit(SEARCH_LIMIT)
+    )
+
+
+SEARCH_GUARDIAN = _search(Guardian)
+SEARCH_DECEASED = _search(Deceased)
+SEARCH_ORPHAN_ALL = _search(Orphan)
+SEARCH_ORPHAN_UNLINKED = _search(Orphan, Orphan.deceased_id.is_(None))
+SEARCH_ORPHAN_LINKED = _search(Orphan, Orphan.deceased_id.is_not(None))
+
+
+# ===== Existence by name (name) =====
+def _exists_by_name(model):
+    return select(exists().where(model.name == bindparam("name")))
+
+
+ORPHAN_EXISTS = _exists_by_name(Orphan)
+DECEASED_EXISTS = _exists_by_name(Deceased)
+GUARDIAN_EXISTS = _exists_by_name(Guardian)
+
+
+# ===== Details (orphan_id) =====
+ORPHAN_DETAILS = (
+    select(Orphan)
+    .options(
+        joinedload(Orphan.deceased),
+        selectinload(Orphan.guardian_links).joinedload(OrphanGuardian.guardian),
+        selectinload(Orphan.balances).joinedload(OrphanBalance.currency),
+    )
+    .where(Orphan.id == bindparam("orphan_id"))
+)
+
+
+# ===== Balance (deceased_id, currency_code) =====
+DECEASED_BALANCE = (
+    select(DeceasedBalance.balance)
+    .join(Currency, Currency.id == DeceasedBalance.currency_id)
+    .where(DeceasedBalance.deceased_id == bindparam("deceased_id"), Currency.code == bindparam("currency_code"))
+)
+
+
+# ===== Summaries (owner_id) =====
+def _summary(transaction_model, transaction_owner, balance_model, balance_owner):
+    """
+    لكل عملة: مجموع الإيداعات والسحوبات من جدول الحركات والرصيد الحالي، كصفوف
+    (name, deposited, withdrawn, available).
+    """
+    owner_id = bindparam("owner_id")
+    transactions = (
+        select(
+            transaction_model.currency_id,
+            func.sum(case((transaction_model.type == TransactionTypeEnum.deposit, transaction_model.amount), else_=0)).label('total_deposit'),
+            func.sum(case((transaction_model.type == TransactionTypeEnum.withdraw, transaction_model.amount), else_=0)).label('total_withdraw'),
+        )
+        .where(transaction_owner == owner_id)
+        .group_by(transaction_model.currency_id)
+        .subquery()
+    )
+    return (
+        select(
+            Currency.name,
+            func.coalesce(transactions.c.total_deposit, 0).label('deposited'),
+            func.coalesce(transactions.c.total_withdraw, 0).label('withdrawn'),
+            func.coalesce(balance_model.balance, 0).label('available'),
+        )
+        .outerjoin(balance_model, (balance_model.currency_id == Currency.id) & (balance_owner == owner_id))
+        .outerjoin(transactions, transactions.c.currency_id == Currency.id)
+    )
+
+
+DECEASED_SUMMARY = _summary(DeceasedTransaction, DeceasedTransaction.deceased_id, DeceasedBalance, DeceasedBalance.deceased_id)
+ORPHAN_SUMMARY = _summary(Transaction, Transaction.orphan_id, OrphanBalance, OrphanBalance.orphan_id)
+GUARDIAN_SUMMARY = _summary(GuardianTransaction, GuardianTransaction.guardian_id, GuardianBalance, GuardianBalance.guardian_id)
+
+
+# ===== Dashboard summary (cutoff = تاريخ ميلاد من بلغ 18 اليوم) =====
+def _count(metric, model, *criteria):
+    # نوع عمود value في UNION يؤخذ من أول select؛ Numeric حتى تُقرأ المجاميع كأرصدة بمنزلتين
+    return select(
+        literal(metric).label("metric"), null().label("currency_id"),
+        type_coerce(func.count(model.id), Numeric(15, 2)).label("value"),
+    ).where(*criteria)
+
+
+def _balance_totals(metric, balance_model):
+    return select(
+        literal(metric), balance_model.currency_id, func.sum(balance_model.balance),
+    ).group_by(balance_model.currency_id)
+
+
+# صفوف (metric, currency_id, value): الأعداد بـ currency_id = NULL ثم مجموع كل جدول أرصدة لكل عملة
+DASHBOARD_SUMMARY = union_all(
+    _count("orphans", Orphan),
+    _count("orphans_over_18", Orphan, Orphan.date_birth.is_not(None), Orphan.date_birth <= bindparam("cutoff", type_=Date)),
+    _count("guardians", Guardian),
+    _count("deceased", Deceased),
+    _balance_totals("deceased", DeceasedBalance),
+    _balance_totals("orphans", OrphanBalance),
+    _balance_totals("guardians", GuardianBalance),
+)
@@ -0,0 +1,134 @@
+"""
+كاتب سجل النشاطات في الخلفية.
+
+log_activity لا تلمس جلسة المستدعي: تضع السجل في طابور داخل الذاكرة وتعود فوراً،
+فلا تضيف commit إلى عملية المستخدم ولا تحفظ تغييرات معلقة لا علاقة لها بالسجل.
+خيط خلفي بجلسة مستقلة يكتب السجلات دفعات (إدخال جماعي واحد لكل دفعة) عندما يبلغ
+الطابور FLUSH_BATCH_SIZE أو بعد FLUSH_INTERVAL_S ثانية من أول سجل منتظر.
+
+- flush(): كتابة ما في الطابور وانتظار انتهائها (قبل عرض سجل النشاطات مثلاً).
+- shutdown(): كتابة الباقي وإيقاف الخيط؛ يُستدعى عند إنهاء التطبيق (aboutToQuit)،
+  ومسجل في atexit احتياطاً لغير ذلك من طرق الخروج. أول سجل بعده يعيد تشغيل الخيط.
+created_at يُسجل لحظة الإضافة إلى الطابور لا لحظة الكتابة. الدفعة التي تفشل
+كتابتها تُسجل في logger وتُهمل كما كان يحدث للسجل الفاشل سابقاً.
+"""
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+
+import database.db as db_module
+from database.models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 50
+FLUSH_INTERVAL_S = 2.0
+MAX_PENDING = 10_000
+
+
+class ActivityLogWriter:
+    def __init__(self, batch_size=FLUSH_BATCH_SIZE, interval_s=FLUSH_INTERVAL_S):
+        self.batch_size = batch_size
+        self.interval_s = interval_s
+        self._pending = []
+        self._condition = threading.Condition()
+        self._written = 0       # عدد السجلات التي انتهت محاولة كتابتها (نجحت أو أُهملت)
+        self._queued = 0        # عدد السجلات التي أُضيفت إلى الطابور منذ البداية
+        self._flush_target = 0  # flush() ينتظر حتى يبلغ _written هذا العدد
+        self._stopping = False
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def enqueue(self, user_id, action, resource_type, resource_id=None, description=""):
+        entry = {
+            "user_id": user_id,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "description": description,
+            "created_at": datetime.now(timezone.utc),
+        }
+        with self._condition:
+            if len(self._pending) >= MAX_PENDING:
+                logger.warning("Activity log queue is full; dropping entry")
+                return
+            self._pending.append(entry)
+            self._queued += 1
+            self._ensure_thread()
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+
+    def flush(self, timeout=10.0):
+        """كتابة كل ما أُضيف حتى الآن؛ يعيد False إذا انتهت المهلة قبل ذلك."""
+        with self._condition:
+            if not self.running:
+                pending, self._pending = self._pending, []
+            else:
+                target = self._flush_target = self._queued
+                self._condition.notify_all()
+                return self._condition.wait_for(lambda: self._written >= target, timeout)
+        # لا يوجد خيط (بعد shutdown مثلاً): الكتابة في الخيط الحالي
+        self._write(pending)
+        return True
+
+    def shutdown(self, timeout=10.0):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+        with self._condition:
+            # السجلات التالية (تسجيل دخول جديد في نفس العملية) تشغّل خيطاً جديداً
+            self._stopping = False
+
+    def _ensure_thread(self):
+        if self._stopping or self.running:
+            return
+        first_start = self._thread is None
+        self._thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+        self._thread.start()
+        if first_start:
+            atexit.register(self.shutdown)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                # انتظار أول سجل، ثم حتى امتلاء الدفعة أو مرور المهلة أو طلب flush
+                self._condition.wait_for(lambda: self._pending or self._stopping)
+                if self._pending and not self._stopping:
+                    self._condition.wait_for(
+                        lambda: len(self._pending) >= self.batch_size or self._stopping or self._written < self._flush_target,
+                        self.interval_s,
+                    )
+                batch, self._pending = self._pending, []
+                stopping = self._stopping
+            if batch:
+                self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch):
+        if batch:
+            session = db_module.SessionLocal()
+            try:
+                session.execute(insert(ActivityLog), batch)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"Could not write {len(batch)} activity log entries: {e}")
+            finally:
+                session.close()
+        with self._condition:
+            self._written += len(batch)
+            self._condition.notify_all()
+
+
+activity_log_writer = ActivityLogWriter()
@@ -0,0 +1,49 @@
+"""
+مجلد الملفات التي يكتبها التطبيق أثناء العمل (سجلات التشخيص والمقاييس).
+
+النسخة المجمعة (PyInstaller) قد تُشغَّل من اختصار بمجلد عمل عشوائي أو غير قابل للكتابة
+(Program Files مثلاً)، فلا تُكتب هذه الملفات نسبة إلى مجلد العمل الحالي:
+- OMS_DATA_DIR إن عُرّف.
+- النسخة المجمعة: %LOCALAPPDATA%\\OrphanManagementSystem على Windows، و
+  $XDG_DATA_HOME/orphan-management-system (~/.local/share افتراضياً) على غيره.
+- التشغيل من المصدر: مجلد المشروع كما كان.
+إذا تعذر إنشاء المجلد تُستخدم مجلد الملفات المؤقتة.
+"""
+import os
+import sys
+import tempfile
+
+DATA_DIR_ENV = "OMS_DATA_DIR"
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_data_dir = None
+
+
+def _default_data_dir():
+    if os.environ.get(DATA_DIR_ENV):
+        return os.environ[DATA_DIR_ENV]
+    if not getattr(sys, "frozen", False):
+        return PROJECT_ROOT
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(os.path.join("~", "AppData", "Local"))
+        return os.path.join(base, "OrphanManagementSystem")
+    base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser(os.path.join("~", ".local", "share"))
+    return os.path.join(base, "orphan-management-system")
+
+
+def data_dir():
+    """المجلد (يُنشأ عند أول استدعاء)."""
+    global _data_dir
+    if _data_dir is None:
+        path = _default_data_dir()
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError:
+            path = tempfile.gettempdir()
+        _data_dir = path
+    return _data_dir
+
+
+def data_path(*parts):
+    """مسار ملف أو مجلد داخل data_dir()."""
+    return os.path.join(data_dir(), *parts)
@@ -6,7 +6,7 @@ from PyQt6.QtGui import QFontDatabase, QFont
 from decimal import Decimal
 from PyQt6.QtCore import QDate
 
-from database.models import ActivityLog
+from utils.activity_log import activity_log_writer
 
 # مسار جذر المشروع (لملفات الأصول)
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -135,19 +135,12 @@ def calculate_age(birth_date):
 
 
 def log_activity(session, user_id, action, resource_type, resource_id=None, description=""):
-    try:
-        new_log = ActivityLog(
-            user_id=user_id,
-            action=action,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            description=description
-        )
-        session.add(new_log)
-        session.commit()
-    except Exception as e:
-        print(f"Error logging activity: {e}")
-        session.rollback()
+    """
+    إضافة سجل نشاط إلى طابور الكتابة في الخلفية (utils/activity_log).
+    session لم يعد مستخدماً ويبقى للتوافق مع الاستدعاءات الحالية: السجل يُكتب بجلسة
+    مستقلة، فلا يحفظ أو يلغي أي تغييرات معلقة في جلسة المستدعي.
+    """
+    activity_log_writer.enqueue(user_id, action, resource_type, resource_id, description)
 
 
 def try_get_date(text):
@@ -0,0 +1,243 @@
+"""
+مقاييس زمن العمليات التي يشعر بها المستخدم (فتح ملف شخص، تحميل جدول الحركات،
+الحفظ، الحذف، التقارير، النسخ الاحتياطي، البحث).
+
+سجل خفيف داخل العملية: لكل عملية عدّاد ومدرج تكراري (histogram) بحدود ثابتة
+بالثواني كما في Prometheus، وعينة من آخر القياسات لحساب p50/p95/p99:
+
+    with metrics.time("open_person"):
+        ...
+
+    @metrics.timed("search")
+    def search_orphan(...): ...
+
+    start = time.perf_counter()
+    ...
+    metrics.record("save_transactions", start)
+
+يكتب خيط خلفي كل METRICS_FLUSH_INTERVAL_S ثانية (وعند الخروج):
+- METRICS_PROM_PATH: الحالة التراكمية بصيغة Prometheus النصية.
+- METRICS_CSV_PATH: سطر لكل عملية نُفذت خلال الفترة (الجهاز، نسخة البناء،
+  العدد، p50/p95/p99) لمقارنة النسخ والأجهزة بين الفروع؛ يُدوَّر الملف عند
+  تجاوز METRICS_CSV_MAX_BYTES.
+الملفان في مجلد بيانات التطبيق (utils/app_paths.py) لا في مجلد العمل.
+"""
+import atexit
+import csv
+import functools
+import logging
+import math
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.app_paths import data_path
+
+logger = logging.getLogger(__name__)
+
+METRICS_PROM_PATH = data_path("metrics.prom")
+METRICS_CSV_PATH = data_path("metrics.csv")
+METRICS_CSV_MAX_BYTES = 2 * 1024 * 1024
+METRICS_FLUSH_INTERVAL_S = 60
+SAMPLE_WINDOW = 2048
+
+# حدود المدرج بالثواني (آخرها +Inf ضمنياً)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CSV_FIELDS = ["timestamp", "host", "build", "operation", "count", "errors", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+
+
+def percentile(samples, q):
+    """النسبة المئوية q (0-100) بطريقة أقرب رتبة."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def build_id():
+    """تعريف نسخة البناء: OMS_BUILD إن وُجد، وإلا تاريخ تعديل الملف التنفيذي / app.py."""
+    if os.environ.get("OMS_BUILD"):
+        return os.environ["OMS_BUILD"]
+    if getattr(sys, "frozen", False):
+        path = sys.executable
+    else:
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+    try:
+        return datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y%m%d-%H%M")
+    except OSError:
+        return "unknown"
+
+
+class _Operation:
+    __slots__ = ("count", "errors", "sum_s", "max_s", "buckets", "recent", "interval", "interval_errors")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.sum_s = 0.0
+        self.max_s = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.recent = deque(maxlen=SAMPLE_WINDOW)
+        self.interval = []        # عينات منذ آخر كتابة للـ CSV
+        self.interval_errors = 0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operations = {}
+        self._flush_thread = None
+        self._stop = threading.Event()
+        self.host = socket.gethostname()
+        self.build = build_id()
+
+    def _operation(self, name):
+        operation = self._operations.get(name)
+        if operation is None:
+            operation = self._operations[name] = _Operation()
+        return operation
+
+    # ===== Recording =====
+    def observe(self, name, seconds):
+        with self._lock:
+            operation = self._operation(name)
+            operation.count += 1
+            operation.sum_s += seconds
+            operation.max_s = max(operation.max_s, seconds)
+            index = next((i for i, bound in enumerate(BUCKETS) if seconds <= bound), len(BUCKETS))
+            operation.buckets[index] += 1
+            operation.recent.append(seconds)
+            operation.interval.append(seconds)
+
+    def record(self, name, start, end=None):
+        """تسجيل مدة من perf_counter (كما في utils.startup_trace)."""
+        self.observe(name, (end if end is not None else time.perf_counter()) - start)
+
+    def error(self, name):
+        with self._lock:
+            operation = self._operation(name)
+            operation.errors += 1
+            operation.interval_errors += 1
+
+    @contextmanager
+    def time(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.error(name)
+            raise
+        self.record(name, start)
+
+    def timed(self, name):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # ===== Reading =====
+    def summary(self):
+        """{العملية: {count, errors, p50_ms, p95_ms, p99_ms, max_ms}} من آخر SAMPLE_WINDOW عينة."""
+        with self._lock:
+            items = [(name, op.count, op.errors, list(op.recent), op.max_s) for name, op in self._operations.items()]
+        return {
+            name: {
+                "count": count,
+                "errors": errors,
+                "p50_ms": round(percentile(recent, 50) * 1000, 2),
+                "p95_ms": round(percentile(recent, 95) * 1000, 2),
+                "p99_ms": round(percentile(recent, 99) * 1000, 2),
+                "max_ms": round(max_s * 1000, 2),
+            }
+            for name, count, errors, recent, max_s in sorted(items)
+        }
+
+    def prometheus_text(self):
+        labels = f'host="{self.host}",build="{self.build}"'
+        lines = [
+            "# HELP oms_operation_duration_seconds Latency of user-facing operations.",
+            "# TYPE oms_operation_duration_seconds histogram",
+        ]
+        with self._lock:
+            operations = sorted(
+                (name, op.count, op.errors, op.sum_s, list(op.buckets)) for name, op in self._operations.items()
+            )
+        for name, count, _, sum_s, buckets in operations:
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS + (math.inf,), buckets):
+                cumulative += bucket_count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                lines.append(f'oms_operation_duration_seconds_bucket{{operation="{name}",{labels},le="{le}"}} {cumulative}')
+            lines.append(f'oms_operation_duration_seconds_sum{{operation="{name}",{labels}}} {sum_s:.6f}')
+            lines.append(f'oms_operation_duration_seconds_count{{operation="{name}",{labels}}} {count}')
+        lines += [
+            "# HELP oms_operation_errors_total Operations that raised an error.",
+            "# TYPE oms_operation_errors_total counter",
+        ]
+        for name, _, errors, _, _ in operations:
+            lines.append(f'oms_operation_errors_total{{operation="{name}",{labels}}} {errors}')
+        return "\n".join(lines) + "\n"
+
+    # ===== Flushing =====
+    def flush(self, prom_path=METRICS_PROM_PATH, csv_path=METRICS_CSV_PATH):
+        """كتابة ملف Prometheus وإضافة أسطر الفترة الحالية إلى CSV."""
+        with self._lock:
+            interval = []
+            for name, op in sorted(self._operations.items()):
+                if op.interval or op.interval_errors:
+                    interval.append((name, op.interval, op.interval_errors))
+                    op.interval = []
+                    op.interval_errors = 0
+        try:
+            tmp_path = prom_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, prom_path)
+            if interval:
+                self._append_csv(csv_path, interval)
+        except OSError as e:
+            logger.warning(f"Could not write metrics: {e}")
+
+    def _append_csv(self, path, interval):
+        if os.path.exists(path) and os.path.getsize(path) > METRICS_CSV_MAX_BYTES:
+            os.replace(path, path + ".1")
+        new_file = not os.path.exists(path)
+        timestamp = datetime.now().isoformat(timespec="seconds")
+        with open(path, "a", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(CSV_FIELDS)
+            for name, samples, errors in interval:
+                writer.writerow([
+                    timestamp, self.host, self.build, name, len(samples), errors,
+                    f"{percentile(samples, 50) * 1000:.2f}",
+                    f"{percentile(samples, 95) * 1000:.2f}",
+                    f"{percentile(samples, 99) * 1000:.2f}",
+                    f"{max(samples, default=0) * 1000:.2f}",
+                ])
+
+    def start_periodic_flush(self, interval_s=METRICS_FLUSH_INTERVAL_S):
+        if self._flush_thread is not None:
+            return
+        self._flush_thread = threading.Thread(
+            target=self._flush_loop, args=(interval_s,), name="metrics-flush", daemon=True
+        )
+        self._flush_thread.start()
+        atexit.register(self.flush)
+
+    def _flush_loop(self, interval_s):
+        while not self._stop.wait(interval_s):
+            self.flush()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,223 @@
+"""
+التقاط cProfile و tracemalloc من البرنامج أثناء التشغيل.
+
+وضعان:
+- العملية التالية (arm_next_operation): يبدأ القياس عند أول نقرة أو ضغطة مفتاح
+  بعد التفعيل، وينتهي عند عودة حلقة الأحداث بعد انتهاء العمل المتزامن (وبعد
+  NEXT_OPERATION_SETTLE_MS على الأقل حتى تُشمل المؤقتات القصيرة التي يطلقها).
+- نافذة زمنية (start_window): من الآن ولمدة محددة بالثواني.
+
+cProfile يقيس الخيط الرئيسي فقط (خيط الواجهة)، وهو المقصود هنا. تُحفظ في
+PROFILES_DIR ثلاثة ملفات لكل التقاط بنفس الاسم:
+- .prof: للفتح بـ snakeviz أو python -m pstats.
+- .alloc.txt: أكبر التخصيصات المتبقية في الذاكرة (tracemalloc) حسب السطر.
+- .json: ملخص (العملية، حجم البيانات، أثقل الدوال، أكبر التخصيصات، ذروة الذاكرة)
+  يُعرض في نافذة "التقاط الأداء".
+PROFILES_DIR داخل مجلد بيانات التطبيق (utils/app_paths.py) لا في مجلد العمل.
+"""
+import cProfile
+import json
+import logging
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from datetime import datetime
+
+from PyQt6.QtCore import QEvent, QObject, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QApplication
+
+from utils.app_paths import data_path
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILES_DIR = data_path("profiles")
+NEXT_OPERATION_SETTLE_MS = 300
+TRACEMALLOC_FRAMES = 10
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 30
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_START_EVENTS = (QEvent.Type.MouseButtonRelease, QEvent.Type.KeyPress)
+
+
+def _short_path(path):
+    return path[len(_ROOT):] if path.startswith(_ROOT) else os.path.basename(path)
+
+
+def _slug(text):
+    return re.sub(r"[^\w.-]+", "_", text, flags=re.UNICODE).strip("_")[:60] or "capture"
+
+
+def load_captures(directory=PROFILES_DIR):
+    """ملخصات الالتقاطات المحفوظة (الأحدث أولاً)."""
+    captures = []
+    try:
+        names = sorted(os.listdir(directory), reverse=True)
+    except OSError:
+        return captures
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                captures.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return captures
+
+
+class ProfileCapture(QObject):
+    # (الحالة: armed / running / idle، رسالة)
+    state_changed = pyqtSignal(str, str)
+    # ملخص الالتقاط بعد الحفظ
+    captured = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.dataset_provider = None  # دالة تعيد dict بحجم البيانات الحالية
+        self._profile = None
+        self._armed = False
+        self._label = ""
+        self._started = 0.0
+        self._metrics_before = {}
+        self._started_tracemalloc = False
+        self._stop_timer = QTimer(self)
+        self._stop_timer.setSingleShot(True)
+        self._stop_timer.timeout.connect(self.stop)
+
+    @property
+    def state(self):
+        if self._profile is not None:
+            return "running"
+        return "armed" if self._armed else "idle"
+
+    # ===== Starting =====
+    def arm_next_operation(self):
+        if self.state != "idle":
+            return
+        self._armed = True
+        QApplication.instance().installEventFilter(self)
+        self.state_changed.emit("armed", "سيتم قياس العملية التالية (نقرة أو مفتاح)")
+
+    def start_window(self, seconds, label="window"):
+        if self.state != "idle":
+            return
+        self._start(f"{label}_{seconds}s")
+        self._stop_timer.start(int(seconds * 1000))
+
+    def cancel(self):
+        if self._armed:
+            self._armed = False
+            QApplication.instance().removeEventFilter(self)
+            self.state_changed.emit("idle", "أُلغي القياس")
+
+    def eventFilter(self, obj, event):
+        if self._armed and event.type() in _START_EVENTS and obj.isWidgetType():
+            self._armed = False
+            QApplication.instance().removeEventFilter(self)
+            self._start(obj.objectName() or type(obj).__name__)
+            # المؤقت لا ينطلق إلا بعد عودة حلقة الأحداث، أي بعد انتهاء معالج النقرة
+            self._stop_timer.start(NEXT_OPERATION_SETTLE_MS)
+        return False
+
+    def _start(self, label):
+        self._label = label
+        self._metrics_before = {name: s["count"] for name, s in metrics.summary().items()}
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        self._started = time.perf_counter()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        self.state_changed.emit("running", f"جاري القياس: {label}")
+
+    # ===== Stopping =====
+    def stop(self):
+        if self._profile is None:
+            return None
+        self._profile.disable()
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        profile, self._profile = self._profile, None
+        self._stop_timer.stop()
+
+        operations = [
+            name for name, s in metrics.summary().items()
+            if s["count"] > self._metrics_before.get(name, 0)
+        ]
+        operation = "+".join(operations) or self._label
+        try:
+            summary = self._save(profile, snapshot, operation, duration_ms, peak)
+        except OSError as e:
+            logger.warning(f"Could not save profile: {e}")
+            self.state_changed.emit("idle", f"تعذر حفظ القياس: {e}")
+            return None
+        self.state_changed.emit("idle", f"تم حفظ القياس: {summary['prof_path']}")
+        self.captured.emit(summary)
+        return summary
+
+    def _dataset(self):
+        if self.dataset_provider is None:
+            return {}
+        try:
+            return self.dataset_provider()
+        except Exception as e:
+            return {"error": str(e)}
+
+    def _save(self, profile, snapshot, operation, duration_ms, peak):
+        os.makedirs(PROFILES_DIR, exist_ok=True)
+        started_at = datetime.now()
+        base = os.path.join(PROFILES_DIR, f"{started_at.strftime('%Y%m%d-%H%M%S')}_{_slug(operation)}")
+        prof_path = base + ".prof"
+        profile.dump_stats(prof_path)
+
+        stats = pstats.Stats(profile)
+        functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        top_functions = [
+            {
+                "function": f"{_short_path(filename)}:{line}({name})",
+                "calls": calls,
+                "tottime_ms": round(tottime * 1000, 2),
+                "cumtime_ms": round(cumtime * 1000, 2),
+            }
+            for (filename, line, name), (_, calls, tottime, cumtime, _) in functions[:TOP_FUNCTIONS]
+        ]
+
+        allocations = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        )).statistics("lineno")
+        top_allocations = [
+            {
+                "location": f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                "size_kb": round(stat.size / 1024, 1),
+                "count": stat.count,
+            }
+            for stat in allocations[:TOP_ALLOCATIONS]
+        ]
+        with open(base + ".alloc.txt", "w", encoding="utf-8") as f:
+            f.write(f"# {operation} — top allocations still alive at the end of the capture\n")
+            for stat in allocations[:TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+
+        summary = {
+            "at": started_at.isoformat(timespec="seconds"),
+            "operation": operation,
+            "trigger": self._label,
+            "duration_ms": round(duration_ms, 1),
+            "peak_kb": round(peak / 1024, 1),
+            "dataset": self._dataset(),
+            "prof_path": prof_path,
+            "top_functions": top_functions,
+            "top_allocations": top_allocations,
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return summary
@@ -0,0 +1,200 @@
+"""
+مراقب تجمّد الواجهة.
+
+مؤقت Qt في الخيط الرئيسي يسجل "نبضة" كل HEARTBEAT_MS، وخيط مراقبة خلفي يفحص
+آخر نبضة. إذا توقفت حلقة الأحداث أكثر من العتبة (STALL_THRESHOLD_MS افتراضياً،
+أو OMS_STALL_THRESHOLD_MS؛ القيمة 0 تعطل المراقب) يلتقط الخيط مكدس الخيط الرئيسي
+عبر sys._current_frames ويكرر الالتقاط ما دام التجمّد مستمراً.
+
+عند انتهاء التجمّد يُكتب سطر JSON في STALL_LOG_PATH يحتوي المدة وموضع الاستدعاء
+الغالب (أقرب دالة من شيفرة التطبيق في العينات، مثل DBService.search_orphan أو
+BackupManager._on_finished) ونص المكدس؛ وتعرض نافذة "تجمّد الواجهة" في الإعدادات
+هذه السجلات مجمّعة حسب موضع الاستدعاء. الملف في مجلد بيانات التطبيق (utils/app_paths.py).
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+
+from utils.app_paths import data_path
+
+logger = logging.getLogger(__name__)
+
+STALL_THRESHOLD_ENV = "OMS_STALL_THRESHOLD_MS"
+STALL_THRESHOLD_MS = 200
+HEARTBEAT_MS = 50
+STALL_LOG_PATH = data_path("stall_log.jsonl")
+STALL_LOG_KEEP = 500
+MAX_SAMPLES_PER_STALL = 100
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def _is_app_frame(frame):
+    filename = frame.f_code.co_filename
+    return filename.startswith(_ROOT) and filename != _THIS_FILE and "site-packages" not in filename
+
+
+def call_site(frame):
+    """موضع الاستدعاء: أقرب دالة من شيفرة التطبيق، وإلا أعمق إطار في المكدس."""
+    innermost = frame
+    while frame is not None:
+        if _is_app_frame(frame):
+            break
+        frame = frame.f_back
+    frame = frame or innermost
+    owner = frame.f_locals.get("self")
+    name = f"{type(owner).__name__}.{frame.f_code.co_name}" if owner is not None else frame.f_code.co_qualname
+    filename = frame.f_code.co_filename
+    if filename.startswith(_ROOT):
+        filename = filename[len(_ROOT):]
+    return name, f"{filename}:{frame.f_lineno}"
+
+
+class StallWatchdog:
+    def __init__(self):
+        self.threshold_ms = STALL_THRESHOLD_MS
+        self._last_beat = time.perf_counter()
+        self._main_thread_id = threading.main_thread().ident
+        self._timer = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, threshold_ms=None):
+        """يُستدعى من الخيط الرئيسي بعد إنشاء QApplication."""
+        if self.running:
+            return
+        if threshold_ms is None:
+            value = os.environ.get(STALL_THRESHOLD_ENV, "")
+            threshold_ms = int(value) if value.isdigit() else STALL_THRESHOLD_MS
+        self.threshold_ms = threshold_ms
+        if threshold_ms <= 0:
+            return
+
+        from PyQt6.QtCore import QTimer
+
+        _trim_log(STALL_LOG_PATH)
+        self._main_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._timer = QTimer()
+        self._timer.timeout.connect(self._beat)
+        self._timer.start(HEARTBEAT_MS)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+
+    def _beat(self):
+        self._last_beat = time.perf_counter()
+
+    def _watch(self):
+        poll_s = HEARTBEAT_MS / 1000
+        while not self._stop.wait(poll_s):
+            blocked_ms = (time.perf_counter() - self._last_beat) * 1000
+            if blocked_ms >= self.threshold_ms:
+                self._capture_stall()
+
+    def _capture_stall(self):
+        """أخذ عينات من مكدس الخيط الرئيسي حتى تعود النبضات."""
+        beat_before = self._last_beat
+        started_at = datetime.now()
+        sites = Counter()
+        stacks = {}
+        while self._last_beat == beat_before and not self._stop.is_set():
+            frame = sys._current_frames().get(self._main_thread_id)
+            if frame is not None and sum(sites.values()) < MAX_SAMPLES_PER_STALL:
+                site = call_site(frame)
+                sites[site] += 1
+                if site not in stacks:
+                    stacks[site] = "".join(traceback.format_stack(frame))
+                del frame
+            self._stop.wait(HEARTBEAT_MS / 1000)
+
+        if not sites:
+            return
+        duration_ms = (self._last_beat - beat_before) * 1000 - HEARTBEAT_MS
+        (name, location), _ = sites.most_common(1)[0]
+        stall = {
+            "at": started_at.isoformat(timespec="seconds"),
+            "duration_ms": round(max(duration_ms, self.threshold_ms), 1),
+            "site": name,
+            "location": location,
+            "samples": sum(sites.values()),
+            "stack": stacks[(name, location)],
+        }
+        logger.warning(f"UI stalled {stall['duration_ms']:.0f} ms in {name} ({location})")
+        try:
+            with self._lock, open(STALL_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(stall, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write stall log: {e}")
+
+
+def load_stalls(path=STALL_LOG_PATH):
+    """التجمّدات المسجلة (الأقدم أولاً)؛ تُتجاهل الأسطر التالفة."""
+    stalls = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    stalls.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return stalls
+
+
+def aggregate_stalls(stalls):
+    """تجميع حسب موضع الاستدعاء، مرتبة حسب الزمن الإجمالي."""
+    groups = {}
+    for stall in stalls:
+        group = groups.setdefault(stall.get("site", "?"), {
+            "site": stall.get("site", "?"),
+            "count": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "locations": Counter(),
+            "last_at": "",
+            "stack": "",
+        })
+        duration = stall.get("duration_ms", 0)
+        group["count"] += 1
+        group["total_ms"] += duration
+        group["locations"][stall.get("location", "")] += 1
+        if duration >= group["max_ms"]:
+            group["max_ms"] = duration
+            group["stack"] = stall.get("stack", "")
+        group["last_at"] = max(group["last_at"], stall.get("at", ""))
+    return sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+
+
+def _trim_log(path):
+    stalls = load_stalls(path)
+    if len(stalls) <= STALL_LOG_KEEP:
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            for stall in stalls[-STALL_LOG_KEEP:]:
+                f.write(json.dumps(stall, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning(f"Could not trim stall log: {e}")
+
+
+stall_watchdog = StallWatchdog()
@@ -0,0 +1,162 @@
+"""
+متتبع مراحل بدء التشغيل.
+
+كل مرحلة (فحص MySQL، create_all، تحميل الواجهة، MainWindow.init_ui ...) تُسجل
+بطوابع زمنية من time.perf_counter (ساعة رتيبة لا تتأثر بتغيير ساعة النظام):
+
+    with startup_tracer.phase("create_all"):
+        Base.metadata.create_all(engine)
+
+عند finish() يُضاف سطر JSON واحد للتشغيل الحالي إلى STARTUP_TRACE_LOG (آخر
+STARTUP_TRACE_KEEP تشغيلات فقط)، ويُعرض في صفحة الإعدادات. إذا عُرّف متغير البيئة
+OMS_STARTUP_TRACE يُكتب أيضاً ملف Chrome trace يمكن فتحه في chrome://tracing أو
+Perfetto (القيمة مسار الملف، أو 1 للمسار الافتراضي startup_trace.json).
+الملفات الافتراضية في مجلد بيانات التطبيق (utils/app_paths.py) لا في مجلد العمل.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.app_paths import data_path
+
+logger = logging.getLogger(__name__)
+
+TRACE_ENV = "OMS_STARTUP_TRACE"
+DEFAULT_CHROME_TRACE_PATH = data_path("startup_trace.json")
+STARTUP_TRACE_LOG = data_path("startup_trace.jsonl")
+STARTUP_TRACE_KEEP = 20
+
+
+class StartupTracer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = []   # (name, start, end, thread_id, thread_name)
+        self._origin = time.perf_counter()
+        self._started_at = datetime.now()
+        self._finished = False
+
+    @property
+    def finished(self):
+        return self._finished
+
+    def set_origin(self, origin):
+        """نقطة الصفر (مثلاً لحظة بدء main.py قبل استيراد app)."""
+        self._origin = min(self._origin, origin)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name, start, end):
+        if self._finished:
+            return  # ما بعد انتهاء البدء لا يخص هذا المتتبع
+        thread = threading.current_thread()
+        with self._lock:
+            self._events.append((name, start, end, thread.ident, thread.name))
+
+    def mark(self, name):
+        """حدث لحظي (بدون مدة)، مثل ظهور نافذة الدخول."""
+        now = time.perf_counter()
+        self.record(name, now, now)
+
+    def phases(self):
+        """المراحل مرتبة حسب البداية، بالميلي ثانية منذ نقطة الصفر."""
+        with self._lock:
+            events = sorted(self._events, key=lambda e: (e[1], -e[2]))
+        return [
+            {
+                "name": name,
+                "start_ms": round((start - self._origin) * 1000, 2),
+                "duration_ms": round((end - start) * 1000, 2),
+                "thread": thread_name,
+            }
+            for name, start, end, _, thread_name in events
+        ]
+
+    def finish(self):
+        """إنهاء التتبع وكتابة السجل (مرة واحدة فقط لكل تشغيل)."""
+        if self._finished:
+            return None
+        total_ms = round((time.perf_counter() - self._origin) * 1000, 2)
+        self._finished = True
+        run = {
+            "started_at": self._started_at.isoformat(timespec="seconds"),
+            "total_ms": total_ms,
+            "phases": self.phases(),
+        }
+        logger.info(f"Startup finished in {total_ms:.0f} ms")
+        try:
+            _append_run(STARTUP_TRACE_LOG, run)
+        except OSError as e:
+            logger.warning(f"Could not write startup trace log: {e}")
+
+        chrome_path = os.environ.get(TRACE_ENV)
+        if chrome_path:
+            if chrome_path == "1":
+                chrome_path = DEFAULT_CHROME_TRACE_PATH
+            try:
+                self.write_chrome_trace(chrome_path)
+            except OSError as e:
+                logger.warning(f"Could not write Chrome trace: {e}")
+        return run
+
+    def write_chrome_trace(self, path):
+        """صيغة Trace Event: أحداث كاملة (ph=X) بالميكروثانية."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+        trace_events = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "Orphan Management System"}},
+        ]
+        for thread_id, thread_name in {(e[3], e[4]) for e in events}:
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}})
+        for name, start, end, thread_id, _ in events:
+            event = {
+                "name": name,
+                "cat": "startup",
+                "ph": "X" if end > start else "i",
+                "ts": round((start - self._origin) * 1_000_000, 1),
+                "pid": pid,
+                "tid": thread_id,
+            }
+            if end > start:
+                event["dur"] = round((end - start) * 1_000_000, 1)
+            else:
+                event["s"] = "t"
+            trace_events.append(event)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+
+def _append_run(path, run):
+    runs = load_runs(path)
+    runs.append(run)
+    with open(path, "w", encoding="utf-8") as f:
+        for item in runs[-STARTUP_TRACE_KEEP:]:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+
+def load_runs(path=STARTUP_TRACE_LOG):
+    """التشغيلات المسجلة (الأقدم أولاً)؛ تُتجاهل الأسطر التالفة."""
+    runs = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    runs.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return runs
+
+
+startup_tracer = StartupTracer()
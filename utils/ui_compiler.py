@@ -0,0 +1,257 @@
+"""
+تحويل ملفات Qt Designer (.ui) إلى وحدات Python مسبقاً بدل loadUiType عند كل تشغيل.
+
+loadUiType يحلل ملف XML ويولّد شيفرة Python ثم ينفذها في كل مرة يبدأ فيها التطبيق؛
+أما الوحدة المولّدة هنا فتُستورد كأي ملف .py (مع ذاكرة __pycache__). تُكتب الوحدات
+بجانب ملف الـ ui (app.ui -> app_ui.py) وفي أولها بصمة المصدر، فإذا تغيّر ملف الـ ui
+أو قائمة الصفحات المؤجلة أُعيد توليدها تلقائياً عند التحميل التالي. إن تعذرت الكتابة
+(مثلاً مجلد للقراءة فقط) نرجع إلى loadUiType في الذاكرة.
+
+الصفحات المذكورة في LAZY_PAGES تُفصل عن النموذج الرئيسي: يبقى في النموذج الرئيسي
+عنصر الصفحة فارغاً (بعنوانه وموقعه في التبويبات)، ويُولَّد لمحتواها نموذج مستقل
+يبنيه MainWindow عند أول زيارة للصفحة عبر load_page_form_class.
+
+خطوة البناء (قبل pyinstaller):
+
+    python -m utils.ui_compiler           # توليد الوحدات المتغيرة فقط
+    python -m utils.ui_compiler --force   # إعادة توليد الكل
+"""
+import glob
+import hashlib
+import importlib.util
+import io
+import logging
+import os
+import re
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+# يُرفع عند تغيير طريقة التوليد أو التقسيم حتى تُعاد كتابة الوحدات القديمة
+COMPILER_VERSION = 1
+
+# الصفحات (objectName داخل tabWidget) التي تُبنى عند أول زيارة
+LAZY_PAGES = {
+    "app.ui": (
+        "tab_7",   # المستخدمون
+        "tab_8",   # الأدوار
+        "tab_9",   # الصلاحيات
+        "tab_27",  # سجل النشاطات
+        "tab_6",   # الإعدادات
+    ),
+}
+
+_DIGEST_PREFIX = "# ui-source-digest: "
+_MOVED_TAGS = ("widget", "layout", "zorder", "action", "addaction")
+_digests = {}
+
+
+# ===== Paths & digests =====
+def compiled_path(ui_path, page=None):
+    base, _ = os.path.splitext(ui_path)
+    return f"{base}_{page}_ui.py" if page else f"{base}_ui.py"
+
+
+def lazy_pages_for(ui_path):
+    return LAZY_PAGES.get(os.path.basename(ui_path), ())
+
+
+def source_digest(ui_path):
+    """بصمة محتوى ملف الـ ui مع إعدادات التقسيم (تُحسب مرة واحدة لكل تشغيل)."""
+    digest = _digests.get(ui_path)
+    if digest is None:
+        sha = hashlib.sha1()
+        with open(ui_path, "rb") as f:
+            sha.update(f.read())
+        sha.update(repr((COMPILER_VERSION, lazy_pages_for(ui_path))).encode("utf-8"))
+        digest = _digests[ui_path] = sha.hexdigest()
+    return digest
+
+
+def is_up_to_date(ui_path, page=None):
+    try:
+        with open(compiled_path(ui_path, page), "r", encoding="utf-8") as f:
+            first_line = f.readline().strip()
+    except OSError:
+        return False
+    return first_line == _DIGEST_PREFIX + source_digest(ui_path)
+
+
+# ===== Splitting =====
+def _names_in(element):
+    return {
+        node.get("name")
+        for node in element.iter()
+        if node.tag in ("widget", "layout", "action", "spacer") and node.get("name")
+    }
+
+
+def split_ui(ui_bytes, lazy_pages):
+    """
+    فصل الصفحات المؤجلة عن ملف ui.
+    يعيد (xml النموذج الرئيسي, {اسم الصفحة: xml نموذج الصفحة}).
+    """
+    root = ET.fromstring(ui_bytes)
+    if not lazy_pages:
+        return ui_bytes, {}
+
+    pages = {}
+    for parent in root.iter("widget"):
+        for child in parent.findall("widget"):
+            if child.get("name") in lazy_pages:
+                pages[child.get("name")] = child
+    missing = set(lazy_pages) - set(pages)
+    if missing:
+        raise ValueError(f"Lazy pages not found in ui file: {sorted(missing)}")
+
+    page_roots = {}
+    owner = {}  # اسم العنصر -> الصفحة التي ينتمي إليها
+    for name, page in pages.items():
+        page_root = ET.Element("ui", root.attrib)
+        ET.SubElement(page_root, "class").text = name
+        top = ET.SubElement(page_root, "widget", {"class": "QWidget", "name": name})
+        for node in [n for n in page if n.tag in _MOVED_TAGS]:
+            page.remove(node)
+            top.append(node)
+        for node_name in _names_in(top) - {name}:
+            owner[node_name] = name
+        page_roots[name] = page_root
+
+    # العناصر العامة (الموارد، الإشارات، ترتيب التنقل، مجموعات الأزرار) توزَّع حسب مالكها
+    for section in list(root):
+        if section.tag in ("class", "widget"):
+            continue
+        if section.tag == "connections":
+            for connection in list(section):
+                ends = {owner.get(connection.findtext("sender")), owner.get(connection.findtext("receiver"))}
+                if ends == {None}:
+                    continue
+                if len(ends) > 1:
+                    raise ValueError(
+                        f"Connection {connection.findtext('sender')} -> {connection.findtext('receiver')} crosses a lazy page"
+                    )
+                section.remove(connection)
+                _section(page_roots[ends.pop()], "connections").append(connection)
+        elif section.tag == "tabstops":
+            for tabstop in list(section):
+                page = owner.get(tabstop.text)
+                if page:
+                    section.remove(tabstop)
+                    _section(page_roots[page], "tabstops").append(tabstop)
+        elif section.tag == "buttongroups":
+            for group in list(section):
+                members = {
+                    owner.get(widget.get("name"))
+                    for tree in (root, *page_roots.values())
+                    for widget in tree.iter("widget")
+                    for attribute in widget.findall("attribute")
+                    if attribute.get("name") == "buttonGroup" and attribute.findtext("string") == group.get("name")
+                }
+                if members <= {None}:
+                    continue
+                if len(members) > 1:
+                    raise ValueError(f"Button group {group.get('name')} crosses a lazy page")
+                section.remove(group)
+                _section(page_roots[members.pop()], "buttongroups").append(group)
+        else:
+            # customwidgets / resources: نسخة في كل نموذج
+            for page_root in page_roots.values():
+                page_root.append(ET.fromstring(ET.tostring(section)))
+
+    return (
+        ET.tostring(root, encoding="utf-8"),
+        {name: ET.tostring(page_root, encoding="utf-8") for name, page_root in page_roots.items()},
+    )
+
+
+def _section(root, tag):
+    section = root.find(tag)
+    if section is None:
+        section = ET.SubElement(root, tag)
+    return section
+
+
+# ===== Compiling =====
+def _split_sources(ui_path):
+    with open(ui_path, "rb") as f:
+        ui_bytes = f.read()
+    main_xml, page_xmls = split_ui(ui_bytes, lazy_pages_for(ui_path))
+    return {None: main_xml, **page_xmls}
+
+
+def compile_ui(ui_path, force=False):
+    """توليد وحدة النموذج الرئيسي ووحدات الصفحات المؤجلة. يعيد مسارات الملفات المكتوبة."""
+    from PyQt6.uic import compileUi
+
+    targets = (None,) + tuple(lazy_pages_for(ui_path))
+    if not force and all(is_up_to_date(ui_path, page) for page in targets):
+        return []
+
+    written = []
+    header = _DIGEST_PREFIX + source_digest(ui_path) + "\n# Generated by utils/ui_compiler.py; do not edit.\n"
+    for page, xml in _split_sources(ui_path).items():
+        out = io.StringIO()
+        compileUi(io.BytesIO(xml), out)
+        # pyuic يكتب اسم الملف المصدر في التعليق الأول؛ نضع المسار الحقيقي بدل كائن BytesIO
+        source = re.sub(r"<_io\.BytesIO object at 0x[0-9a-f]+>", os.path.basename(ui_path), out.getvalue(), count=1)
+        path = compiled_path(ui_path, page)
+        # الكتابة إلى ملف مؤقت ثم الاستبدال حتى لا تُقرأ وحدة نصف مكتوبة
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(header + source)
+        os.replace(tmp_path, path)
+        written.append(path)
+    return written
+
+
+# ===== Loading =====
+def _import_form_class(path):
+    module_name = "_compiled_ui." + os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return next(value for name, value in vars(module).items() if name.startswith("Ui_"))
+
+
+def _load(ui_path, page=None):
+    if not is_up_to_date(ui_path, page):
+        try:
+            compile_ui(ui_path)
+        except OSError as e:
+            logger.warning(f"Could not write compiled ui for {ui_path}: {e}")
+    if is_up_to_date(ui_path, page):
+        return _import_form_class(compiled_path(ui_path, page))
+
+    from PyQt6.uic import loadUiType
+    form_class, _ = loadUiType(io.BytesIO(_split_sources(ui_path)[page]))
+    return form_class
+
+
+def load_form_class(ui_path):
+    """بديل loadUiType(ui_path)[0] يستخدم الوحدة المولّدة مسبقاً."""
+    return _load(ui_path)
+
+
+def load_page_form_class(ui_path, page):
+    """نموذج صفحة مؤجلة؛ setupUi(page_widget) يبني محتواها داخل عنصر الصفحة الموجود."""
+    return _load(ui_path, page)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="تحويل ملفات ui إلى وحدات Python")
+    parser.add_argument("paths", nargs="*", help="ملفات ui (الافتراضي: كل ملفات مجلد ui)")
+    parser.add_argument("--force", action="store_true", help="إعادة التوليد حتى لو لم تتغير الملفات")
+    args = parser.parse_args(argv)
+
+    ui_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ui")
+    paths = args.paths or sorted(glob.glob(os.path.join(ui_dir, "*.ui")))
+    for ui_path in paths:
+        written = compile_ui(ui_path, force=args.force)
+        print(f"{ui_path}: " + (", ".join(os.path.basename(p) for p in written) if written else "up to date"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())